@@ -0,0 +1,61 @@
+"""add indexes for load board, POD history, and driver lookups
+
+Revision ID: 20261019_01
+Revises: 20260306_05
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_01"
+down_revision = "20260306_05"
+branch_labels = None
+depends_on = None
+
+# The Cloud SQL instance is shared with the other FSI apps, so on Postgres the
+# indexes are built CONCURRENTLY to avoid blocking writes while they build.
+_INDEXES = (
+    ("ix_pod_records_hwb_number_id", "pod_records", "(hwb_number, id)", None),
+    ("ix_pod_records_timestamp", "pod_records", "(timestamp)", None),
+    (
+        "ix_shipments_open_overall_status",
+        "shipments",
+        "(overall_status)",
+        "overall_status NOT IN ('DELIVERED', 'CANCELLED')",
+    ),
+    ("ix_pod_events_reference_id_id", "pod_events", "(reference_id, id)", None),
+    ("ix_shipment_legs_assigned_driver_id_status", "shipment_legs", "(assigned_driver_id, status)", None),
+)
+
+
+def _has_table(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in set(inspector.get_table_names())
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    concurrently = "CONCURRENTLY " if _is_postgres() else ""
+    with op.get_context().autocommit_block():
+        for index_name, table_name, columns, where in _INDEXES:
+            if not _has_table(table_name):
+                continue
+            predicate = f" WHERE {where}" if where else ""
+            op.execute(
+                f"CREATE INDEX {concurrently}IF NOT EXISTS {index_name} ON {table_name} {columns}{predicate}"
+            )
+
+
+def downgrade():
+    concurrently = "CONCURRENTLY " if _is_postgres() else ""
+    with op.get_context().autocommit_block():
+        for index_name, _table_name, _columns, _where in reversed(_INDEXES):
+            op.execute(f"DROP INDEX {concurrently}IF EXISTS {index_name}")
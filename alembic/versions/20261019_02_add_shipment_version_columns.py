@@ -0,0 +1,38 @@
+"""add version_id to shipments and shipment_legs for optimistic locking
+
+Revision ID: 20261019_02
+Revises: 20261019_01
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_02"
+down_revision = "20261019_01"
+branch_labels = None
+depends_on = None
+
+_VERSIONED_TABLES = ("shipments", "shipment_legs")
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return column_name in {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    # The server default keeps raw SQL inserts (seeders, support scripts) valid.
+    for table_name in _VERSIONED_TABLES:
+        if not _has_column(table_name, "version_id"):
+            op.add_column(table_name, sa.Column("version_id", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade():
+    for table_name in _VERSIONED_TABLES:
+        if _has_column(table_name, "version_id"):
+            op.drop_column(table_name, "version_id")
@@ -0,0 +1,65 @@
+"""add paperwork_uploads ledger
+
+Revision ID: 20261019_03
+Revises: 20261019_02
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_03"
+down_revision = "20261019_02"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in set(inspector.get_table_names())
+
+
+def upgrade():
+    if _has_table("paperwork_uploads"):
+        return
+
+    op.create_table(
+        "paperwork_uploads",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("idempotency_key", sa.String(length=64), nullable=False),
+        sa.Column("actor_user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("original_filename", sa.String(length=255), nullable=False),
+        sa.Column("content_type", sa.String(length=120), nullable=False),
+        sa.Column("staged_blob_name", sa.String(length=512), nullable=False),
+        sa.Column("remote_path", sa.String(length=512), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "STAGED",
+                "UPLOADING",
+                "UPLOADED",
+                "FAILED",
+                name="paperwork_upload_status_enum",
+                native_enum=False,
+                create_constraint=True,
+            ),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(length=120), nullable=True),
+        sa.Column("uploaded_at_utc", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("idempotency_key", name="uq_paperwork_uploads_idempotency_key"),
+    )
+    op.create_index("ix_paperwork_uploads_actor_user_id_id", "paperwork_uploads", ["actor_user_id", "id"])
+
+
+def downgrade():
+    if _has_table("paperwork_uploads"):
+        op.drop_index("ix_paperwork_uploads_actor_user_id_id", table_name="paperwork_uploads")
+        op.drop_table("paperwork_uploads")
@@ -0,0 +1,35 @@
+"""add version_id to notification_settings for cached settings
+
+Revision ID: 20261019_04
+Revises: 20261019_03
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_04"
+down_revision = "20261019_03"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return column_name in {column["name"] for column in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    if not _has_column("notification_settings", "version_id"):
+        op.add_column(
+            "notification_settings", sa.Column("version_id", sa.Integer(), nullable=False, server_default="1")
+        )
+
+
+def downgrade():
+    if _has_column("notification_settings", "version_id"):
+        op.drop_column("notification_settings", "version_id")
@@ -0,0 +1,45 @@
+"""add email_deliveries ledger
+
+Revision ID: 20261019_05
+Revises: 20261019_04
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_05"
+down_revision = "20261019_04"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in set(inspector.get_table_names())
+
+
+def upgrade():
+    if _has_table("email_deliveries"):
+        return
+
+    op.create_table(
+        "email_deliveries",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("delivery_key", sa.String(length=255), nullable=False),
+        sa.Column("shipment_id", sa.Integer(), nullable=True),
+        sa.Column("action_type", sa.String(length=64), nullable=False),
+        sa.Column("transition_id", sa.Integer(), nullable=True),
+        sa.Column("task_name", sa.String(length=500), nullable=True),
+        sa.Column("sent_at_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("delivery_key", name="uq_email_deliveries_delivery_key"),
+    )
+
+
+def downgrade():
+    if _has_table("email_deliveries"):
+        op.drop_table("email_deliveries")
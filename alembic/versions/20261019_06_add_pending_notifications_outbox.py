@@ -0,0 +1,50 @@
+"""add pending_notifications outbox
+
+Revision ID: 20261019_06
+Revises: 20261019_05
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_06"
+down_revision = "20261019_05"
+branch_labels = None
+depends_on = None
+
+
+def _has_table(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return table_name in set(inspector.get_table_names())
+
+
+def upgrade():
+    if _has_table("pending_notifications"):
+        return
+
+    op.create_table(
+        "pending_notifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "transition_id",
+            sa.Integer(),
+            sa.ForeignKey("shipment_leg_transitions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.String(length=120), nullable=True),
+        sa.Column("created_at_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at_utc", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("transition_id", name="uq_pending_notifications_transition_id"),
+    )
+
+
+def downgrade():
+    if _has_table("pending_notifications"):
+        op.drop_table("pending_notifications")
@@ -1,14 +1,18 @@
 import logging
+import time
 
+import click
 from flask import Flask, g, has_request_context, jsonify, redirect, request, url_for
 from flask_limiter import Limiter
-from flask_migrate import Migrate
 from flask_limiter.util import get_remote_address
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
 
 from app.config import get_runtime_config
+from app.instrumentation import EMPTY_LOG_FIELDS, get_request_timing, init_request_instrumentation
+from app.metrics import init_metrics
 from app.rate_limits import DEFAULT_DAILY_LIMIT, DEFAULT_HOURLY_LIMIT
+from app.template_cache import configure_template_cache, register_template_cache_commands
 
 # Global extension objects
 db = SQLAlchemy()
@@ -17,7 +21,6 @@ limiter = Limiter(
     key_func=get_remote_address,
     default_limits=[DEFAULT_DAILY_LIMIT, DEFAULT_HOURLY_LIMIT],
 )
-migrate = Migrate()
 
 TRACE_HEADER_NAME = "X-Cloud-Trace-Context"
 DEFAULT_TRACE_ID = "missing-trace-id"
@@ -38,6 +41,7 @@ class RequestContextFilter(logging.Filter):
         record.route = "-"
         record.method = "-"
         record.status = "-"
+        record.__dict__.update(EMPTY_LOG_FIELDS)
 
         if has_request_context():
             record.trace_id = getattr(g, "trace_id", DEFAULT_TRACE_ID)
@@ -46,6 +50,9 @@ class RequestContextFilter(logging.Filter):
             record.method = request.method
             status_code = getattr(g, "response_status_code", None)
             record.status = str(status_code) if status_code is not None else "-"
+            timing = get_request_timing()
+            if timing is not None:
+                record.__dict__.update(timing.log_fields())
 
         return True
 
@@ -55,7 +62,8 @@ def _configure_logging(app: Flask) -> None:
     formatter = logging.Formatter(
         '{"severity":"%(levelname)s","message":"%(message)s","trace_id":"%(trace_id)s",'
         '"request_id":"%(request_id)s","route":"%(route)s","method":"%(method)s",'
-        '"status":"%(status)s"}'
+        '"status":"%(status)s","duration_ms":%(duration_ms)s,"db_queries":%(db_queries)s,'
+        '"db_ms":%(db_ms)s,"outbound_ms":%(outbound_ms)s}'
     )
 
     app.logger.addFilter(request_context_filter)
@@ -63,6 +71,33 @@ def _configure_logging(app: Flask) -> None:
         handler.addFilter(request_context_filter)
         handler.setFormatter(formatter)
 
+
+class _StartupTimer:
+    """Records create_app() phase durations (ms) for the startup benchmark."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+
+def _init_migrations(app: Flask) -> None:
+    """Register Flask-Migrate only for CLI invocations (`flask db ...`).
+
+    Importing Flask-Migrate pulls in Alembic, which serving workers never use.
+    """
+    if click.get_current_context(silent=True) is None:
+        return
+
+    from flask_migrate import Migrate
+
+    Migrate(app, db)
+
+
 def create_app(config_overrides: dict | None = None) -> Flask:
     app = Flask(
         __name__,
@@ -70,28 +105,42 @@ def create_app(config_overrides: dict | None = None) -> Flask:
         template_folder="../templates",
         static_folder="../static",
     )
-    
+    startup_timer = _StartupTimer()
+    app.extensions["startup_timings"] = startup_timer.timings
+
     # Load configuration
     app.config.update(get_runtime_config())
     if config_overrides:
         app.config.update(config_overrides)
+    startup_timer.mark("config")
 
     _configure_logging(app)
+    configure_template_cache(app)
+    register_template_cache_commands(app)
 
     # Initialize extensions
+    init_metrics(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_request_instrumentation(app)
+    _init_migrations(app)
     csrf.init_app(app)
     limiter.init_app(app)
+    startup_timer.mark("extensions")
 
     # Ensure model metadata is registered for Alembic autogenerate
     import models  # noqa: F401
 
-    # Optional: Run schema validation on startup
+    startup_timer.mark("models")
+
+    # Optional: Run schema validation on startup (deferred to the first request by default)
     from app import schema_checks
     if app.config.get("SCHEMA_FAIL_FAST_ON_STARTUP", False):
-        with app.app_context():
-            schema_checks.assert_required_schema()
+        if app.config.get("SCHEMA_ASSERT_DEFERRED", True):
+            app.before_request(schema_checks.DeferredSchemaAssertion())
+        else:
+            with app.app_context():
+                schema_checks.assert_required_schema()
+    startup_timer.mark("schema")
 
     # --- Register Blueprints ---
     from app.blueprints.auth.routes import auth_bp
@@ -104,7 +153,13 @@ def create_app(config_overrides: dict | None = None) -> Flask:
     app.register_blueprint(paperwork_bp)
     app.register_blueprint(tasks_bp, url_prefix="/tasks")
 
+    from app.services.notification_outbox import register_notification_outbox_commands
+
+    register_notification_outbox_commands(app)
+    startup_timer.mark("blueprints")
+
     # --- Global Routes ---
+    from app.services.bulkheads import bulkhead_health
 
     @app.before_request
     def bind_request_logging_context() -> None:
@@ -122,21 +177,37 @@ def create_app(config_overrides: dict | None = None) -> Flask:
             g.response_status_code = 500
         app.logger.info("request.completed")
 
+    readiness_monitor = schema_checks.ReadinessMonitor(
+        app,
+        refresh_interval_seconds=app.config.get("READINESS_REFRESH_INTERVAL_SECONDS", 15),
+        background_refresh=app.config.get("READINESS_BACKGROUND_REFRESH", True),
+    )
+    app.extensions["readiness_monitor"] = readiness_monitor
+
+    @app.get("/livez")
+    def liveness_check():
+        """Dependency-free probe: the worker is up and able to serve requests."""
+        return jsonify({"status": "ok"}), 200
+
     @app.get("/readyz")
     def readiness_check():
         """Used by Cloud Run to verify the container is healthy and DB is connected."""
-        with app.app_context():
-            report = schema_checks.get_readiness_report()
+        report = readiness_monitor.get_report()
+        freshness = {"age_seconds": report["age_seconds"], "checked_at": report["checked_at"]}
+        # Informational: an open circuit means a dependency is down, not that this instance is, so
+        # it must not pull every instance out of rotation at once.
+        components = {**report["components"], "bulkheads": {"ok": True, **bulkhead_health()}}
 
         if report["ok"]:
-            return jsonify({"status": "ok", "components": report["components"]}), 200
+            return jsonify({"status": "ok", "components": components, **freshness}), 200
 
         return (
             jsonify(
                 {
                     "status": "error",
                     "errors": report["errors"],
-                    "components": report["components"],
+                    "components": components,
+                    **freshness,
                 }
             ),
             503,
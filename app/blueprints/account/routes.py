@@ -3,6 +3,8 @@ from flask import Blueprint, flash, g, redirect, render_template, request, url_f
 from app import db
 from app.blueprints.account.forms import ProfileForm, SettingsForm
 from app.blueprints.auth.guards import require_authenticated
+from app.services.notification_settings import invalidate_notification_settings
+from app.services.user_snapshots import invalidate_user_snapshot
 from models import NotificationSettings, Role, User
 
 
@@ -18,7 +20,7 @@ def _has_privileged_access(*, role: Role, employee_approved: bool, is_active: bo
 @account_bp.route("/profile", methods=["GET", "POST"])
 @require_authenticated()
 def profile():
-    user = g.current_user
+    user = db.session.get(User, g.current_user.id)
     form = ProfileForm(obj=user)
 
     if form.validate_on_submit():
@@ -27,6 +29,7 @@ def profile():
         user.phone = form.phone.data.strip() if form.phone.data else None
         user.bio = form.bio.data.strip() if form.bio.data else None
         db.session.commit()
+        invalidate_user_snapshot(user.id)
         flash("Profile updated.", "success")
         return redirect(url_for("account.profile"))
 
@@ -36,13 +39,14 @@ def profile():
 @account_bp.route("/settings", methods=["GET", "POST"])
 @require_authenticated()
 def settings():
-    user = g.current_user
+    user = db.session.get(User, g.current_user.id)
     form = SettingsForm(obj=user)
 
     if form.validate_on_submit():
         user.theme = form.theme.data
         user.email_notifications = form.email_notifications.data
         db.session.commit()
+        invalidate_user_snapshot(user.id)
         flash("Settings saved.", "success")
         return redirect(url_for("account.settings"))
 
@@ -97,6 +101,7 @@ def admin_users():
         user.is_ops = is_ops
         user.is_driver = is_driver
         db.session.commit()
+        invalidate_user_snapshot(user.id)
         flash(f"Updated access for {user.email}.", "success")
         return redirect(url_for("account.admin_users"))
 
@@ -130,6 +135,7 @@ def admin_notifications():
         settings.notify_consignee_drop = request.form.get("notify_consignee_drop") == "on"
         settings.custom_cc_emails = (request.form.get("custom_cc_emails") or "").strip() or None
         db.session.commit()
+        invalidate_notification_settings()
         flash("Notification settings saved.", "success")
         return redirect(url_for("account.admin_notifications"))
 
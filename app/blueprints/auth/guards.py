@@ -5,20 +5,19 @@ from typing import Callable
 
 from flask import abort, g, jsonify, redirect, session, url_for
 
-from app import db
-from models import User
+from app.services.user_snapshots import UserSnapshot, get_user_snapshot
 
 
 def _error_response(message: str, remediation: str, status_code: int):
     return jsonify({"error": message, "remediation": remediation}), status_code
 
 
-def _load_current_user() -> User | None:
-    """Resolve the current user from session state."""
+def _load_current_user() -> UserSnapshot | None:
+    """Resolve the current user snapshot from session state."""
     user_id = session.get("current_user_id")
     if user_id is None:
         return None
-    return db.session.get(User, user_id)
+    return get_user_snapshot(user_id)
 
 
 def require_employee_approval(
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, g, jsonify, Response, send_from_directory
+from flask import Blueprint, render_template, request, flash, redirect, url_for, g, jsonify, Response, send_from_directory, current_app
 import csv
 import base64
 import re
@@ -7,15 +7,27 @@ from io import BytesIO, StringIO
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
+from sqlalchemy import case, delete, insert, literal, select, update
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.datastructures import FileStorage
 
 from app import db
 from models import PODEvent, Role
 from app.blueprints.auth.guards import require_employee_approval
+from app.metrics import record_pod_submission
 from app.services.couchdrop import CouchdropService
 from app.services.gcs import GCSService
-from app.services.tasks import CouchdropTaskPayload, enqueue_couchdrop_task
-from app.services.shipment_workflow import ShipmentTransitionError, apply_pod_transition, normalize_pod_action
+from app.services.paperwork_ledger import mark_failed, paginate_driver_uploads, record_staged
+from app.services.tasks import CouchdropTaskPayload, EmailTaskPayload, enqueue_couchdrop_tasks
+from app.services.shipment_workflow import (
+    ShipmentTransitionError,
+    apply_pod_transition,
+    enqueue_pod_notifications,
+    normalize_pod_action,
+    retry_on_stale_data,
+    validate_transitions,
+)
 from models import ExpectedDelivery
 from models import (
     PODRecord,
@@ -31,12 +43,23 @@ from models import (
 
 paperwork_bp = Blueprint("paperwork", __name__)
 ARIZONA_TZ = ZoneInfo("America/Phoenix")
+BULK_ASSIGN_MAX_HWBS = 500
+# Leg selector -> fixed leg_sequence (None means each shipment's current leg).
+BULK_ASSIGN_LEG_SELECTORS = {"CURRENT": None, "FIRST_MILE": 1, "LAST_MILE": 3}
+OPEN_LEG_STATUSES = (ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED, ShipmentLegStatus.IN_PROGRESS)
 
 
 def _json_error(message: str, remediation: str, status_code: int):
     return jsonify({"error": message, "remediation": remediation}), status_code
 
 
+def _pod_action_label(action_type: str | None) -> str:
+    try:
+        return normalize_pod_action(action_type)
+    except ShipmentTransitionError:
+        return "INVALID"
+
+
 def current_user_role() -> str:
     role = getattr(g.current_user, "role", None)
     raw_role = getattr(role, "value", role)
@@ -252,6 +275,7 @@ def set_load_status(
     longitude: str | None = None,
     photo_blob_name: str | None = None,
     signature_blob_name: str | None = None,
+    notifications: list[EmailTaskPayload] | None = None,
 ) -> None:
     canonical_action = normalize_pod_action(action_type)
     if not load_entry.shipment:
@@ -265,6 +289,7 @@ def set_load_status(
         longitude=longitude,
         photo_blob_name=photo_blob_name,
         signature_blob_name=signature_blob_name,
+        notifications=notifications,
     )
 
 
@@ -326,6 +351,12 @@ def resolve_pod_shipment_context(
     return shipment.id, active_leg.id, active_leg.leg_sequence, leg_type, shipment.hwb_number
 
 
+def _off_sheet_entries(load_entries: list[LegacyLoadView]) -> list[LegacyLoadView]:
+    if is_ops_or_admin_user():
+        return []
+    return [entry for entry in load_entries if entry.assigned_driver != g.current_user.id]
+
+
 def submit_pod(
     *,
     hwb_number: str,
@@ -341,8 +372,13 @@ def submit_pod(
     phone: str | None,
     off_sheet_confirmed: bool,
     reassignment_note: str | None,
+    notifications: list[EmailTaskPayload] | None = None,
 ) -> int:
-    """Persist POD data in hybrid mode and keep legacy POD event logging."""
+    """Persist POD data in hybrid mode and keep legacy POD event logging.
+
+    Shipment notifications are collected into ``notifications`` for the caller to enqueue after
+    its commit. Without a list they are enqueued once the retried unit of work has flushed.
+    """
     canonical_action = normalize_pod_action(action_type)
     action_folder = canonical_action.lower()
     # Conditional Validation
@@ -358,17 +394,19 @@ def submit_pod(
             raise ValueError("Recipient name is required for origin airport drop.")
 
     target_load_entries = get_load_entries_by_identifier(hwb_number)
-    user_has_full_board_rights = is_ops_or_admin_user()
-    off_sheet_entries = [
-        entry
-        for entry in target_load_entries
-        if not user_has_full_board_rights and entry.assigned_driver != g.current_user.id
-    ]
-    is_off_sheet = bool(off_sheet_entries)
-
-    if is_off_sheet and not off_sheet_confirmed:
+    if _off_sheet_entries(target_load_entries) and not off_sheet_confirmed:
         raise ValueError("Off-sheet completion requires confirmation.")
 
+    # Reject the whole MAWB before uploading anything if any of its HWBs cannot take this action.
+    rejections = validate_transitions(
+        [entry.shipment for entry in target_load_entries if entry.shipment],
+        canonical_action,
+    )
+    if rejections and len(target_load_entries) == 1:
+        raise ShipmentTransitionError(rejections[0].error)
+    if rejections:
+        raise ShipmentTransitionError(" ".join(f"HWB {rejection.hwb_number}: {rejection.error}" for rejection in rejections))
+
     # Conditional Uploads
     photo_uri = None
     if pod_photo and getattr(pod_photo, "filename", ""):
@@ -382,85 +420,107 @@ def submit_pod(
         if not sig_uri:
             raise ValueError("Failed to upload signature image.")
 
-    persisted_reassignment_note = None
-    if is_off_sheet and off_sheet_confirmed and off_sheet_entries:
-        from_driver_ids = sorted(
-            {
-                entry.assigned_driver if entry.assigned_driver is not None else "unassigned"
-                for entry in off_sheet_entries
-            },
-            key=str,
-        )
-        note_suffix = f" Note: {reassignment_note.strip()}" if reassignment_note and reassignment_note.strip() else ""
-        persisted_reassignment_note = (
-            "Off-sheet confirmation accepted. Loads reassigned from "
-            f"{', '.join(str(driver_id) for driver_id in from_driver_ids)} to {g.current_user.id}.{note_suffix}"
-        )
+    # Uploads happen once; the database half is retried against fresh rows if a concurrent
+    # dispatch edit or import bumps a shipment/leg version first.
+    prefetched_entries = [target_load_entries]
+    collected_notifications: list[EmailTaskPayload] = []
+
+    def record_pod_entries() -> int:
+        # A retried attempt rebuilds every notification against its own transition ids.
+        collected_notifications.clear()
+        load_entries = prefetched_entries.pop() if prefetched_entries else get_load_entries_by_identifier(hwb_number)
+        off_sheet_entries = _off_sheet_entries(load_entries)
+        if off_sheet_entries and not off_sheet_confirmed:
+            raise ValueError("Off-sheet completion requires confirmation.")
+
+        persisted_reassignment_note = None
+        if off_sheet_entries:
+            from_driver_ids = sorted(
+                {
+                    entry.assigned_driver if entry.assigned_driver is not None else "unassigned"
+                    for entry in off_sheet_entries
+                },
+                key=str,
+            )
+            note_suffix = f" Note: {reassignment_note.strip()}" if reassignment_note and reassignment_note.strip() else ""
+            persisted_reassignment_note = (
+                "Off-sheet confirmation accepted. Loads reassigned from "
+                f"{', '.join(str(driver_id) for driver_id in from_driver_ids)} to {g.current_user.id}.{note_suffix}"
+            )
 
-    for entry in off_sheet_entries:
-        assign_load_to_current_driver(entry)
+        for entry in off_sheet_entries:
+            assign_load_to_current_driver(entry)
 
-    entries_to_process = target_load_entries or [None]
-    for load_board_entry in entries_to_process:
-        shipment_id, leg_id, leg_sequence, leg_type, target_hwb_number = resolve_pod_shipment_context(
-            hwb_number,
-            load_board_entry,
-        )
+        entries_to_process = load_entries or [None]
+        for load_board_entry in entries_to_process:
+            shipment_id, leg_id, leg_sequence, leg_type, target_hwb_number = resolve_pod_shipment_context(
+                hwb_number,
+                load_board_entry,
+            )
 
-        pod_record = PODRecord(
-            hwb_number=target_hwb_number,
-            delivery_photo=photo_uri,
-            signature_image=sig_uri,
-            recipient_name=recipient_name if recipient_name else None,
-            driver_id=g.current_user.id,
-            action_type=canonical_action,
-            off_sheet_confirmed=off_sheet_confirmed,
-            reassignment_note=persisted_reassignment_note,
-            latitude=latitude if latitude else None,
-            longitude=longitude if longitude else None,
-            shipment_id=shipment_id,
-            leg_id=leg_id,
-            leg_sequence=leg_sequence,
-            leg_type=leg_type,
-        )
+            pod_record = PODRecord(
+                hwb_number=target_hwb_number,
+                delivery_photo=photo_uri,
+                signature_image=sig_uri,
+                recipient_name=recipient_name if recipient_name else None,
+                driver_id=g.current_user.id,
+                action_type=canonical_action,
+                off_sheet_confirmed=off_sheet_confirmed,
+                reassignment_note=persisted_reassignment_note,
+                latitude=latitude if latitude else None,
+                longitude=longitude if longitude else None,
+                shipment_id=shipment_id,
+                leg_id=leg_id,
+                leg_sequence=leg_sequence,
+                leg_type=leg_type,
+            )
 
-        if load_board_entry:
-            # Path A: system match
-            pod_record.shipper = load_board_entry.shipper
-            pod_record.consignee = load_board_entry.consignee
-            pod_record.contact_name = load_board_entry.contact_name
-            pod_record.phone = load_board_entry.phone
-            set_load_status(
-                load_board_entry,
-                canonical_action,
-                latitude=latitude,
-                longitude=longitude,
-                photo_blob_name=photo_uri,
-                signature_blob_name=sig_uri,
+            if load_board_entry:
+                # Path A: system match
+                pod_record.shipper = load_board_entry.shipper
+                pod_record.consignee = load_board_entry.consignee
+                pod_record.contact_name = load_board_entry.contact_name
+                pod_record.phone = load_board_entry.phone
+                set_load_status(
+                    load_board_entry,
+                    canonical_action,
+                    latitude=latitude,
+                    longitude=longitude,
+                    photo_blob_name=photo_uri,
+                    signature_blob_name=sig_uri,
+                    notifications=collected_notifications,
+                )
+            else:
+                # Path B: manual POD
+                pod_record.shipper = shipper
+                pod_record.consignee = consignee
+                pod_record.contact_name = contact_name
+                pod_record.phone = phone
+
+            db.session.add(pod_record)
+
+            # Keep existing dashboard status feed functioning.
+            legacy_event = PODEvent(
+                user_id=g.current_user.id,
+                reference_id=target_hwb_number,
+                event_type=canonical_action,
+                latitude=latitude if latitude else None,
+                longitude=longitude if longitude else None,
+                signature_url=sig_uri,
+                photo_url=photo_uri,
             )
-        else:
-            # Path B: manual POD
-            pod_record.shipper = shipper
-            pod_record.consignee = consignee
-            pod_record.contact_name = contact_name
-            pod_record.phone = phone
-
-        db.session.add(pod_record)
-
-        # Keep existing dashboard status feed functioning.
-        legacy_event = PODEvent(
-            user_id=g.current_user.id,
-            reference_id=target_hwb_number,
-            event_type=canonical_action,
-            latitude=latitude if latitude else None,
-            longitude=longitude if longitude else None,
-            signature_url=sig_uri,
-            photo_url=photo_uri,
-        )
-        legacy_event.set_az_timestamp()
-        db.session.add(legacy_event)
+            legacy_event.set_az_timestamp()
+            db.session.add(legacy_event)
 
-    return len(entries_to_process)
+        db.session.flush()
+        return len(entries_to_process)
+
+    processed_count = retry_on_stale_data(record_pod_entries, operation_name="pod_transition")
+    if notifications is None:
+        enqueue_pod_notifications(collected_notifications)
+    else:
+        notifications.extend(collected_notifications)
+    return processed_count
 
 @paperwork_bp.route("/pod/event", methods=["GET", "POST"])
 @require_employee_approval()
@@ -522,6 +582,8 @@ def log_pod_event():
             return redirect(url_for("paperwork.log_pod_event"))
 
     # 3. Database Insertion & Storage Logic Execution
+    action_label = _pod_action_label(action_type)
+    notifications: list[EmailTaskPayload] = []
     try:
         processed_count = submit_pod(
             hwb_number=hwb_number,
@@ -537,22 +599,37 @@ def log_pod_event():
             phone=phone,
             off_sheet_confirmed=off_sheet_confirmed,
             reassignment_note=reassignment_note,
+            notifications=notifications,
         )
         db.session.commit()
     except ShipmentTransitionError as e:
         db.session.rollback()
+        record_pod_submission(action_label, "rejected")
         if is_ajax:
             return _json_error(str(e), "Follow the shipment leg sequence shown in the load board before retrying.", 400)
         flash(f"{str(e)} Remediation: follow the shipment leg sequence in the load board.")
         return redirect(url_for("paperwork.log_pod_event"))
+    except StaleDataError:
+        db.session.rollback()
+        record_pod_submission(action_label, "conflict")
+        if is_ajax:
+            return _json_error(
+                "This shipment was updated by someone else while your POD was saving.",
+                "Reload the load board to see the latest status, then resubmit the POD.",
+                409,
+            )
+        flash("This shipment was updated by someone else while your POD was saving. Remediation: reload and resubmit.")
+        return redirect(url_for("paperwork.log_pod_event"))
     except ValueError as e:
         db.session.rollback()
+        record_pod_submission(action_label, "invalid")
         if is_ajax:
             return _json_error(str(e), "Correct the highlighted input fields and retry submission.", 400)
         flash(f"{str(e)} Remediation: correct the highlighted inputs and retry.")
         return redirect(url_for("paperwork.log_pod_event"))
     except Exception as e:
         db.session.rollback()
+        record_pod_submission(action_label, "error")
         if is_ajax:
             return _json_error(
                 f"Transaction failed: {str(e)}",
@@ -562,6 +639,15 @@ def log_pod_event():
         flash("Transaction failed. Please try again. Remediation: retry once, then contact support with the HWB and timestamp.")
         return redirect(url_for("paperwork.log_pod_event"))
 
+    enqueue_pod_notifications(notifications)
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        # The POD is committed; an outbox row that could not be cleared is only re-driven once
+        # more, and the email task drops the duplicate.
+        db.session.rollback()
+        current_app.logger.exception("shipment.notification_outbox_commit_failed hwb_number=%s", hwb_number)
+    record_pod_submission(action_label, "recorded")
     if is_ajax:
         return jsonify({"success": True, "message": f"Recorded event for {processed_count} shipments."}), 200
 
@@ -761,33 +847,48 @@ def clear_load_board():
             400,
         )
 
+    def clearance_record(hwb_number: str, action_type: str) -> dict:
+        return {
+            "hwb_number": hwb_number,
+            "action_type": action_type,
+            "driver_id": g.current_user.id,
+            "recipient_name": "SYSTEM_RESOLUTION",
+            "delivery_photo": "N/A",
+            "signature_image": "N/A",
+            "reassignment_note": f"Record resolved as {action_type} by User {g.current_user.id}",
+        }
+
     def log_clearance(hwb_number: str, action_type: str) -> None:
-        db.session.add(
-            PODRecord(
-                hwb_number=hwb_number,
-                action_type=action_type,
-                driver_id=g.current_user.id,
-                recipient_name="SYSTEM_RESOLUTION",
-                delivery_photo="N/A",
-                signature_image="N/A",
-                reassignment_note=f"Record resolved as {action_type} by User {g.current_user.id}",
-            )
-        )
+        db.session.add(PODRecord(**clearance_record(hwb_number, action_type)))
 
     cleared_count = 0
     try:
         with db.session.begin_nested():
             if target_hwb == "ALL":
-                shipments = Shipment.query.filter(
-                    Shipment.overall_status.notin_([ShipmentStatus.DELIVERED, ShipmentStatus.CANCELLED])
-                ).all()
-                for shipment in shipments:
-                    if hard_delete:
-                        db.session.delete(shipment)
-                    else:
-                        shipment.overall_status = ShipmentStatus.CANCELLED
-                        log_clearance(shipment.hwb_number, "CANCELLED")
-                    cleared_count += 1
+                # Set-based: one UPDATE/DELETE ... RETURNING and one bulk insert, no per-row ORM loads.
+                # Hard delete leaves legs and transitions to the FKs' ON DELETE CASCADE.
+                open_shipments = Shipment.overall_status.notin_([ShipmentStatus.DELIVERED, ShipmentStatus.CANCELLED])
+                if hard_delete:
+                    cleared_hwbs = db.session.scalars(
+                        delete(Shipment)
+                        .where(open_shipments)
+                        .returning(Shipment.hwb_number)
+                        .execution_options(synchronize_session=False)
+                    ).all()
+                else:
+                    cleared_hwbs = db.session.scalars(
+                        update(Shipment)
+                        .where(open_shipments)
+                        .values(overall_status=ShipmentStatus.CANCELLED, version_id=Shipment.version_id + 1)
+                        .returning(Shipment.hwb_number)
+                        .execution_options(synchronize_session=False)
+                    ).all()
+                    if cleared_hwbs:
+                        db.session.execute(
+                            insert(PODRecord),
+                            [clearance_record(hwb_number, "CANCELLED") for hwb_number in cleared_hwbs],
+                        )
+                cleared_count = len(cleared_hwbs)
             else:
                 shipment = Shipment.query.filter_by(hwb_number=target_hwb).first()
                 if shipment and shipment.overall_status not in [ShipmentStatus.DELIVERED, ShipmentStatus.CANCELLED]:
@@ -838,7 +939,7 @@ def assign_driver_to_load():
     except (TypeError, ValueError):
         return _json_error("Invalid driver id.", "Provide driver_id as a valid integer or null.", 400)
 
-    try:
+    def assign_current_leg():
         shipment = Shipment.query.filter_by(hwb_number=target_hwb).first()
         if not shipment:
             return _json_error(
@@ -863,6 +964,15 @@ def assign_driver_to_load():
 
         db.session.commit()
         return jsonify({"success": True})
+
+    try:
+        return retry_on_stale_data(assign_current_leg, operation_name="assign_driver")
+    except StaleDataError:
+        return _json_error(
+            "This load kept changing while the driver was being assigned.",
+            "Reload the load board and retry the assignment.",
+            409,
+        )
     except Exception as exc:
         db.session.rollback()
         return _json_error(
@@ -872,6 +982,139 @@ def assign_driver_to_load():
         )
 
 
+@paperwork_bp.post("/load-board/assign-driver/bulk")
+@require_employee_approval()
+def bulk_assign_driver():
+    if not is_ops_or_admin_user():
+        return _json_error(
+            "Ops or Admin access required.",
+            "Sign in with an Ops/Admin account or request elevated privileges.",
+            403,
+        )
+
+    payload = request.get_json(silent=True) or {}
+    raw_hwbs = payload.get("hwb_numbers") or []
+    mawb_number = (payload.get("mawb_number") or "").strip()
+    leg_selector = (payload.get("leg") or "CURRENT").strip().upper()
+    driver_id_raw = payload.get("driver_id")
+
+    if not isinstance(raw_hwbs, list) or not all(isinstance(hwb, str) for hwb in raw_hwbs):
+        return _json_error("Invalid HWB list.", "Send hwb_numbers as a JSON array of HWB strings.", 400)
+    hwb_numbers = list(dict.fromkeys(hwb.strip() for hwb in raw_hwbs if hwb.strip()))
+
+    if bool(hwb_numbers) == bool(mawb_number):
+        return _json_error(
+            "Provide either HWB numbers or a MAWB number.",
+            "Send a non-empty hwb_numbers array, or mawb_number to reassign every HWB on that master bill.",
+            400,
+        )
+    if len(hwb_numbers) > BULK_ASSIGN_MAX_HWBS:
+        return _json_error(
+            f"Too many HWBs in one request (maximum {BULK_ASSIGN_MAX_HWBS}).",
+            "Split the selection into smaller batches and retry.",
+            400,
+        )
+    if leg_selector not in BULK_ASSIGN_LEG_SELECTORS:
+        return _json_error(
+            "Invalid leg selector.",
+            f"Use one of: {', '.join(BULK_ASSIGN_LEG_SELECTORS)}.",
+            400,
+        )
+
+    try:
+        driver_id = int(driver_id_raw) if driver_id_raw else None
+    except (TypeError, ValueError):
+        return _json_error("Invalid driver id.", "Provide driver_id as a valid integer or null.", 400)
+    if driver_id is not None and db.session.scalar(
+        select(User.id).where(User.id == driver_id, User.is_driver.is_(True), User.is_active.is_(True))
+    ) is None:
+        return _json_error("Driver not found.", "Pick a driver from the load board driver list and retry.", 404)
+
+    shipment_query = select(Shipment.id, Shipment.hwb_number)
+    if mawb_number:
+        shipment_query = shipment_query.join(ShipmentGroup).where(ShipmentGroup.mawb_number == mawb_number)
+    else:
+        shipment_query = shipment_query.where(Shipment.hwb_number.in_(hwb_numbers))
+    hwb_by_shipment_id = dict(db.session.execute(shipment_query).all())
+
+    if mawb_number:
+        if not hwb_by_shipment_id:
+            return _json_error(
+                "No shipments found for this MAWB.",
+                "Verify the MAWB number or upload its HWBs to the load board first.",
+                404,
+            )
+        hwb_numbers = sorted(hwb_by_shipment_id.values())
+
+    target_sequence = BULK_ASSIGN_LEG_SELECTORS[leg_selector]
+    if target_sequence is None:
+        target_sequence = (
+            select(Shipment.current_leg_index).where(Shipment.id == ShipmentLeg.shipment_id).scalar_subquery()
+        )
+
+    status_type = ShipmentLeg.status.type
+    if driver_id:
+        new_status = case(
+            (ShipmentLeg.status == ShipmentLegStatus.PENDING, literal(ShipmentLegStatus.ASSIGNED, status_type)),
+            else_=ShipmentLeg.status,
+        )
+    else:
+        new_status = case(
+            (ShipmentLeg.status == ShipmentLegStatus.ASSIGNED, literal(ShipmentLegStatus.PENDING, status_type)),
+            else_=ShipmentLeg.status,
+        )
+
+    try:
+        updated_shipment_ids = set()
+        if hwb_by_shipment_id:
+            updated_shipment_ids = set(
+                db.session.scalars(
+                    update(ShipmentLeg)
+                    .where(ShipmentLeg.shipment_id.in_(list(hwb_by_shipment_id)))
+                    .where(ShipmentLeg.leg_sequence == target_sequence)
+                    .where(ShipmentLeg.status.in_(OPEN_LEG_STATUSES))
+                    # Core UPDATEs bypass version_id_col; bump it so in-flight ORM writers see the change.
+                    .values(
+                        assigned_driver_id=driver_id,
+                        status=new_status,
+                        version_id=ShipmentLeg.version_id + 1,
+                    )
+                    .returning(ShipmentLeg.shipment_id)
+                    .execution_options(synchronize_session=False)
+                ).all()
+            )
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        return _json_error(
+            str(exc),
+            "Retry once. If the issue persists, provide the HWBs and error details to support.",
+            500,
+        )
+
+    shipment_id_by_hwb = {hwb: shipment_id for shipment_id, hwb in hwb_by_shipment_id.items()}
+    results = []
+    for hwb_number in hwb_numbers:
+        shipment_id = shipment_id_by_hwb.get(hwb_number)
+        if shipment_id is None:
+            status = "not_found"
+        elif shipment_id in updated_shipment_ids:
+            status = "assigned" if driver_id else "unassigned"
+        else:
+            status = "no_open_leg"
+        results.append({"hwb_number": hwb_number, "status": status})
+
+    return jsonify(
+        {
+            "success": True,
+            "driver_id": driver_id,
+            "leg": leg_selector,
+            "updated_count": len(updated_shipment_ids),
+            "results": results,
+        }
+    )
+
+
 @paperwork_bp.post("/load-board/upload-csv")
 @require_employee_approval()
 def upload_load_board_csv():
@@ -1083,124 +1326,129 @@ def upload_load_board_csv():
 
     applied_rows = [row for row in parsed_rows if row["hwb_number"] not in invalid_hwb_numbers]
 
+    def upsert_applied_rows() -> int:
+        upserted = 0
+        with db.session.begin_nested():
+            for parsed_row in applied_rows:
+                now_utc = datetime.now(timezone.utc)
+                shipment_group = ShipmentGroup.query.filter_by(mawb_number=parsed_row["mawb_number"]).first()
+                if not shipment_group:
+                    shipment_group = ShipmentGroup(
+                        mawb_number=parsed_row["mawb_number"],
+                        carrier="CSV_IMPORT",
+                    )
+                    db.session.add(shipment_group)
+                    db.session.flush()
+
+                shipment_group.origin_airport = parsed_row["origin_airport"]
+                shipment_group.destination_airport = parsed_row["destination_airport"]
+
+                shipment = Shipment.query.filter_by(hwb_number=parsed_row["hwb_number"]).first()
+                if not shipment:
+                    shipment = Shipment(
+                        hwb_number=parsed_row["hwb_number"],
+                        shipment_group_id=shipment_group.id,
+                    )
+                    db.session.add(shipment)
+                    db.session.flush()
+
+                shipment.shipment_group_id = shipment_group.id
+                shipment.shipper_address = parsed_row["shipper_address"]
+                shipment.consignee_address = parsed_row["consignee_address"]
+                status_reconciliation = map_legacy_status_to_leg_state(parsed_row["status"])
+                shipment.overall_status = status_reconciliation["overall_status"]
+                shipment.current_leg_index = status_reconciliation["current_leg_index"]
+
+                legs_by_sequence = {leg.leg_sequence: leg for leg in shipment.legs}
+                if 1 not in legs_by_sequence:
+                    leg1 = ShipmentLeg(
+                        shipment_id=shipment.id,
+                        leg_sequence=1,
+                        leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
+                        from_location_type="SHIPPER",
+                        to_location_type="ORIGIN_AIRPORT",
+                        from_address=parsed_row["shipper_address"],
+                        to_airport=parsed_row["origin_airport"],
+                        assigned_driver_id=parsed_row["first_mile_driver_id"],
+                        status=ShipmentLegStatus.ASSIGNED if parsed_row["first_mile_driver_id"] else ShipmentLegStatus.PENDING,
+                    )
+                    db.session.add(leg1)
+                    legs_by_sequence[1] = leg1
+
+                if 2 not in legs_by_sequence:
+                    leg2 = ShipmentLeg(
+                        shipment_id=shipment.id,
+                        leg_sequence=2,
+                        leg_type=ShipmentLegType.AIRPORT_TO_AIRPORT,
+                        from_location_type="ORIGIN_AIRPORT",
+                        to_location_type="DESTINATION_AIRPORT",
+                        from_airport=parsed_row["origin_airport"],
+                        to_airport=parsed_row["destination_airport"],
+                        status=ShipmentLegStatus.PENDING,
+                    )
+                    db.session.add(leg2)
+                    legs_by_sequence[2] = leg2
+
+                if 3 not in legs_by_sequence:
+                    leg3 = ShipmentLeg(
+                        shipment_id=shipment.id,
+                        leg_sequence=3,
+                        leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE,
+                        from_location_type="DESTINATION_AIRPORT",
+                        to_location_type="CONSIGNEE",
+                        from_airport=parsed_row["destination_airport"],
+                        to_address=parsed_row["consignee_address"],
+                        assigned_driver_id=parsed_row["last_mile_driver_id"],
+                        status=ShipmentLegStatus.ASSIGNED if parsed_row["last_mile_driver_id"] else ShipmentLegStatus.PENDING,
+                    )
+                    db.session.add(leg3)
+                    legs_by_sequence[3] = leg3
+
+                leg1 = legs_by_sequence[1]
+                leg3 = legs_by_sequence[3]
+
+                # Force CSV data to overwrite existing database assignments unconditionally
+                leg1.assigned_driver_id = parsed_row["first_mile_driver_id"]
+                leg3.assigned_driver_id = parsed_row["last_mile_driver_id"]
+
+                # Align leg status with the newly assigned driver state
+                if leg1.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
+                    leg1.status = ShipmentLegStatus.ASSIGNED if leg1.assigned_driver_id else ShipmentLegStatus.PENDING
+
+                if leg3.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
+                    leg3.status = ShipmentLegStatus.ASSIGNED if leg3.assigned_driver_id else ShipmentLegStatus.PENDING
+
+                for leg, desired_state in (
+                    (leg1, status_reconciliation["leg1_status"]),
+                    (leg3, status_reconciliation["leg3_status"]),
+                ):
+                    if desired_state == "pending_or_assigned":
+                        leg.status = ShipmentLegStatus.ASSIGNED if leg.assigned_driver_id else ShipmentLegStatus.PENDING
+                        leg.started_at_utc = None
+                        leg.completed_at_utc = None
+                        continue
+
+                    if desired_state == ShipmentLegStatus.IN_PROGRESS and leg.status == ShipmentLegStatus.COMPLETED:
+                        continue
+
+                    leg.status = desired_state
+                    if desired_state == ShipmentLegStatus.IN_PROGRESS:
+                        leg.started_at_utc = leg.started_at_utc or now_utc
+                        leg.completed_at_utc = None
+                    elif desired_state == ShipmentLegStatus.COMPLETED:
+                        leg.started_at_utc = leg.started_at_utc or now_utc
+                        leg.completed_at_utc = leg.completed_at_utc or now_utc
+
+                # Guardrail: downstream POD workflow transitions validate leg state, not only shipment.overall_status.
+                # Keep this importer leg-first so repeated CSV upserts remain safe and deterministic.
+
+                upserted += 1
+        db.session.commit()
+        return upserted
+
     if applied_rows:
         try:
-            with db.session.begin_nested():
-                for parsed_row in applied_rows:
-                    now_utc = datetime.now(timezone.utc)
-                    shipment_group = ShipmentGroup.query.filter_by(mawb_number=parsed_row["mawb_number"]).first()
-                    if not shipment_group:
-                        shipment_group = ShipmentGroup(
-                            mawb_number=parsed_row["mawb_number"],
-                            carrier="CSV_IMPORT",
-                        )
-                        db.session.add(shipment_group)
-                        db.session.flush()
-
-                    shipment_group.origin_airport = parsed_row["origin_airport"]
-                    shipment_group.destination_airport = parsed_row["destination_airport"]
-
-                    shipment = Shipment.query.filter_by(hwb_number=parsed_row["hwb_number"]).first()
-                    if not shipment:
-                        shipment = Shipment(
-                            hwb_number=parsed_row["hwb_number"],
-                            shipment_group_id=shipment_group.id,
-                        )
-                        db.session.add(shipment)
-                        db.session.flush()
-
-                    shipment.shipment_group_id = shipment_group.id
-                    shipment.shipper_address = parsed_row["shipper_address"]
-                    shipment.consignee_address = parsed_row["consignee_address"]
-                    status_reconciliation = map_legacy_status_to_leg_state(parsed_row["status"])
-                    shipment.overall_status = status_reconciliation["overall_status"]
-                    shipment.current_leg_index = status_reconciliation["current_leg_index"]
-
-                    legs_by_sequence = {leg.leg_sequence: leg for leg in shipment.legs}
-                    if 1 not in legs_by_sequence:
-                        leg1 = ShipmentLeg(
-                            shipment_id=shipment.id,
-                            leg_sequence=1,
-                            leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
-                            from_location_type="SHIPPER",
-                            to_location_type="ORIGIN_AIRPORT",
-                            from_address=parsed_row["shipper_address"],
-                            to_airport=parsed_row["origin_airport"],
-                            assigned_driver_id=parsed_row["first_mile_driver_id"],
-                            status=ShipmentLegStatus.ASSIGNED if parsed_row["first_mile_driver_id"] else ShipmentLegStatus.PENDING,
-                        )
-                        db.session.add(leg1)
-                        legs_by_sequence[1] = leg1
-
-                    if 2 not in legs_by_sequence:
-                        leg2 = ShipmentLeg(
-                            shipment_id=shipment.id,
-                            leg_sequence=2,
-                            leg_type=ShipmentLegType.AIRPORT_TO_AIRPORT,
-                            from_location_type="ORIGIN_AIRPORT",
-                            to_location_type="DESTINATION_AIRPORT",
-                            from_airport=parsed_row["origin_airport"],
-                            to_airport=parsed_row["destination_airport"],
-                            status=ShipmentLegStatus.PENDING,
-                        )
-                        db.session.add(leg2)
-                        legs_by_sequence[2] = leg2
-
-                    if 3 not in legs_by_sequence:
-                        leg3 = ShipmentLeg(
-                            shipment_id=shipment.id,
-                            leg_sequence=3,
-                            leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE,
-                            from_location_type="DESTINATION_AIRPORT",
-                            to_location_type="CONSIGNEE",
-                            from_airport=parsed_row["destination_airport"],
-                            to_address=parsed_row["consignee_address"],
-                            assigned_driver_id=parsed_row["last_mile_driver_id"],
-                            status=ShipmentLegStatus.ASSIGNED if parsed_row["last_mile_driver_id"] else ShipmentLegStatus.PENDING,
-                        )
-                        db.session.add(leg3)
-                        legs_by_sequence[3] = leg3
-
-                    leg1 = legs_by_sequence[1]
-                    leg3 = legs_by_sequence[3]
-
-                    # Force CSV data to overwrite existing database assignments unconditionally
-                    leg1.assigned_driver_id = parsed_row["first_mile_driver_id"]
-                    leg3.assigned_driver_id = parsed_row["last_mile_driver_id"]
-
-                    # Align leg status with the newly assigned driver state
-                    if leg1.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
-                        leg1.status = ShipmentLegStatus.ASSIGNED if leg1.assigned_driver_id else ShipmentLegStatus.PENDING
-
-                    if leg3.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
-                        leg3.status = ShipmentLegStatus.ASSIGNED if leg3.assigned_driver_id else ShipmentLegStatus.PENDING
-
-                    for leg, desired_state in (
-                        (leg1, status_reconciliation["leg1_status"]),
-                        (leg3, status_reconciliation["leg3_status"]),
-                    ):
-                        if desired_state == "pending_or_assigned":
-                            leg.status = ShipmentLegStatus.ASSIGNED if leg.assigned_driver_id else ShipmentLegStatus.PENDING
-                            leg.started_at_utc = None
-                            leg.completed_at_utc = None
-                            continue
-
-                        if desired_state == ShipmentLegStatus.IN_PROGRESS and leg.status == ShipmentLegStatus.COMPLETED:
-                            continue
-
-                        leg.status = desired_state
-                        if desired_state == ShipmentLegStatus.IN_PROGRESS:
-                            leg.started_at_utc = leg.started_at_utc or now_utc
-                            leg.completed_at_utc = None
-                        elif desired_state == ShipmentLegStatus.COMPLETED:
-                            leg.started_at_utc = leg.started_at_utc or now_utc
-                            leg.completed_at_utc = leg.completed_at_utc or now_utc
-
-                    # Guardrail: downstream POD workflow transitions validate leg state, not only shipment.overall_status.
-                    # Keep this importer leg-first so repeated CSV upserts remain safe and deterministic.
-
-                    upserted_count += 1
-            db.session.commit()
+            upserted_count = retry_on_stale_data(upsert_applied_rows, operation_name="load_board_import")
         except Exception:
             db.session.rollback()
             flash("Load board CSV failed due to a transaction error. No rows were applied.")
@@ -1283,31 +1531,63 @@ def upload():
             flash("Batch exceeds 100 file limit.")
             return redirect(request.url)
 
-        success_count = 0
-        for file in files:
-            staged_payload = CouchdropService.stage_driver_paperwork_for_task(g.current_user, file)
-            if not staged_payload:
-                continue
-            enqueue_couchdrop_task(CouchdropTaskPayload(**staged_payload))
-            if staged_payload.get("idempotency_key"):
-                success_count += 1
-        
-        # Return lightweight JSON for sequential client-side uploads
+        # Stage every file concurrently, then enqueue the staged ones as one batch.
+        staged = CouchdropService.stage_paperwork_batch(g.current_user, files)
+        results = []
+        queued_indexes = []
+        for index, (file, staged_payload) in enumerate(zip(files, staged)):
+            result = {"filename": file.filename, "status": "failed"}
+            if isinstance(staged_payload, Exception):
+                result["error"] = "Staging failed."
+            elif not staged_payload:
+                result["error"] = "File is empty or unnamed."
+            else:
+                result["idempotency_key"] = staged_payload["idempotency_key"]
+                if staged_payload.pop("duplicate", False):
+                    result["status"] = "duplicate"
+                else:
+                    queued_indexes.append(index)
+            results.append(result)
+
+        # Ledger rows exist before the tasks, so a task never runs ahead of its row.
+        record_staged([staged[index] for index in queued_indexes])
+        enqueue_errors = enqueue_couchdrop_tasks(
+            [CouchdropTaskPayload(**staged[index]) for index in queued_indexes]
+        )
+        for index, error in zip(queued_indexes, enqueue_errors):
+            if error is None:
+                results[index]["status"] = "queued"
+            else:
+                current_app.logger.error("paperwork.enqueue_failed filename=%s error=%s", files[index].filename, error)
+                mark_failed(staged[index]["idempotency_key"], "enqueue_failed")
+                results[index]["error"] = "Queueing failed."
+        success_count = sum(1 for result in results if result["status"] in {"queued", "duplicate"})
+
+        # Per-file results let the client report progress for each document
         if is_ajax:
-            return jsonify({"success_count": success_count}), 200
+            return jsonify({"success_count": success_count, "results": results}), 200
         
         # Fallback for standard synchronous post
         flash(f"Successfully uploaded {success_count} documents.")
         return redirect(url_for("paperwork.history"))
 
-    return render_template("paperwork/upload.html", title="Batch Upload")
+    return render_template(
+        "paperwork/upload.html",
+        title="Batch Upload",
+        max_request_bytes=current_app.config.get("MAX_CONTENT_LENGTH") or 0,
+    )
 
 
 # --- 3. EXISTING: History Route ---
 @paperwork_bp.get("/history")
 @require_employee_approval()
 def history():
-    return render_template("paperwork/history.html", title="Upload History")
+    uploads = paginate_driver_uploads(
+        g.current_user.id,
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 25, type=int),
+    )
+    return render_template("paperwork/history.html", title="Upload History", uploads=uploads)
 
 # --- 4. NEW: Ops Dashboard UI ---
 @paperwork_bp.route("/ops/dashboard")
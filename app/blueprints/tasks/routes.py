@@ -3,22 +3,33 @@ from __future__ import annotations
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, current_app, g, jsonify, request
 
 from app import csrf, db
+from app.instrumentation import track_outbound
+from app.metrics import record_task_outcome
 from app.services.couchdrop import CouchdropService
+from app.services.email_deliveries import already_sent, delivery_key, record_sent
 from app.services.gcs import generate_signed_url
+from app.services.paperwork_ledger import begin_upload, finish_upload
 from app.services.postmark import ALLOWED_SHIPMENT_ALERT_ACTIONS, send_shipment_alert
+from app.services.task_auth import get_task_token_verifier
 from models import Shipment, User
 
 tasks_bp = Blueprint("tasks", __name__)
 
+_TASK_METRIC_NAMES = {
+    "tasks.send_email_task": "send_email",
+    "tasks.upload_couchdrop_task": "upload_couchdrop",
+}
+
 
 def _error_response(message: str, remediation: str, status_code: int):
     return jsonify({"error": message, "remediation": remediation}), status_code
 
 
 def _log_task_validation_failure(reason: str, payload: dict[str, object]) -> None:
+    g.task_failure_reason = reason
     current_app.logger.warning(
         "send_email_task validation failed reason=%s shipment_id=%s action_type=%s actor_user_id=%s task_name=%s request_id=%s",
         reason,
@@ -118,11 +129,33 @@ def _validate_task_request(expected_path: str) -> tuple[dict[str, str], int] | N
     return None
 
 
-def _verify_task_oidc_token(token: str, audience: str) -> dict[str, object]:
-    from google.auth.transport.requests import Request
-    from google.oauth2 import id_token
+def _task_outcome(response) -> tuple[str, str]:
+    body = response.get_json(silent=True)
+    body = body if isinstance(body, dict) else {}
+    error = body.get("error")
+    reason = body.get("reason") or (error.get("reason") if isinstance(error, dict) else None)
+
+    if response.status_code < 400:
+        outcome = "skipped" if body.get("status") == "skipped" else "ok"
+        return outcome, str(reason or outcome)
 
-    return id_token.verify_oauth2_token(token, Request(), audience=audience)
+    reason = reason or getattr(g, "task_failure_reason", None)
+    if reason is None:
+        reason = "auth_rejected" if response.status_code == 403 else f"http_{response.status_code}"
+    return "error", str(reason)
+
+
+@tasks_bp.after_request
+def record_task_handler_outcome(response):
+    task = _TASK_METRIC_NAMES.get(request.endpoint)
+    if task is not None:
+        outcome, reason = _task_outcome(response)
+        record_task_outcome(task, outcome, reason)
+    return response
+
+
+def _verify_task_oidc_token(token: str, audience: str) -> dict[str, object]:
+    return get_task_token_verifier().verify(token, audience)
 
 
 @tasks_bp.post("/api/tasks/send-email")
@@ -147,6 +180,7 @@ def send_email_task() -> tuple[dict[str, str], int]:
     driver_name = payload.get("driver_name")
     photo_blob_name = payload.get("photo_blob_name")
     signature_blob_name = payload.get("signature_blob_name")
+    transition_id = payload.get("transition_id")
 
     if shipment_id is None or actor_user_id is None or not action_type:
         _log_task_validation_failure("missing_required_fields", payload)
@@ -193,6 +227,29 @@ def send_email_task() -> tuple[dict[str, str], int]:
             400,
         )
 
+    transition_id_int = None
+    if transition_id is not None:
+        try:
+            transition_id_int = int(transition_id)
+        except (TypeError, ValueError):
+            _log_task_validation_failure("malformed_transition_id", payload)
+            return _error_response(
+                "Invalid transition_id for email task.",
+                "Provide transition_id as an integer value, or omit it.",
+                400,
+            )
+
+    # Cloud Tasks delivers at least once: a retry after a timeout must not email customers twice.
+    dedup_key = delivery_key(shipment_id_int, normalized_action_type, transition_id_int, task_name)
+    if dedup_key is not None and already_sent(dedup_key):
+        current_app.logger.info(
+            "Shipment alert task skipped: already sent delivery_key=%s task_name=%s request_id=%s",
+            dedup_key,
+            task_name,
+            request_id,
+        )
+        return jsonify({"status": "skipped", "reason": "already_sent"}), 200
+
     shipment = db.session.get(Shipment, shipment_id_int)
     if shipment is not None:
         shipper_email = shipper_email or shipment.shipper_email
@@ -248,6 +305,8 @@ def send_email_task() -> tuple[dict[str, str], int]:
             driver_name=driver_name if isinstance(driver_name, str) else None,
             photo_url=photo_url,
             signature_url=signature_url,
+            photo_blob_name=_get_raw_string(photo_blob_name),
+            signature_blob_name=_get_raw_string(signature_blob_name),
             shipper_email=shipper_email,
             consignee_email=consignee_email,
             timestamp=timestamp,
@@ -288,6 +347,14 @@ def send_email_task() -> tuple[dict[str, str], int]:
             500,
         )
 
+    if dedup_key is not None:
+        record_sent(
+            dedup_key,
+            shipment_id=shipment_id_int,
+            action_type=normalized_action_type,
+            transition_id=transition_id_int,
+            task_name=task_name,
+        )
     return jsonify({"status": "ok"}), 200
 
 
@@ -305,19 +372,35 @@ def upload_couchdrop_task() -> tuple[dict[str, str], int]:
     content_type = str(payload.get("content_type") or "").strip() or "application/octet-stream"
     idempotency_key = str(payload.get("idempotency_key") or "").strip()
 
-    if not staged_blob_name or not remote_path or not original_filename or not idempotency_key:
+    actor_user_id = payload.get("actor_user_id")
+
+    if not staged_blob_name or not remote_path or not original_filename or not idempotency_key or actor_user_id is None:
         return _error_response(
             "Missing required couchdrop task payload fields.",
-            "Provide staged_blob_name, remote_path, original_filename, and idempotency_key in the payload.",
+            "Provide actor_user_id, staged_blob_name, remote_path, original_filename, and idempotency_key in the payload.",
             400,
         )
 
+    upload = begin_upload(
+        {
+            "idempotency_key": idempotency_key,
+            "actor_user_id": actor_user_id,
+            "original_filename": original_filename,
+            "content_type": content_type,
+            "staged_blob_name": staged_blob_name,
+            "remote_path": remote_path,
+        }
+    )
+    if upload is None:
+        return jsonify({"status": "skipped", "reason": "already_uploaded", "idempotency_key": idempotency_key}), 200
+
     uploaded, reason = CouchdropService.upload_staged_paperwork(
         staged_blob_name=staged_blob_name,
         remote_path=remote_path,
         filename=original_filename,
         content_type=content_type,
     )
+    finish_upload(upload, uploaded, reason)
     if not uploaded:
         if reason in {"staged_blob_missing", "staged_blob_empty"}:
             return jsonify({"status": "skipped", "reason": reason, "idempotency_key": idempotency_key}), 200
@@ -363,16 +446,17 @@ def test_email_connectivity():
     }
 
     try:
-        response = requests.post(
-            "https://api.postmarkapp.com/email",
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "X-Postmark-Server-Token": token,
-            },
-            json=payload,
-            timeout=10,
-        )
+        with track_outbound("postmark"):
+            response = requests.post(
+                "https://api.postmarkapp.com/email",
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "X-Postmark-Server-Token": token,
+                },
+                json=payload,
+                timeout=10,
+            )
         
         if response.status_code == 200:
             return "SUCCESS: Standard email sent. API Token and Stream are valid.", 200
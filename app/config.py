@@ -31,11 +31,41 @@ class RuntimeSettings(BaseModel):
     DB_POOL_RECYCLE: int = 1800
     DB_POOL_PRE_PING: bool = True
     MAX_CONTENT_LENGTH_MB: int = 16
+    USER_SNAPSHOT_TTL_SECONDS: int = 30
+    READINESS_REFRESH_INTERVAL_SECONDS: int = 15
+    READINESS_COMPONENT_TIMEOUT_SECONDS: int = 5
+    READINESS_BACKGROUND_REFRESH: bool = True
+    SERVER_TIMING_ENABLED: bool = True
+    METRICS_AUTH_TOKEN: str = ""
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+    QUERY_REPEAT_WARN_THRESHOLD: int = 0
+    STALE_DATA_RETRY_ATTEMPTS: int = 3
+    OUTBOUND_HTTP_POOL_MAXSIZE: int = 10
+    OUTBOUND_HTTP_RETRY_ATTEMPTS: int = 3
+    OUTBOUND_HTTP_RETRY_BACKOFF_MS: int = 200
+    COUCHDROP_FOLDER_CACHE_TTL_SECONDS: int = 600
+    PAPERWORK_STAGING_WORKERS: int = 4
+    PAPERWORK_STALE_UPLOAD_SECONDS: int = 21600
+    POSTMARK_BATCH_WINDOW_MS: int = 0
+    POSTMARK_BATCH_MAX_MESSAGES: int = 500
+    NOTIFICATION_SETTINGS_TTL_SECONDS: int = 30
+    ATTACHMENT_CACHE_DIR: str = ""
+    ATTACHMENT_CACHE_MAX_ENTRIES: int = 64
+    ATTACHMENT_CACHE_DISK_MAX_MB: int = 64
+    ATTACHMENT_MAX_DIMENSION_PX: int = 1600
+    ATTACHMENT_PAYLOAD_BUDGET_KB: int = 4096
+    BULKHEAD_MAX_CONCURRENT: int = 3
+    BULKHEAD_MAX_QUEUE: int = 4
+    BULKHEAD_QUEUE_WAIT_MS: int = 1000
+    BULKHEAD_FAILURE_THRESHOLD: int = 5
+    BULKHEAD_RESET_SECONDS: int = 30
 
     SESSION_COOKIE_SECURE: bool | None = None
     REMEMBER_COOKIE_SECURE: bool | None = None
     LOAD_BOARD_USE_SHIPMENTS: bool = False
     SCHEMA_FAIL_FAST_ON_STARTUP: bool | None = None
+    SCHEMA_ASSERT_DEFERRED: bool = True
+    JINJA_BYTECODE_CACHE_DIR: str = ""
 
     DB_USER: str = ""
     DB_PASS: str = ""
@@ -44,6 +74,10 @@ class RuntimeSettings(BaseModel):
 
     POSTMARK_SERVER_TOKEN: str = ""
     POSTMARK_FROM_EMAIL: str = ""
+    POSTMARK_API_URL: str = "https://api.postmarkapp.com"
+    COUCHDROP_API_URL: str = "https://api.couchdrop.io"
+    COUCHDROP_FILEIO_URL: str = "https://fileio.couchdrop.io"
+    GOOGLE_OAUTH2_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
     GCP_PROJECT_ID: str = ""
     GCP_REGION: str = "us-central1"
 
@@ -54,6 +88,7 @@ class RuntimeSettings(BaseModel):
     TASKS_EXPECTED_INVOKER_SERVICE_ACCOUNT_EMAIL: str | None = None
     TASKS_EXPECTED_AUDIENCE: str | None = None
     TASKS_SHARED_SECRET: str = ""
+    TASKS_OIDC_CERTS_FILE: str = ""
 
     @computed_field(return_type=bool)
     @property
@@ -67,6 +102,26 @@ class RuntimeSettings(BaseModel):
         "DB_POOL_TIMEOUT",
         "DB_POOL_RECYCLE",
         "MAX_CONTENT_LENGTH_MB",
+        "USER_SNAPSHOT_TTL_SECONDS",
+        "READINESS_REFRESH_INTERVAL_SECONDS",
+        "READINESS_COMPONENT_TIMEOUT_SECONDS",
+        "STALE_DATA_RETRY_ATTEMPTS",
+        "OUTBOUND_HTTP_POOL_MAXSIZE",
+        "OUTBOUND_HTTP_RETRY_ATTEMPTS",
+        "OUTBOUND_HTTP_RETRY_BACKOFF_MS",
+        "COUCHDROP_FOLDER_CACHE_TTL_SECONDS",
+        "PAPERWORK_STAGING_WORKERS",
+        "PAPERWORK_STALE_UPLOAD_SECONDS",
+        "POSTMARK_BATCH_MAX_MESSAGES",
+        "NOTIFICATION_SETTINGS_TTL_SECONDS",
+        "ATTACHMENT_CACHE_MAX_ENTRIES",
+        "ATTACHMENT_CACHE_DISK_MAX_MB",
+        "ATTACHMENT_MAX_DIMENSION_PX",
+        "ATTACHMENT_PAYLOAD_BUDGET_KB",
+        "BULKHEAD_MAX_CONCURRENT",
+        "BULKHEAD_QUEUE_WAIT_MS",
+        "BULKHEAD_FAILURE_THRESHOLD",
+        "BULKHEAD_RESET_SECONDS",
         mode="after",
     )
     @classmethod
@@ -145,6 +200,11 @@ class RuntimeSettings(BaseModel):
                 "Production configuration is invalid. Set the following environment variables "
                 f"(Secret Manager recommended): {', '.join(missing_keys)}"
             )
+        if self.TASKS_OIDC_CERTS_FILE:
+            raise SystemExit(
+                "Production configuration is invalid. TASKS_OIDC_CERTS_FILE replaces Google's signing "
+                "certificates and is only for tests and emulators; unset it."
+            )
 
 
 def _is_production() -> bool:
@@ -185,6 +245,34 @@ def get_runtime_config() -> dict:
             "pool_pre_ping": settings.DB_POOL_PRE_PING,
         },
         "MAX_CONTENT_LENGTH": settings.MAX_CONTENT_LENGTH_MB * 1024 * 1024,
+        "USER_SNAPSHOT_TTL_SECONDS": settings.USER_SNAPSHOT_TTL_SECONDS,
+        "READINESS_REFRESH_INTERVAL_SECONDS": settings.READINESS_REFRESH_INTERVAL_SECONDS,
+        "READINESS_COMPONENT_TIMEOUT_SECONDS": settings.READINESS_COMPONENT_TIMEOUT_SECONDS,
+        "READINESS_BACKGROUND_REFRESH": settings.READINESS_BACKGROUND_REFRESH,
+        "SERVER_TIMING_ENABLED": settings.SERVER_TIMING_ENABLED,
+        "METRICS_AUTH_TOKEN": settings.METRICS_AUTH_TOKEN,
+        "SLOW_QUERY_THRESHOLD_MS": settings.SLOW_QUERY_THRESHOLD_MS,
+        "QUERY_REPEAT_WARN_THRESHOLD": settings.QUERY_REPEAT_WARN_THRESHOLD,
+        "STALE_DATA_RETRY_ATTEMPTS": settings.STALE_DATA_RETRY_ATTEMPTS,
+        "OUTBOUND_HTTP_POOL_MAXSIZE": settings.OUTBOUND_HTTP_POOL_MAXSIZE,
+        "OUTBOUND_HTTP_RETRY_ATTEMPTS": settings.OUTBOUND_HTTP_RETRY_ATTEMPTS,
+        "OUTBOUND_HTTP_RETRY_BACKOFF_MS": settings.OUTBOUND_HTTP_RETRY_BACKOFF_MS,
+        "COUCHDROP_FOLDER_CACHE_TTL_SECONDS": settings.COUCHDROP_FOLDER_CACHE_TTL_SECONDS,
+        "PAPERWORK_STAGING_WORKERS": settings.PAPERWORK_STAGING_WORKERS,
+        "PAPERWORK_STALE_UPLOAD_SECONDS": settings.PAPERWORK_STALE_UPLOAD_SECONDS,
+        "POSTMARK_BATCH_WINDOW_MS": settings.POSTMARK_BATCH_WINDOW_MS,
+        "POSTMARK_BATCH_MAX_MESSAGES": settings.POSTMARK_BATCH_MAX_MESSAGES,
+        "NOTIFICATION_SETTINGS_TTL_SECONDS": settings.NOTIFICATION_SETTINGS_TTL_SECONDS,
+        "ATTACHMENT_CACHE_DIR": settings.ATTACHMENT_CACHE_DIR,
+        "ATTACHMENT_CACHE_MAX_ENTRIES": settings.ATTACHMENT_CACHE_MAX_ENTRIES,
+        "ATTACHMENT_CACHE_DISK_MAX_MB": settings.ATTACHMENT_CACHE_DISK_MAX_MB,
+        "ATTACHMENT_MAX_DIMENSION_PX": settings.ATTACHMENT_MAX_DIMENSION_PX,
+        "ATTACHMENT_PAYLOAD_BUDGET_KB": settings.ATTACHMENT_PAYLOAD_BUDGET_KB,
+        "BULKHEAD_MAX_CONCURRENT": settings.BULKHEAD_MAX_CONCURRENT,
+        "BULKHEAD_MAX_QUEUE": settings.BULKHEAD_MAX_QUEUE,
+        "BULKHEAD_QUEUE_WAIT_MS": settings.BULKHEAD_QUEUE_WAIT_MS,
+        "BULKHEAD_FAILURE_THRESHOLD": settings.BULKHEAD_FAILURE_THRESHOLD,
+        "BULKHEAD_RESET_SECONDS": settings.BULKHEAD_RESET_SECONDS,
         "DEBUG": settings.DEBUG,
         "PORT": settings.PORT,
         "SESSION_COOKIE_SECURE": settings.SESSION_COOKIE_SECURE,
@@ -192,6 +280,10 @@ def get_runtime_config() -> dict:
         "LOAD_BOARD_USE_SHIPMENTS": settings.LOAD_BOARD_USE_SHIPMENTS,
         "POSTMARK_SERVER_TOKEN": settings.POSTMARK_SERVER_TOKEN,
         "POSTMARK_FROM_EMAIL": settings.POSTMARK_FROM_EMAIL,
+        "POSTMARK_API_URL": settings.POSTMARK_API_URL.rstrip("/"),
+        "COUCHDROP_API_URL": settings.COUCHDROP_API_URL.rstrip("/"),
+        "COUCHDROP_FILEIO_URL": settings.COUCHDROP_FILEIO_URL.rstrip("/"),
+        "GOOGLE_OAUTH2_CERTS_URL": settings.GOOGLE_OAUTH2_CERTS_URL,
         "GCP_PROJECT_ID": settings.GCP_PROJECT_ID,
         "GCP_REGION": settings.GCP_REGION,
         "EMAIL_QUEUE_NAME": settings.EMAIL_QUEUE_NAME,
@@ -202,5 +294,8 @@ def get_runtime_config() -> dict:
         "TASKS_EXPECTED_INVOKER_SERVICE_ACCOUNT_EMAIL": settings.TASKS_EXPECTED_INVOKER_SERVICE_ACCOUNT_EMAIL,
         "TASKS_EXPECTED_AUDIENCE": settings.TASKS_EXPECTED_AUDIENCE,
         "TASKS_SHARED_SECRET": settings.TASKS_SHARED_SECRET,
+        "TASKS_OIDC_CERTS_FILE": settings.TASKS_OIDC_CERTS_FILE,
         "SCHEMA_FAIL_FAST_ON_STARTUP": settings.SCHEMA_FAIL_FAST_ON_STARTUP,
+        "SCHEMA_ASSERT_DEFERRED": settings.SCHEMA_ASSERT_DEFERRED,
+        "JINJA_BYTECODE_CACHE_DIR": settings.JINJA_BYTECODE_CACHE_DIR,
     }
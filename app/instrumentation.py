@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from flask import Flask, current_app, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import observe_outbound
+from app.query_inspection import log_if_slow, normalize_statement, repeated_statements
+
+_query_hooks_lock = threading.Lock()
+_query_hooks_installed = False
+
+
+@dataclass
+class RequestTiming:
+    """Wall, DB, and outbound time accumulated while serving one request."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_ms: float = 0.0
+    outbound_ms: dict[str, float] = field(default_factory=dict)
+    statement_counts: Counter = field(default_factory=Counter)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def record_query(self, statement: str, elapsed_ms: float) -> None:
+        self.db_queries += 1
+        self.db_ms += elapsed_ms
+        self.statement_counts[normalize_statement(statement)] += 1
+
+    def record_outbound(self, dependency: str, elapsed_ms: float) -> None:
+        self.outbound_ms[dependency] = self.outbound_ms.get(dependency, 0.0) + elapsed_ms
+
+    def server_timing_header(self) -> str:
+        entries = [
+            f"app;dur={self.elapsed_ms():.1f}",
+            f'db;desc="{self.db_queries} queries";dur={self.db_ms:.1f}',
+        ]
+        entries.extend(f"{name};dur={elapsed:.1f}" for name, elapsed in self.outbound_ms.items())
+        return ", ".join(entries)
+
+    def log_fields(self) -> dict[str, str]:
+        return {
+            "duration_ms": f"{self.elapsed_ms():.1f}",
+            "db_queries": str(self.db_queries),
+            "db_ms": f"{self.db_ms:.1f}",
+            "outbound_ms": json.dumps({name: round(elapsed, 1) for name, elapsed in self.outbound_ms.items()}),
+        }
+
+
+EMPTY_LOG_FIELDS = {"duration_ms": "null", "db_queries": "null", "db_ms": "null", "outbound_ms": "{}"}
+
+
+def get_request_timing() -> RequestTiming | None:
+    if not has_request_context():
+        return None
+    return getattr(g, "request_timing", None)
+
+
+@contextmanager
+def track_outbound(dependency: str) -> Iterator[None]:
+    """Record the wrapped call's latency and attribute it to ``dependency`` on the current request."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_seconds = time.perf_counter() - started_at
+        observe_outbound(dependency, elapsed_seconds)
+        timing = get_request_timing()
+        if timing is not None:
+            timing.record_outbound(dependency, elapsed_seconds * 1000)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    log_if_slow(statement, parameters, elapsed_ms)
+    timing = get_request_timing()
+    if timing is not None:
+        timing.record_query(statement, elapsed_ms)
+
+
+def install_query_hooks() -> None:
+    """Listen on every Engine once per process; hooks are no-ops outside a request."""
+    global _query_hooks_installed
+    with _query_hooks_lock:
+        if _query_hooks_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _query_hooks_installed = True
+
+
+def init_request_instrumentation(app: Flask) -> None:
+    install_query_hooks()
+
+    @app.before_request
+    def start_request_timing() -> None:
+        g.request_timing = RequestTiming()
+
+    @app.after_request
+    def add_server_timing_header(response):
+        timing = get_request_timing()
+        if timing is not None and app.config.get("SERVER_TIMING_ENABLED", True):
+            response.headers["Server-Timing"] = timing.server_timing_header()
+        return response
+
+    @app.after_request
+    def warn_on_repeated_statements(response):
+        timing = get_request_timing()
+        limit = app.config.get("QUERY_REPEAT_WARN_THRESHOLD", 0)
+        if timing is not None and limit:
+            for statement, count in repeated_statements(timing.statement_counts, limit):
+                current_app.logger.warning("db.repeated_statement count=%s statement=%s", count, statement)
+        return response
@@ -0,0 +1,245 @@
+"""Prometheus metrics shared by every gunicorn worker.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (``gunicorn.conf.py`` sets it before the app is
+imported), each worker writes its samples to that directory and ``/metrics`` aggregates
+all of them, so a scrape sees the whole container rather than whichever worker answered.
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+import threading
+import time
+
+from flask import Flask, Response, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool, QueuePool
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request wall time by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled DB connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "DB connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+OUTBOUND_LATENCY = Histogram(
+    "outbound_request_duration_seconds",
+    "Latency of calls to external dependencies.",
+    ["dependency"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+OUTBOUND_REQUESTS = Counter(
+    "outbound_requests",
+    "Attempts against external dependencies by outcome (ok, http_error, retried, error, rejected).",
+    ["dependency", "outcome"],
+)
+TASK_OUTCOMES = Counter(
+    "task_handler_outcomes",
+    "Cloud Tasks handler responses by outcome and reason.",
+    ["task", "outcome", "reason"],
+)
+POD_SUBMISSIONS = Counter(
+    "pod_submissions",
+    "POD event submissions by action type and result.",
+    ["action", "result"],
+)
+VERSION_CONFLICTS = Counter(
+    "shipment_version_conflicts",
+    "Optimistic-concurrency conflicts on shipments/legs, by operation and whether the retry recovered.",
+    ["operation", "outcome"],
+)
+POSTMARK_BATCH_MESSAGES = Histogram(
+    "postmark_batch_messages",
+    "Shipment alerts sent per Postmark batchWithTemplates call.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+BULKHEAD_IN_FLIGHT = Gauge(
+    "bulkhead_in_flight",
+    "Calls currently running inside each dependency's bulkhead.",
+    ["dependency"],
+    multiprocess_mode="livesum",
+)
+BULKHEAD_CIRCUIT_OPEN = Gauge(
+    "bulkhead_circuit_open",
+    "1 while a worker's circuit breaker for the dependency is open.",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+BULKHEAD_REJECTIONS = Counter(
+    "bulkhead_rejections",
+    "Calls refused before reaching a dependency, by reason (queue_full, queue_timeout, circuit_open).",
+    ["dependency", "reason"],
+)
+POD_NOTIFICATION_OUTBOX = Counter(
+    "pod_notification_outbox",
+    "Shipment alerts left in the outbox after a failed enqueue (deferred) and later enqueued from it (redriven).",
+    ["outcome"],
+)
+
+_pool_hooks_lock = threading.Lock()
+_pool_hooks_installed = False
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started_at)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    DB_POOL_CONNECTIONS_IN_USE.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    DB_POOL_CONNECTIONS_IN_USE.dec()
+
+
+def _install_pool_hooks() -> None:
+    global _pool_hooks_installed
+    with _pool_hooks_lock:
+        if _pool_hooks_installed:
+            return
+        event.listen(Pool, "checkout", _on_checkout)
+        event.listen(Pool, "checkin", _on_checkin)
+        _pool_hooks_installed = True
+
+
+def observe_outbound(dependency: str, elapsed_seconds: float) -> None:
+    OUTBOUND_LATENCY.labels(dependency=dependency).observe(elapsed_seconds)
+
+
+def record_outbound_request(dependency: str, outcome: str) -> None:
+    OUTBOUND_REQUESTS.labels(dependency=dependency, outcome=outcome).inc()
+
+
+def record_postmark_batch(message_count: int) -> None:
+    POSTMARK_BATCH_MESSAGES.observe(message_count)
+
+
+def set_bulkhead_in_flight(dependency: str, in_flight: int) -> None:
+    BULKHEAD_IN_FLIGHT.labels(dependency=dependency).set(in_flight)
+
+
+def set_bulkhead_circuit_open(dependency: str, is_open: bool) -> None:
+    BULKHEAD_CIRCUIT_OPEN.labels(dependency=dependency).set(1 if is_open else 0)
+
+
+def record_bulkhead_rejection(dependency: str, reason: str) -> None:
+    BULKHEAD_REJECTIONS.labels(dependency=dependency, reason=reason).inc()
+
+
+def record_task_outcome(task: str, outcome: str, reason: str) -> None:
+    TASK_OUTCOMES.labels(task=task, outcome=outcome, reason=reason).inc()
+
+
+def record_pod_submission(action: str, result: str) -> None:
+    POD_SUBMISSIONS.labels(action=action, result=result).inc()
+
+
+def record_version_conflict(operation: str, outcome: str) -> None:
+    VERSION_CONFLICTS.labels(operation=operation, outcome=outcome).inc()
+
+
+def record_pod_notification_outbox(outcome: str) -> None:
+    POD_NOTIFICATION_OUTBOX.labels(outcome=outcome).inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    registry = REGISTRY
+    if os.getenv(MULTIPROC_DIR_ENV):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _scrape_authorized(app: Flask) -> bool:
+    expected_token = (app.config.get("METRICS_AUTH_TOKEN") or "").strip()
+    auth_header = (request.headers.get("Authorization") or "").strip()
+    if expected_token and auth_header.startswith("Bearer "):
+        if hmac.compare_digest(auth_header.removeprefix("Bearer ").strip(), expected_token):
+            return True
+
+    user = getattr(g, "current_user", None)
+    if user is None or not user.can_access_portal():
+        return False
+
+    from app.services.rbac import evaluate_access
+
+    return evaluate_access(user_role=user.role, resource="admin_panel", action="manage").allowed
+
+
+def init_metrics(app: Flask) -> None:
+    """Register request/pool instrumentation and the ``/metrics`` endpoint.
+
+    Call before ``db.init_app`` so QueuePool-backed engines get the instrumented pool.
+    """
+    engine_options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+    if "pool_size" in engine_options:
+        engine_options.setdefault("poolclass", InstrumentedQueuePool)
+    _install_pool_hooks()
+
+    @app.after_request
+    def observe_request_latency(response):
+        timing = getattr(g, "request_timing", None)
+        if timing is not None and request.endpoint != "metrics":
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_LATENCY.labels(method=request.method, route=route, status=str(response.status_code)).observe(
+                timing.elapsed_ms() / 1000
+            )
+        return response
+
+    def metrics():
+        if not _scrape_authorized(app):
+            return (
+                jsonify(
+                    {
+                        "error": "Metrics access denied.",
+                        "remediation": "Send Authorization: Bearer <METRICS_AUTH_TOKEN> or sign in as an administrator.",
+                    }
+                ),
+                401,
+            )
+        payload, content_type = render_metrics()
+        return Response(payload, content_type=content_type)
+
+    from app import limiter
+
+    app.add_url_rule("/metrics", endpoint="metrics", view_func=limiter.exempt(metrics))
+
+
+def mark_worker_dead(pid: int) -> None:
+    """Drop a dead worker's live gauges from the multiprocess directory."""
+    if not os.getenv(MULTIPROC_DIR_ENV):
+        return
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(pid)
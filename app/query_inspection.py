@@ -0,0 +1,67 @@
+"""Statement fingerprinting for the slow-query log and the N+1 detector.
+
+A fingerprint is the SQL text with literals and placeholder lists collapsed, so
+``WHERE id = 1`` and ``WHERE id = 2`` (or ``IN (?, ?)`` and ``IN (?, ?, ?)``) count as
+the same statement. Bound parameters are never logged; only their types are.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# ``(?<!:)`` keeps Postgres ``::type`` casts out of the ``:name`` placeholder match.
+_PLACEHOLDER = re.compile(r"%\([^)]+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_statement(statement: str) -> str:
+    return hashlib.sha1(normalize_statement(statement).encode("utf-8")).hexdigest()[:12]
+
+
+def redact_parameters(parameters) -> object:
+    """Replace bound values with their type names, keeping the shape for debugging."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return [redact_parameters(row) for row in parameters[:3]] + (["..."] if len(parameters) > 3 else [])
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def log_if_slow(statement: str, parameters, elapsed_ms: float) -> None:
+    if not has_app_context():
+        return
+    threshold_ms = current_app.config.get("SLOW_QUERY_THRESHOLD_MS", 0)
+    if not threshold_ms or elapsed_ms < threshold_ms:
+        return
+    current_app.logger.warning(
+        "db.slow_query elapsed_ms=%.1f fingerprint=%s statement=%s parameters=%s",
+        elapsed_ms,
+        fingerprint_statement(statement),
+        normalize_statement(statement),
+        redact_parameters(parameters),
+    )
+
+
+def repeated_statements(statement_counts: Counter, limit: int) -> list[tuple[str, int]]:
+    """Return ``(normalized statement, count)`` for fingerprints run more than ``limit`` times."""
+    return [(statement, count) for statement, count in statement_counts.most_common() if count > limit]
@@ -1,13 +1,25 @@
 import os
-from collections.abc import Iterable
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
 
+from flask import Flask, current_app, jsonify, request
 from sqlalchemy import inspect, text
 
 from app import db
+from app.services.google_clients import get_storage_client
 
 
 REQUIRED_COLUMNS: tuple[tuple[str, str], ...] = (
     ("load_board", "mawb_number"),
+    ("shipments", "version_id"),
+    ("shipment_legs", "version_id"),
+    ("paperwork_uploads", "idempotency_key"),
+    ("notification_settings", "version_id"),
+    ("email_deliveries", "delivery_key"),
+    ("pending_notifications", "transition_id"),
 )
 
 
@@ -73,10 +85,7 @@ def _check_gcs_bucket_metadata() -> dict:
         }
 
     try:
-        from google.cloud import storage
-
-        client = storage.Client()
-        client.get_bucket(bucket_name)
+        get_storage_client().get_bucket(bucket_name)
         return {"ok": True, "error": None, "bucket": bucket_name}
     except Exception as exc:
         return {
@@ -90,16 +99,55 @@ def _check_gcs_bucket_metadata() -> dict:
         }
 
 
-def get_readiness_report(required_columns: Iterable[tuple[str, str]] = REQUIRED_COLUMNS) -> dict:
-    schema_report = get_required_schema_report(required_columns)
-    database_report = _check_database_liveness()
-    gcs_report = _check_gcs_bucket_metadata()
+def _run_component_checks(checks: dict[str, Callable[[], dict]], timeout_seconds: float) -> dict[str, dict]:
+    """Run readiness checks concurrently, each inside its own app context, bounded by one deadline."""
+    app = current_app._get_current_object()
 
-    components = {
-        "schema": schema_report,
-        "database": database_report,
-        "gcs": gcs_report,
-    }
+    def _run_in_app_context(check: Callable[[], dict]) -> dict:
+        with app.app_context():
+            return check()
+
+    executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="readiness")
+    try:
+        futures = {name: executor.submit(_run_in_app_context, check) for name, check in checks.items()}
+        wait(futures.values(), timeout=timeout_seconds)
+    finally:
+        # Never block on a hung dependency; a timed-out check finishes in the background.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    components: dict[str, dict] = {}
+    for name, future in futures.items():
+        if not future.done():
+            components[name] = {
+                "ok": False,
+                "error": (
+                    f"Readiness check '{name}' timed out after {timeout_seconds:g}s. "
+                    "Verify the dependency is reachable from this instance."
+                ),
+            }
+            continue
+        try:
+            components[name] = future.result()
+        except Exception as exc:
+            components[name] = {"ok": False, "error": f"Readiness check '{name}' failed unexpectedly. Details: {exc}"}
+    return components
+
+
+def get_readiness_report(
+    required_columns: Iterable[tuple[str, str]] = REQUIRED_COLUMNS,
+    timeout_seconds: float | None = None,
+) -> dict:
+    if timeout_seconds is None:
+        timeout_seconds = current_app.config.get("READINESS_COMPONENT_TIMEOUT_SECONDS", 5)
+
+    components = _run_component_checks(
+        {
+            "schema": lambda: get_required_schema_report(required_columns),
+            "database": lambda: _check_database_liveness(),
+            "gcs": lambda: _check_gcs_bucket_metadata(),
+        },
+        timeout_seconds,
+    )
     ok = all(component.get("ok") for component in components.values())
     errors = {name: component["error"] for name, component in components.items() if not component.get("ok")}
 
@@ -110,6 +158,114 @@ def get_readiness_report(required_columns: Iterable[tuple[str, str]] = REQUIRED_
     }
 
 
+class ReadinessMonitor:
+    """Serve the last readiness report from memory while a daemon thread keeps it fresh."""
+
+    def __init__(self, app: Flask, refresh_interval_seconds: float, background_refresh: bool = True) -> None:
+        self.app = app
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.background_refresh = background_refresh
+        self._report: dict | None = None
+        self._checked_at: float | None = None
+        self._checked_at_utc: datetime | None = None
+        self._refresh_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+
+    def refresh(self) -> dict:
+        with self._refresh_lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> dict:
+        with self.app.app_context():
+            report = get_readiness_report()
+        self._report = report
+        self._checked_at = time.monotonic()
+        self._checked_at_utc = datetime.now(timezone.utc)
+        return report
+
+    def _is_stale(self) -> bool:
+        if self._report is None or self._checked_at is None:
+            return True
+        age = time.monotonic() - self._checked_at
+        if self._background_thread_alive():
+            # The refresher owns freshness; only step in if it has fallen well behind.
+            return age > self.refresh_interval_seconds * 3
+        return age > self.refresh_interval_seconds
+
+    def _background_thread_alive(self) -> bool:
+        # Threads do not survive fork, so a thread started in another process does not count.
+        return self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid()
+
+    def _refresh_forever(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval_seconds)
+            try:
+                self.refresh()
+            except Exception:
+                self.app.logger.exception("readiness.refresh_failed")
+
+    def start(self) -> None:
+        if not self.background_refresh or self._background_thread_alive():
+            return
+        self._thread = threading.Thread(target=self._refresh_forever, name="readiness-refresher", daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def _refresh_if_stale(self) -> None:
+        with self._refresh_lock:
+            # A burst of probes queues on the lock; the ones behind the first find a fresh report.
+            if self._is_stale():
+                self._refresh_locked()
+
+    def get_report(self) -> dict:
+        self.start()
+        if self._is_stale():
+            self._refresh_if_stale()
+
+        report = dict(self._report or {})
+        report["age_seconds"] = round(time.monotonic() - self._checked_at, 3)
+        report["checked_at"] = self._checked_at_utc.isoformat()
+        return report
+
+
+class DeferredSchemaAssertion:
+    """``before_request`` gate that runs the startup schema assertion on a worker's first request.
+
+    Keeps DB reflection off the import/boot path. Until the schema verifies, application
+    routes return 503 while probes stay reachable; once verified the gate is a flag check.
+    """
+
+    EXEMPT_ENDPOINTS = frozenset({"liveness_check", "readiness_check", "metrics", "static"})
+
+    def __init__(self) -> None:
+        self._verified = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        if self._verified or request.endpoint in self.EXEMPT_ENDPOINTS:
+            return None
+
+        with self._lock:
+            if self._verified:
+                return None
+            report = get_required_schema_report()
+            if report["ok"]:
+                self._verified = True
+                return None
+
+        current_app.logger.error("schema.assertion_failed")
+        return (
+            jsonify(
+                {
+                    "error": report["error"],
+                    "remediation": "Run `flask db upgrade --directory alembic`, then retry once /readyz reports ok.",
+                }
+            ),
+            503,
+        )
+
+
 def assert_required_schema() -> None:
     report = get_required_schema_report()
     if report["ok"]:
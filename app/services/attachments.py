@@ -0,0 +1,246 @@
+"""Email-sized POD attachments for shipment alerts.
+
+Each photo or signature is read from the ``/POD`` mount, downscaled to an email-sized rendition
+and base64-encoded once. A file no rendition can be made for is linked, never inlined as-is. The encoded attachment is kept in a bounded
+per-worker LRU keyed by blob name and written to ``ATTACHMENT_CACHE_DIR`` so the container's other
+workers and later retries reuse it. POD blob names are never overwritten, so entries are never
+stale; the directory is still capped at ``ATTACHMENT_CACHE_DISK_MAX_MB`` (oldest files evicted first)
+because on Cloud Run the temp dir is in memory.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from flask import current_app
+
+from app.services.gcs import build_media_access_url
+
+POD_MOUNT_ROOT = "/POD"
+ATTACHMENT_CACHE_EXTENSION = "attachment_rendition_cache"
+_JPEG_QUALITY = 80
+
+_cache_lock = threading.Lock()
+
+
+def _get_image_modules():
+    # Imported on first use to keep Pillow off the worker boot path.
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    return Image, ImageOps
+
+
+def local_pod_path(blob_name: str) -> str:
+    clean_blob = str(blob_name).replace("gs://fsi-pod/", "").replace("POD/", "").lstrip("/")
+    return os.path.join(POD_MOUNT_ROOT, clean_blob)
+
+
+def render_for_email(data: bytes, content_type: str, max_dimension: int) -> tuple[bytes, str] | None:
+    """Downscale an image to fit ``max_dimension`` pixels, or ``None`` if it cannot be rendered.
+
+    PNGs (signatures) stay PNG to keep transparency; everything else becomes a JPEG. When the
+    rendition comes out larger than the original, the smaller original is kept.
+    """
+    original_content_type = content_type
+    modules = _get_image_modules()
+    if modules is None:
+        current_app.logger.warning("Attachment rendition skipped: Pillow is not installed")
+        return None
+    Image, ImageOps = modules
+
+    output = BytesIO()
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_dimension, max_dimension))
+            if content_type == "image/png":
+                image.save(output, "PNG", optimize=True)
+            else:
+                image.convert("RGB").save(output, "JPEG", quality=_JPEG_QUALITY, optimize=True)
+                content_type = "image/jpeg"
+    except (OSError, ValueError) as exc:
+        current_app.logger.warning("Attachment rendition skipped: %s", exc)
+        return None
+
+    rendition = output.getvalue()
+    if len(rendition) >= len(data):
+        return data, original_content_type
+    return rendition, content_type
+
+
+class AttachmentRenditionCache:
+    """Bounded LRU of encoded Postmark attachments keyed by blob name, backed by a disk directory."""
+
+    def __init__(self, max_entries: int, cache_dir: str, max_dimension: int, max_disk_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_dimension = max_dimension
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, blob_name: str) -> dict | None:
+        with self._lock:
+            attachment = self._entries.get(blob_name)
+            if attachment is not None:
+                self._entries.move_to_end(blob_name)
+                return attachment
+
+        attachment = self._load_from_disk(blob_name) or self._build(blob_name)
+        if attachment is None:
+            # Not cached: the file may simply not have reached the mount yet.
+            return None
+        with self._lock:
+            self._entries[blob_name] = attachment
+            self._entries.move_to_end(blob_name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return attachment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _disk_path(self, blob_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(blob_name.encode('utf-8')).hexdigest()}.json")
+
+    def _load_from_disk(self, blob_name: str) -> dict | None:
+        try:
+            with open(self._disk_path(blob_name), encoding="utf-8") as cached:
+                return json.load(cached)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            current_app.logger.warning("Attachment cache entry unreadable for %s: %s", blob_name, exc)
+            return None
+
+    def _write_to_disk(self, blob_name: str, attachment: dict) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.cache_dir, delete=False, encoding="utf-8") as tmp:
+                json.dump(attachment, tmp)
+            # Atomic rename: a worker reading concurrently sees the old state or the whole entry.
+            os.replace(tmp.name, self._disk_path(blob_name))
+        except OSError as exc:
+            current_app.logger.warning("Attachment cache write failed for %s: %s", blob_name, exc)
+            return
+        self._evict_from_disk()
+
+    def _evict_from_disk(self) -> None:
+        """Delete the oldest entries until the directory fits ``max_disk_bytes``."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as listing:
+                for entry in listing:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as exc:
+            current_app.logger.warning("Attachment cache sweep failed: %s", exc)
+            return
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            except OSError as exc:
+                current_app.logger.warning("Attachment cache eviction failed for %s: %s", path, exc)
+                continue
+            total_bytes -= size
+
+    def _build(self, blob_name: str) -> dict | None:
+        file_path = local_pod_path(blob_name)
+        if not os.path.exists(file_path):
+            current_app.logger.warning("Attachment bypassed: Local file not found at %s", file_path)
+            return None
+
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except OSError as exc:
+            current_app.logger.error("Attachment read failed for %s: %s", file_path, exc)
+            return None
+
+        filename = os.path.basename(file_path)
+        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else "jpg"
+        content_type = "image/png" if ext == "png" else "image/jpeg"
+        rendered = render_for_email(data, content_type, self.max_dimension)
+        if rendered is None:
+            return None
+        data, content_type = rendered
+
+        attachment = {
+            "Name": filename,
+            "Content": base64.b64encode(data).decode("utf-8"),
+            "ContentType": content_type,
+            "ContentID": f"cid:{filename}",
+        }
+        self._write_to_disk(blob_name, attachment)
+        return attachment
+
+
+def _get_cache() -> AttachmentRenditionCache:
+    cache = current_app.extensions.get(ATTACHMENT_CACHE_EXTENSION)
+    if cache is None:
+        with _cache_lock:
+            cache = current_app.extensions.get(ATTACHMENT_CACHE_EXTENSION)
+            if cache is None:
+                cache = AttachmentRenditionCache(
+                    max_entries=current_app.config.get("ATTACHMENT_CACHE_MAX_ENTRIES", 64),
+                    cache_dir=current_app.config.get("ATTACHMENT_CACHE_DIR")
+                    or os.path.join(tempfile.gettempdir(), "fsi-attachment-renditions"),
+                    max_dimension=current_app.config.get("ATTACHMENT_MAX_DIMENSION_PX", 1600),
+                    max_disk_bytes=current_app.config.get("ATTACHMENT_CACHE_DISK_MAX_MB", 64) * 1024 * 1024,
+                )
+                current_app.extensions[ATTACHMENT_CACHE_EXTENSION] = cache
+    return cache
+
+
+def build_email_attachments(
+    media: list[tuple[str, str | None, str | None]],
+) -> tuple[list[dict], dict[str, str]]:
+    """Inline ``media`` as attachments while they fit the payload budget, else link to them.
+
+    ``media`` holds ``(template_field, blob_name, link)`` entries in priority order. Returns the
+    attachments and the template model values: a ``cid:`` reference for each inlined item and a
+    signed link (``link``, or one signed now) for the rest.
+    """
+    budget_bytes = current_app.config.get("ATTACHMENT_PAYLOAD_BUDGET_KB", 4096) * 1024
+    used_bytes = 0
+    attachments: list[dict] = []
+    template_fields: dict[str, str] = {}
+
+    for field, blob_name, link in media:
+        attachment = _get_cache().get(blob_name) if blob_name else None
+        if attachment is not None:
+            size = len(attachment["Content"])
+            if used_bytes + size <= budget_bytes:
+                attachments.append(attachment)
+                template_fields[field] = attachment["ContentID"]
+                used_bytes += size
+                continue
+            current_app.logger.info(
+                "Attachment linked instead of inlined: blob=%s encoded_bytes=%s budget_bytes=%s",
+                blob_name,
+                size,
+                budget_bytes,
+            )
+
+        link = link or (build_media_access_url(blob_name) if blob_name else None)
+        if link:
+            template_fields[field] = link
+
+    return attachments, template_fields
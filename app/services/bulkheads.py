@@ -0,0 +1,246 @@
+"""Per-dependency bulkheads: concurrency limits, bounded queues, deadlines and circuit breakers.
+
+A gunicorn worker has only a few threads. Without a limit, a slow Couchdrop or Postmark can hold
+all of them and POD submits queue behind calls that have nothing to do with them. Each
+dependency gets its own ``Bulkhead``:
+
+* at most ``BULKHEAD_MAX_CONCURRENT`` calls in flight per worker (``gcs_staging`` is sized from
+  ``PAPERWORK_STAGING_WORKERS`` instead, so every staging thread always has a slot);
+* at most ``BULKHEAD_MAX_QUEUE`` callers waiting for a slot, each for at most
+  ``BULKHEAD_QUEUE_WAIT_MS``; anyone else is rejected at once;
+* a deadline per call (``DEPENDENCY_DEADLINES``) that retries and per-attempt timeouts respect;
+* a circuit breaker that opens after ``BULKHEAD_FAILURE_THRESHOLD`` consecutive failures and
+  rejects calls for ``BULKHEAD_RESET_SECONDS`` before letting one trial call through.
+
+Calls run on the caller's thread, so request context and outbound timing keep working.
+Rejections raise ``BulkheadRejected`` without touching the network.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from flask import current_app, has_app_context
+
+from app.metrics import record_bulkhead_rejection, set_bulkhead_circuit_open, set_bulkhead_in_flight
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Whole-call budgets, retries included. Couchdrop uploads stream files, so they get the longest.
+DEPENDENCY_DEADLINES = {
+    "postmark": 25.0,
+    "couchdrop": 45.0,
+    "cloud_tasks": 15.0,
+    "gcs": 30.0,
+    "gcs_staging": 60.0,
+    "google_oauth": 10.0,
+}
+_DEFAULT_DEADLINE_SECONDS = 30.0
+# Dependencies whose concurrency follows their own pool size rather than BULKHEAD_MAX_CONCURRENT.
+_CONCURRENCY_SETTINGS = {"gcs_staging": ("PAPERWORK_STAGING_WORKERS", 4)}
+
+_registry_lock = threading.Lock()
+_bulkheads: dict[str, "Bulkhead"] = {}
+
+
+class BulkheadRejected(RuntimeError):
+    """A call was refused before reaching the dependency (queue full, queue wait or open circuit)."""
+
+    def __init__(self, dependency: str, reason: str) -> None:
+        super().__init__(f"{dependency} unavailable: {reason}")
+        self.dependency = dependency
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: CLOSED -> OPEN -> (after ``reset_seconds``) HALF_OPEN -> CLOSED."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class BulkheadPermit:
+    """Handed to the guarded block: the call's deadline, and a way to report a failed response."""
+
+    def __init__(self, deadline_at: float) -> None:
+        self.deadline_at = deadline_at
+        self.failed = False
+
+    def remaining(self) -> float:
+        return self.deadline_at - time.monotonic()
+
+    def mark_failed(self) -> None:
+        self.failed = True
+
+
+class Bulkhead:
+    def __init__(
+        self,
+        dependency: str,
+        *,
+        max_concurrent: int,
+        max_queue: int,
+        queue_wait_seconds: float,
+        deadline_seconds: float,
+        breaker: CircuitBreaker,
+    ) -> None:
+        self.dependency = dependency
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_wait_seconds = queue_wait_seconds
+        self.deadline_seconds = deadline_seconds
+        self.breaker = breaker
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _reject(self, reason: str) -> BulkheadRejected:
+        record_bulkhead_rejection(self.dependency, reason)
+        return BulkheadRejected(self.dependency, reason)
+
+    def _acquire_slot(self) -> None:
+        if self._slots.acquire(blocking=False):
+            return
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                raise self._reject("queue_full")
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_wait_seconds)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            raise self._reject("queue_timeout")
+
+    def _set_in_flight(self, delta: int) -> None:
+        with self._lock:
+            self._in_flight += delta
+            in_flight = self._in_flight
+        set_bulkhead_in_flight(self.dependency, in_flight)
+
+    @contextmanager
+    def call(self) -> Iterator[BulkheadPermit]:
+        self._acquire_slot()
+        # Checked once a slot is held, so a half-open trial is never stranded by a full queue.
+        if not self.breaker.allow():
+            self._slots.release()
+            raise self._reject("circuit_open")
+
+        permit = BulkheadPermit(time.monotonic() + self.deadline_seconds)
+        self._set_in_flight(1)
+        try:
+            yield permit
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        else:
+            if permit.failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+        finally:
+            self._set_in_flight(-1)
+            self._slots.release()
+            set_bulkhead_circuit_open(self.dependency, self.breaker.state == OPEN)
+
+    def health(self) -> dict:
+        with self._lock:
+            in_flight, waiting = self._in_flight, self._waiting
+        return {
+            "state": self.breaker.state,
+            "in_flight": in_flight,
+            "waiting": waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+        }
+
+
+def _setting(name: str, default: int) -> int:
+    if has_app_context():
+        return int(current_app.config.get(name, default))
+    return default
+
+
+def get_bulkhead(dependency: str) -> Bulkhead:
+    """Return this process's bulkhead for ``dependency``, sized from config on first use."""
+    bulkhead = _bulkheads.get(dependency)
+    if bulkhead is None:
+        with _registry_lock:
+            bulkhead = _bulkheads.get(dependency)
+            if bulkhead is None:
+                bulkhead = Bulkhead(
+                    dependency,
+                    max_concurrent=_setting(*_CONCURRENCY_SETTINGS.get(dependency, ("BULKHEAD_MAX_CONCURRENT", 3))),
+                    max_queue=_setting("BULKHEAD_MAX_QUEUE", 4),
+                    queue_wait_seconds=_setting("BULKHEAD_QUEUE_WAIT_MS", 1000) / 1000,
+                    deadline_seconds=DEPENDENCY_DEADLINES.get(dependency, _DEFAULT_DEADLINE_SECONDS),
+                    breaker=CircuitBreaker(
+                        failure_threshold=_setting("BULKHEAD_FAILURE_THRESHOLD", 5),
+                        reset_seconds=_setting("BULKHEAD_RESET_SECONDS", 30),
+                    ),
+                )
+                _bulkheads[dependency] = bulkhead
+    return bulkhead
+
+
+def guard(dependency: str):
+    """``with guard("postmark") as permit:`` runs the block inside ``dependency``'s bulkhead."""
+    return get_bulkhead(dependency).call()
+
+
+def bulkhead_health() -> dict[str, dict]:
+    with _registry_lock:
+        bulkheads = dict(_bulkheads)
+    return {dependency: bulkhead.health() for dependency, bulkhead in sorted(bulkheads.items())}
+
+
+def reset_bulkheads() -> None:
+    """Forget all bulkheads (e.g. after fork, where a lock may have been held mid-call)."""
+    with _registry_lock:
+        _bulkheads.clear()
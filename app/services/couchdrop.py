@@ -2,20 +2,110 @@ import os
 import requests
 import logging
 import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from flask import current_app, has_app_context
 from werkzeug.utils import secure_filename
 
-class CouchdropService:
+from app.instrumentation import track_outbound
+from app.services.bulkheads import BulkheadRejected, guard
+from app.services.google_clients import get_storage_client
+from app.services.http_clients import MultipartFileStream, send_request
+from app.services.paperwork_ledger import is_duplicate
+
+COUCHDROP_API_URL = "https://api.couchdrop.io"
+COUCHDROP_FILEIO_URL = "https://fileio.couchdrop.io"
+COUCHDROP_FOLDER_CACHE_EXTENSION = "couchdrop_folder_cache"
+PAPERWORK_STAGING_POOL_EXTENSION = "paperwork_staging_pool"
+# GCS read size while streaming a staged scan to Couchdrop; bounds per-task memory.
+STAGED_BLOB_CHUNK_BYTES = 1024 * 1024
+# How long a staging file waits, retrying, for a busy staging bulkhead before it is failed.
+_STAGING_SLOT_WAIT_SECONDS = 30.0
+_STAGING_RETRY_SECONDS = 0.05
+
+
+class CouchdropFolderCache:
+    """Per-worker TTL cache of Couchdrop folders known to exist, keyed by token and path.
+
+    Adding ``/a/b/c`` also records ``/a`` and ``/a/b``: a folder cannot exist without its parents.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
     @staticmethod
-    def _get_storage_module():
-        try:
-            from google.cloud import storage
-        except ImportError as exc:
-            raise RuntimeError("google-cloud-storage is required for queued Couchdrop uploads.") from exc
-        return storage
+    def _with_parents(path: str) -> list[str]:
+        segments = path.strip("/").split("/")
+        return ["/" + "/".join(segments[: index + 1]) for index in range(len(segments))]
+
+    def contains(self, token: str, path: str) -> bool:
+        with self._lock:
+            expires_at = self._entries.get((token, path))
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def add(self, token: str, path: str) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for known_path in self._with_parents(path):
+                self._entries[(token, known_path)] = expires_at
+
+    def invalidate(self, token: str, path: str) -> None:
+        """Forget ``path``, its parents and everything below it."""
+        stale = set(self._with_parents(path))
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == token and (key[1] in stale or key[1].startswith(prefix)):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _get_folder_cache() -> CouchdropFolderCache | None:
+    if not has_app_context():
+        return None
+    cache = current_app.extensions.get(COUCHDROP_FOLDER_CACHE_EXTENSION)
+    if cache is None:
+        cache = CouchdropFolderCache(ttl_seconds=current_app.config.get("COUCHDROP_FOLDER_CACHE_TTL_SECONDS", 600))
+        current_app.extensions[COUCHDROP_FOLDER_CACHE_EXTENSION] = cache
+    return cache
+
+
+_staging_pool_lock = threading.Lock()
+
+
+def _get_staging_pool() -> ThreadPoolExecutor:
+    """Per-worker pool for staging uploads; its size caps concurrent GCS writes from one worker."""
+    pool = current_app.extensions.get(PAPERWORK_STAGING_POOL_EXTENSION)
+    if pool is None:
+        with _staging_pool_lock:
+            pool = current_app.extensions.get(PAPERWORK_STAGING_POOL_EXTENSION)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=current_app.config.get("PAPERWORK_STAGING_WORKERS", 4),
+                    thread_name_prefix="paperwork-staging",
+                )
+                current_app.extensions[PAPERWORK_STAGING_POOL_EXTENSION] = pool
+    return pool
+
+
+def _is_path_error(response) -> bool:
+    if response.status_code == 404:
+        return True
+    if response.status_code not in (400, 409):
+        return False
+    body = (response.text or "").lower()
+    return any(word in body for word in ("path", "folder", "directory", "not exist", "not found"))
+
 
+class CouchdropService:
     @staticmethod
     def _get_bucket_name() -> str:
         if has_app_context():
@@ -24,6 +114,14 @@ class CouchdropService:
                 return configured
         return (os.getenv("GCS_BUCKET_NAME") or "").strip()
 
+    @staticmethod
+    def _get_base_url(name: str, default: str) -> str:
+        if has_app_context():
+            configured = (current_app.config.get(name) or "").strip()
+            if configured:
+                return configured.rstrip("/")
+        return ((os.getenv(name) or "").strip() or default).rstrip("/")
+
     @staticmethod
     def _ensure_path_exists(token, folder_path, timeout_seconds=15):
         headers = {"token": token}
@@ -31,24 +129,43 @@ class CouchdropService:
         if not normalized_path:
             return True
 
-        cumulative_path = ""
-        for segment in normalized_path.split("/"):
-            cumulative_path = f"{cumulative_path}/{segment}"
+        cache = _get_folder_cache()
+        folder_paths = CouchdropFolderCache._with_parents(normalized_path)
+        missing_paths = folder_paths
+        if cache is not None:
+            # Only walk below the deepest folder already known to exist; usually that is all of it.
+            for index in range(len(folder_paths) - 1, -1, -1):
+                if cache.contains(token, folder_paths[index]):
+                    missing_paths = folder_paths[index + 1 :]
+                    break
+        if not missing_paths:
+            return True
 
-            check_response = requests.get(
-                "https://api.couchdrop.io/manage/fileprops",
+        api_url = CouchdropService._get_base_url("COUCHDROP_API_URL", COUCHDROP_API_URL)
+        fileio_url = CouchdropService._get_base_url("COUCHDROP_FILEIO_URL", COUCHDROP_FILEIO_URL)
+        for cumulative_path in missing_paths:
+            check_response = send_request(
+                "couchdrop",
+                "GET",
+                f"{api_url}/manage/fileprops",
                 headers=headers,
                 params={"path": cumulative_path},
                 timeout=timeout_seconds,
             )
             if check_response.status_code == 200:
+                if cache is not None:
+                    cache.add(token, cumulative_path)
                 continue
 
-            mkdir_response = requests.post(
-                "https://fileio.couchdrop.io/file/mkdir",
+            # mkdir of an existing folder is harmless, so it is safe to retry.
+            mkdir_response = send_request(
+                "couchdrop",
+                "POST",
+                f"{fileio_url}/file/mkdir",
                 headers=headers,
                 params={"path": cumulative_path},
                 timeout=timeout_seconds,
+                idempotent=True,
             )
             if mkdir_response.status_code not in (200, 201):
                 logging.error(
@@ -59,9 +176,43 @@ class CouchdropService:
                     mkdir_response.text,
                 )
                 return False
+            if cache is not None:
+                cache.add(token, cumulative_path)
 
         return True
 
+    @staticmethod
+    def _send_upload(token, remote_path, timeout_seconds=15, headers=None, **body):
+        """POST one file to ``remote_path``, recreating its folder once if Couchdrop reports it missing.
+
+        ``body`` is ``files=`` or a seekable ``data=`` stream; both can be sent again.
+        """
+        fileio_url = CouchdropService._get_base_url("COUCHDROP_FILEIO_URL", COUCHDROP_FILEIO_URL)
+        folder_path = "/" + "/".join((remote_path or "").strip("/").split("/")[:-1])
+
+        def _post():
+            # Uploading to the same path overwrites, so a retried upload cannot duplicate the file.
+            return send_request(
+                "couchdrop",
+                "POST",
+                f"{fileio_url}/file/upload",
+                headers={"token": token, **(headers or {})},
+                params={"path": remote_path},
+                timeout=timeout_seconds,
+                idempotent=True,
+                **body,
+            )
+
+        response = _post()
+        if _is_path_error(response):
+            cache = _get_folder_cache()
+            if cache is not None:
+                cache.invalidate(token, folder_path)
+            logging.warning("Couchdrop upload hit a missing folder %s; recreating it and retrying.", folder_path)
+            if CouchdropService._ensure_path_exists(token, folder_path, timeout_seconds):
+                response = _post()
+        return response
+
     @staticmethod
     def upload_driver_paperwork(user, file_storage):
         timeout_seconds = 15
@@ -88,10 +239,6 @@ class CouchdropService:
             logging.error("Couchdrop upload aborted: received empty file bytes.")
             return False
 
-        headers = {
-            "token": token,
-        }
-
         files = {
             "file": (
                 file_storage.filename,
@@ -101,13 +248,7 @@ class CouchdropService:
         }
         
         try:
-            response = requests.post(
-                "https://fileio.couchdrop.io/file/upload",
-                headers=headers,
-                params={"path": remote_path},
-                files=files,
-                timeout=timeout_seconds,
-            )
+            response = CouchdropService._send_upload(token, remote_path, timeout_seconds, files=files)
             
             if response.status_code not in (200, 201):
                 logging.error(f"Couchdrop Upload Failed [{response.status_code}]: {response.text}")
@@ -125,9 +266,11 @@ class CouchdropService:
             logging.error("Couchdrop task staging aborted: missing filename.")
             return None
 
-        file_storage.stream.seek(0)
-        file_bytes = file_storage.read()
-        if not file_bytes:
+        stream = file_storage.stream
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+        if not size:
             logging.error("Couchdrop task staging aborted: empty file bytes.")
             return None
 
@@ -141,19 +284,13 @@ class CouchdropService:
         folder_path = f"/Paperwork/{driver_name}/{date_str}"
         remote_path = f"{folder_path}/{safe_name}"
 
-        content_hash = hashlib.sha256(file_bytes).hexdigest()
+        content_hash = hashlib.file_digest(stream, "sha256").hexdigest()
         idempotency_key = hashlib.sha256(
             f"{getattr(user, 'id', 'unknown')}|{remote_path}|{content_hash}".encode("utf-8")
         ).hexdigest()
         staged_blob_name = f"couchdrop_queue/{date_str}/{idempotency_key}/{safe_name}"
 
-        storage = CouchdropService._get_storage_module()
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(staged_blob_name)
-        blob.upload_from_string(file_bytes, content_type=file_storage.content_type or "application/octet-stream")
-
-        return {
+        payload = {
             "actor_user_id": getattr(user, "id", None),
             "original_filename": safe_name,
             "content_type": file_storage.content_type or "application/octet-stream",
@@ -161,6 +298,55 @@ class CouchdropService:
             "remote_path": remote_path,
             "idempotency_key": idempotency_key,
         }
+        # The same scan for the same path is already staged, uploading or uploaded.
+        if is_duplicate(idempotency_key):
+            logging.info("Couchdrop task staging skipped: duplicate idempotency_key=%s", idempotency_key)
+            return {**payload, "duplicate": True}
+
+        blob = get_storage_client().bucket(bucket_name).blob(staged_blob_name)
+        # Staging has its own bulkhead, sized to the staging pool, so batch uploads never compete
+        # with signed-URL and Couchdrop-task reads for the shared gcs slots.
+        with guard("gcs_staging"), track_outbound("gcs"):
+            blob.upload_from_file(
+                stream,
+                rewind=True,
+                size=size,
+                content_type=file_storage.content_type or "application/octet-stream",
+            )
+
+        return payload
+
+    @staticmethod
+    def stage_paperwork_batch(user, files):
+        """Stage ``files`` concurrently on this worker's staging pool.
+
+        Returns one entry per file, in order: the staged payload (with ``duplicate: True`` when the
+        ledger already has it), ``None`` when the file was rejected (no name or empty), or the
+        exception staging raised. A file that finds the staging bulkhead busy waits for a slot;
+        only an open circuit (GCS failing) fails it straight away.
+        """
+        app = current_app._get_current_object()
+
+        def _stage(file_storage):
+            with app.app_context():
+                wait_until = time.monotonic() + _STAGING_SLOT_WAIT_SECONDS
+                while True:
+                    try:
+                        return CouchdropService.stage_driver_paperwork_for_task(user, file_storage)
+                    except BulkheadRejected as exc:
+                        if exc.reason == "circuit_open" or time.monotonic() >= wait_until:
+                            raise
+                        time.sleep(_STAGING_RETRY_SECONDS)
+
+        futures = [_get_staging_pool().submit(_stage, file_storage) for file_storage in files]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                logging.error("Couchdrop task staging failed: %s", exc)
+                results.append(exc)
+        return results
 
     @staticmethod
     def upload_staged_paperwork(staged_blob_name, remote_path, filename, content_type):
@@ -173,17 +359,15 @@ class CouchdropService:
         if not bucket_name:
             raise RuntimeError("GCS_BUCKET_NAME is required for queued Couchdrop uploads.")
 
-        storage = CouchdropService._get_storage_module()
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob((staged_blob_name or "").strip())
-
-        if not blob.exists():
+        # One metadata GET answers "does it exist" and "how big is it", and pins the generation
+        # so the streamed read cannot mix two versions of the object.
+        bucket = get_storage_client().bucket(bucket_name)
+        with guard("gcs"), track_outbound("gcs"):
+            blob = bucket.get_blob((staged_blob_name or "").strip())
+        if blob is None:
             logging.error("Couchdrop task upload failed: staged blob not found %s", staged_blob_name)
             return False, "staged_blob_missing"
-
-        file_bytes = blob.download_as_bytes()
-        if not file_bytes:
+        if not blob.size:
             logging.error("Couchdrop task upload failed: staged blob empty %s", staged_blob_name)
             return False, "staged_blob_empty"
 
@@ -192,23 +376,19 @@ class CouchdropService:
         if not CouchdropService._ensure_path_exists(token, folder_path, timeout_seconds):
             return False, "folder_create_failed"
 
-        headers = {"token": token}
-        files = {
-            "file": (
-                filename,
-                file_bytes,
-                content_type or "application/octet-stream",
-            )
-        }
-
         try:
-            response = requests.post(
-                "https://fileio.couchdrop.io/file/upload",
-                headers=headers,
-                params={"path": remote_path},
-                files=files,
-                timeout=timeout_seconds,
-            )
+            with blob.open("rb", chunk_size=STAGED_BLOB_CHUNK_BYTES) as reader:
+                stream = MultipartFileStream(
+                    "file", filename, reader, blob.size, content_type or "application/octet-stream"
+                )
+                # The GCS reads happen inside the upload, so both are timed as couchdrop.
+                response = CouchdropService._send_upload(
+                    token,
+                    remote_path,
+                    timeout_seconds,
+                    headers={"Content-Type": stream.content_type},
+                    data=stream,
+                )
             if response.status_code not in (200, 201):
                 logging.error("Couchdrop task upload failed [%s]: %s", response.status_code, response.text)
                 return False, "upload_http_error"
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app import db
+from models import EmailDelivery
+
+
+def delivery_key(shipment_id: int, action_type: str, transition_id: int | None, task_name: str | None) -> str | None:
+    """Identify one alert email: by the leg transition that caused it, else by the Cloud Task name.
+
+    Returns ``None`` when neither is known, in which case the delivery cannot be deduplicated.
+    """
+    if transition_id is not None:
+        return f"transition:{shipment_id}:{action_type}:{transition_id}"
+    if task_name:
+        return f"task:{task_name}"
+    return None
+
+
+def already_sent(key: str) -> bool:
+    return db.session.scalar(select(EmailDelivery.id).where(EmailDelivery.delivery_key == key)) is not None
+
+
+def record_sent(
+    key: str,
+    *,
+    shipment_id: int,
+    action_type: str,
+    transition_id: int | None,
+    task_name: str | None,
+) -> None:
+    """Record a sent alert. A concurrent delivery of the same task may have recorded it first.
+
+    Failures are logged, not raised: the email is already out, and failing the task would
+    make Cloud Tasks send it again.
+    """
+    db.session.add(
+        EmailDelivery(
+            delivery_key=key,
+            shipment_id=shipment_id,
+            action_type=action_type,
+            transition_id=transition_id,
+            task_name=task_name,
+        )
+    )
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        current_app.logger.info("email_delivery.already_recorded delivery_key=%s", key)
+    except SQLAlchemyError:
+        db.session.rollback()
+        current_app.logger.exception("email_delivery.record_failed delivery_key=%s", key)
@@ -9,6 +9,9 @@ from flask import current_app, has_app_context
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from app.instrumentation import track_outbound
+from app.services.bulkheads import guard
+
 
 class GCSService:
     @staticmethod
@@ -121,32 +124,37 @@ def generate_signed_url(blob_name: str, expiration_days: int = 7) -> str | None:
         return None
 
     try:
-        storage = _get_storage_module()
-        default_credentials, _ = google.auth.default()
-        sa_email = getattr(default_credentials, "service_account_email", None)
+        with guard("gcs"), track_outbound("gcs"):
+            return _sign_blob_url(bucket_name, cleaned_blob_name, expiration_days)
+    except Exception as exc:
+        logging.error("Failed to generate signed URL for blob '%s': %s", cleaned_blob_name, exc)
+        return None
 
-        if sa_email == "default" or not sa_email:
-            sa_email = os.getenv("TASK_SERVICE_ACCOUNT_EMAIL")
 
-        if not sa_email:
-            logging.error("Failed to generate signed URL: No valid service account email found.")
-            return None
+def _sign_blob_url(bucket_name: str, cleaned_blob_name: str, expiration_days: int) -> str | None:
+    storage = _get_storage_module()
+    default_credentials, _ = google.auth.default()
+    sa_email = getattr(default_credentials, "service_account_email", None)
 
-        from google.auth import impersonated_credentials
-
-        signing_credentials = impersonated_credentials.Credentials(
-            source_credentials=default_credentials,
-            target_principal=sa_email,
-            target_scopes=["https://www.googleapis.com/auth/cloud-platform"],
-        )
-        client = storage.Client(credentials=signing_credentials)
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(cleaned_blob_name)
-        return blob.generate_signed_url(
-            version="v4",
-            expiration=timedelta(days=expiration_days),
-            method="GET",
-        )
-    except Exception as exc:
-        logging.error("Failed to generate signed URL for blob '%s': %s", cleaned_blob_name, exc)
+    if sa_email == "default" or not sa_email:
+        sa_email = os.getenv("TASK_SERVICE_ACCOUNT_EMAIL")
+
+    if not sa_email:
+        logging.error("Failed to generate signed URL: No valid service account email found.")
         return None
+
+    from google.auth import impersonated_credentials
+
+    signing_credentials = impersonated_credentials.Credentials(
+        source_credentials=default_credentials,
+        target_principal=sa_email,
+        target_scopes=["https://www.googleapis.com/auth/cloud-platform"],
+    )
+    client = storage.Client(credentials=signing_credentials)
+    bucket = client.bucket(bucket_name)
+    blob = bucket.blob(cleaned_blob_name)
+    return blob.generate_signed_url(
+        version="v4",
+        expiration=timedelta(days=expiration_days),
+        method="GET",
+    )
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import TypeVar
+
+ClientT = TypeVar("ClientT")
+
+_client_lock = threading.Lock()
+_clients: dict[Callable[[], object], object] = {}
+
+
+def _get_storage_module():
+    try:
+        from google.cloud import storage
+    except ImportError as exc:
+        raise RuntimeError("google-cloud-storage is required to access Cloud Storage.") from exc
+    return storage
+
+
+def get_client(factory: Callable[[], ClientT]) -> ClientT:
+    """Return the process-wide client built by ``factory``, creating it on first use.
+
+    Google clients own gRPC channels / HTTP pools and credentials; building one per call
+    repeats that setup (and often a metadata-server token fetch) on every request.
+    """
+    client = _clients.get(factory)
+    if client is None:
+        with _client_lock:
+            client = _clients.get(factory)
+            if client is None:
+                client = factory()
+                _clients[factory] = client
+    return client
+
+
+def get_storage_client():
+    return get_client(_get_storage_module().Client)
+
+
+def reset_google_clients() -> None:
+    """Drop cached clients so the next caller builds fresh transports (e.g. after fork)."""
+    with _client_lock:
+        _clients.clear()
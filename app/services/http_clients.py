@@ -0,0 +1,235 @@
+"""Pooled outbound HTTP sessions for Postmark and Couchdrop.
+
+Each dependency gets one process-wide ``requests.Session`` whose adapter keeps TLS connections
+alive between calls, so a Couchdrop upload that checks four folders reuses one handshake rather
+than paying for five. ``send_request`` retries transient failures with full-jitter backoff inside
+the dependency's bulkhead (see ``app.services.bulkheads``) and records every attempt under
+``outbound_request_duration_seconds`` and ``outbound_requests_total``.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from typing import BinaryIO
+
+import requests
+from flask import current_app, has_app_context
+from requests.adapters import HTTPAdapter
+
+from app.instrumentation import track_outbound
+from app.metrics import record_outbound_request
+from app.services.bulkheads import BulkheadPermit, BulkheadRejected, guard
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_MAX_BACKOFF_SECONDS = 5.0
+
+_session_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+
+
+def _setting(name: str, default: int) -> int:
+    if has_app_context():
+        return int(current_app.config.get(name, default))
+    return default
+
+
+def _build_session() -> requests.Session:
+    pool_maxsize = _setting("OUTBOUND_HTTP_POOL_MAXSIZE", 10)
+    session = requests.Session()
+    # Retries are handled by send_request so each attempt is measured and jittered.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class MultipartFileStream:
+    """Streaming ``multipart/form-data`` body carrying one file of known ``size``.
+
+    ``requests`` sends it with a ``Content-Length`` header and reads it in small blocks, so the
+    file never has to be held in memory. ``seek(0)`` rewinds ``fileobj`` for a retried send.
+    """
+
+    def __init__(self, field_name: str, filename: str, fileobj: BinaryIO, size: int, content_type: str) -> None:
+        boundary = uuid.uuid4().hex
+        safe_filename = filename.replace("\\", "_").replace('"', "_").replace("\r", "_").replace("\n", "_")
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        self._fileobj = fileobj
+        self._size = size
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._head) + self._size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(64 * 1024):
+            yield chunk
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if (offset, whence) != (0, 0):
+            raise ValueError("MultipartFileStream can only rewind to the start.")
+        self._fileobj.seek(0)
+        self._position = 0
+        return 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = len(self) - self._position
+        parts = []
+        while size > 0 and self._position < len(self):
+            head_end = len(self._head)
+            file_end = head_end + self._size
+            if self._position < head_end:
+                part = self._head[self._position : self._position + size]
+            elif self._position < file_end:
+                part = self._fileobj.read(min(size, file_end - self._position))
+                if not part:
+                    raise IOError(f"File ended {file_end - self._position} bytes early.")
+            else:
+                offset = self._position - file_end
+                part = self._tail[offset : offset + size]
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+        return b"".join(parts)
+
+
+def get_session(dependency: str) -> requests.Session:
+    """Return the pooled session for ``dependency``, creating it on first use."""
+    session = _sessions.get(dependency)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(dependency)
+            if session is None:
+                session = _build_session()
+                _sessions[dependency] = session
+    return session
+
+
+def reset_http_sessions() -> None:
+    """Forget pooled sessions so the next call opens fresh sockets (e.g. after fork).
+
+    Sessions are dropped rather than closed: after a fork the sockets still belong to the parent.
+    """
+    with _session_lock:
+        _sessions.clear()
+
+
+def backoff_seconds(attempt: int, base_seconds: float) -> float:
+    """Full-jitter delay before retry ``attempt`` (1-based): uniform in ``[0, base * 2**(attempt - 1)]``."""
+    return random.uniform(0, min(_MAX_BACKOFF_SECONDS, base_seconds * 2 ** (attempt - 1)))
+
+
+def _retry_after_seconds(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return min(_MAX_BACKOFF_SECONDS, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+class DependencyUnavailable(requests.ConnectionError):
+    """Raised without a network call when the dependency's bulkhead is full or its circuit is open."""
+
+
+def _attempt_kwargs(kwargs: dict, permit: BulkheadPermit) -> dict:
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, (int, float)):
+        return {**kwargs, "timeout": max(0.1, min(timeout, permit.remaining()))}
+    return kwargs
+
+
+def send_request(
+    dependency: str,
+    method: str,
+    url: str,
+    *,
+    idempotent: bool | None = None,
+    **kwargs,
+) -> requests.Response:
+    """Send one request on ``dependency``'s pooled session, retrying transient failures.
+
+    Idempotent calls (``GET``/``PUT``/... by default, or ``idempotent=True``) retry on connection
+    errors, timeouts and 429/502/503/504. Other calls only retry when the connection was never
+    established, so a request the server may have acted on is not sent twice. A seekable ``data``
+    body is rewound before every attempt. The whole call runs inside the dependency's bulkhead:
+    attempts and backoff stay within its deadline, and a full bulkhead or open circuit raises
+    ``DependencyUnavailable``. Returns the last response, which may be an error status; raises
+    the last ``requests.RequestException`` otherwise.
+    """
+    try:
+        with guard(dependency) as permit:
+            return _send_with_retries(dependency, method, url, idempotent, permit, kwargs)
+    except BulkheadRejected as exc:
+        record_outbound_request(dependency, "rejected")
+        raise DependencyUnavailable(str(exc)) from exc
+
+
+def _send_with_retries(
+    dependency: str,
+    method: str,
+    url: str,
+    idempotent: bool | None,
+    permit: BulkheadPermit,
+    kwargs: dict,
+) -> requests.Response:
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    attempts = _setting("OUTBOUND_HTTP_RETRY_ATTEMPTS", 3)
+    base_seconds = _setting("OUTBOUND_HTTP_RETRY_BACKOFF_MS", 200) / 1000
+    session = get_session(dependency)
+    body = kwargs.get("data")
+
+    for attempt in range(1, attempts + 1):
+        if hasattr(body, "seek"):
+            body.seek(0)
+        try:
+            with track_outbound(dependency):
+                response = session.request(method, url, **_attempt_kwargs(kwargs, permit))
+        except requests.RequestException as exc:
+            retryable = isinstance(exc, requests.ConnectTimeout) or (
+                idempotent and isinstance(exc, (requests.ConnectionError, requests.Timeout))
+            )
+            delay = backoff_seconds(attempt, base_seconds)
+            if attempt == attempts or not retryable or delay >= permit.remaining():
+                record_outbound_request(dependency, "error")
+                raise
+            record_outbound_request(dependency, "retried")
+        else:
+            retryable = idempotent and response.status_code in RETRYABLE_STATUSES
+            delay = _retry_after_seconds(response) if retryable else None
+            if delay is None:
+                delay = backoff_seconds(attempt, base_seconds)
+            if attempt == attempts or not retryable or delay >= permit.remaining():
+                if response.status_code >= 500 or response.status_code == 429:
+                    permit.mark_failed()
+                record_outbound_request(dependency, "ok" if response.status_code < 400 else "http_error")
+                return response
+            record_outbound_request(dependency, "retried")
+            response.close()
+
+        if has_app_context():
+            current_app.logger.info(
+                "outbound.retry dependency=%s method=%s attempt=%s delay_ms=%.0f",
+                dependency,
+                method,
+                attempt,
+                delay * 1000,
+            )
+        time.sleep(delay)
+    raise AssertionError("unreachable")
@@ -0,0 +1,86 @@
+"""Durable outbox for shipment alerts.
+
+``apply_pod_transition`` stages a row in the same transaction as the transition it reports
+on, and the row is deleted once Cloud Tasks accepts the alert. Rows left behind by a failed
+enqueue (or a worker that died between commit and enqueue) are re-driven by
+``flask redrive-notifications``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import asdict
+from datetime import datetime, timedelta
+import json
+
+import click
+from flask import Flask
+from sqlalchemy import delete, select, update
+
+from app import db
+from app.services.tasks import EmailTaskPayload
+from models import PendingNotification
+
+LAST_ERROR_MAX_LENGTH = 120
+DEFAULT_REDRIVE_LIMIT = 100
+# Rows younger than this most likely belong to a request that is still enqueueing them.
+DEFAULT_REDRIVE_MIN_AGE_SECONDS = 60
+
+
+def stage_notification(payload: EmailTaskPayload) -> None:
+    db.session.add(PendingNotification(transition_id=payload.transition_id, payload=json.dumps(asdict(payload))))
+
+
+def load_payload(row: PendingNotification) -> EmailTaskPayload:
+    return EmailTaskPayload(**json.loads(row.payload))
+
+
+def clear_notifications(transition_ids: Iterable[int]) -> None:
+    transition_ids = [transition_id for transition_id in transition_ids if transition_id is not None]
+    if transition_ids:
+        db.session.execute(delete(PendingNotification).where(PendingNotification.transition_id.in_(transition_ids)))
+
+
+def mark_notification_failed(transition_id: int | None, error: Exception) -> None:
+    if transition_id is None:
+        return
+    db.session.execute(
+        update(PendingNotification)
+        .where(PendingNotification.transition_id == transition_id)
+        .values(
+            attempts=PendingNotification.attempts + 1,
+            last_error=f"{type(error).__name__}: {error}"[:LAST_ERROR_MAX_LENGTH],
+            updated_at_utc=datetime.utcnow(),
+        )
+    )
+
+
+def due_notifications(*, limit: int, min_age_seconds: int) -> list[PendingNotification]:
+    """Oldest outbox rows first; ``SKIP LOCKED`` keeps concurrent sweeps off each other's rows."""
+    cutoff = datetime.utcnow() - timedelta(seconds=min_age_seconds)
+    return list(
+        db.session.scalars(
+            select(PendingNotification)
+            .where(PendingNotification.created_at_utc <= cutoff)
+            .order_by(PendingNotification.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+    )
+
+
+def register_notification_outbox_commands(app: Flask) -> None:
+    @app.cli.command("redrive-notifications")
+    @click.option("--limit", default=DEFAULT_REDRIVE_LIMIT, show_default=True, help="Most alerts to enqueue.")
+    @click.option(
+        "--min-age-seconds",
+        default=DEFAULT_REDRIVE_MIN_AGE_SECONDS,
+        show_default=True,
+        help="Skip alerts staged more recently than this.",
+    )
+    def redrive_notifications_command(limit: int, min_age_seconds: int) -> None:
+        """Enqueue shipment alerts that never made it onto Cloud Tasks."""
+        from app.services.shipment_workflow import redrive_pod_notifications
+
+        redriven, failed = redrive_pod_notifications(limit=limit, min_age_seconds=min_age_seconds)
+        click.echo(f"Re-drove {redriven} shipment alerts; {failed} failed again and stay in the outbox.")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parseaddr
+
+from flask import current_app
+from sqlalchemy import select
+
+from app import db
+from models import NotificationSettings
+
+NOTIFICATION_SETTINGS_CACHE_EXTENSION = "notification_settings_cache"
+
+_cache_lock = threading.Lock()
+
+
+def is_valid_email(email: str | None) -> bool:
+    if not email:
+        return False
+    candidate = email.strip()
+    if not candidate:
+        return False
+    _, parsed = parseaddr(candidate)
+    return bool(parsed and "@" in parsed and " " not in parsed)
+
+
+def parse_cc_emails(raw_emails: str | None) -> tuple[str, ...]:
+    if not raw_emails:
+        return ()
+    return tuple(entry.strip() for entry in raw_emails.split(",") if is_valid_email(entry.strip()))
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationSettingsSnapshot:
+    """Immutable view of the notification settings row with the CC list already validated."""
+
+    id: int
+    version: int
+    notify_shipper_pickup: bool
+    notify_origin_drop: bool
+    notify_dest_pickup: bool
+    notify_consignee_drop: bool
+    cc_emails: tuple[str, ...]
+
+    @classmethod
+    def from_settings(cls, settings: NotificationSettings) -> "NotificationSettingsSnapshot":
+        return cls(
+            id=settings.id,
+            version=settings.version_id,
+            notify_shipper_pickup=bool(settings.notify_shipper_pickup),
+            notify_origin_drop=bool(settings.notify_origin_drop),
+            notify_dest_pickup=bool(settings.notify_dest_pickup),
+            notify_consignee_drop=bool(settings.notify_consignee_drop),
+            cc_emails=parse_cc_emails(settings.custom_cc_emails),
+        )
+
+
+class NotificationSettingsCache:
+    """Per-worker cache of the notification settings snapshot.
+
+    Saves on this worker invalidate it immediately. Once ``ttl_seconds`` pass, the next read
+    fetches only ``version_id`` and keeps the parsed snapshot if no worker has saved since, so
+    a save elsewhere is picked up within one TTL.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entry: tuple[float, NotificationSettingsSnapshot | None] | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> NotificationSettingsSnapshot | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entry
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        snapshot = entry[1] if entry is not None else None
+        if snapshot is not None:
+            version = db.session.scalar(
+                select(NotificationSettings.version_id).where(NotificationSettings.id == snapshot.id)
+            )
+            if version != snapshot.version:
+                snapshot = None
+        if snapshot is None:
+            settings = db.session.scalar(select(NotificationSettings).order_by(NotificationSettings.id.asc()).limit(1))
+            snapshot = NotificationSettingsSnapshot.from_settings(settings) if settings is not None else None
+
+        with self._lock:
+            self._entry = (now + self.ttl_seconds, snapshot)
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+def _get_cache() -> NotificationSettingsCache:
+    cache = current_app.extensions.get(NOTIFICATION_SETTINGS_CACHE_EXTENSION)
+    if cache is None:
+        with _cache_lock:
+            cache = current_app.extensions.get(NOTIFICATION_SETTINGS_CACHE_EXTENSION)
+            if cache is None:
+                cache = NotificationSettingsCache(
+                    ttl_seconds=current_app.config.get("NOTIFICATION_SETTINGS_TTL_SECONDS", 30)
+                )
+                current_app.extensions[NOTIFICATION_SETTINGS_CACHE_EXTENSION] = cache
+    return cache
+
+
+def get_notification_settings() -> NotificationSettingsSnapshot | None:
+    return _get_cache().get()
+
+
+def invalidate_notification_settings() -> None:
+    _get_cache().invalidate()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from models import PaperworkUpload, PaperworkUploadStatus
+
+# A FAILED upload may be staged again; anything else is already staged, in flight or done.
+_RESTAGEABLE_STATUSES = frozenset({PaperworkUploadStatus.FAILED})
+# STAGED/UPLOADING rows that stopped moving were abandoned (worker crash, retries exhausted).
+_IN_FLIGHT_STATUSES = frozenset({PaperworkUploadStatus.STAGED, PaperworkUploadStatus.UPLOADING})
+
+
+def find_upload(idempotency_key: str) -> PaperworkUpload | None:
+    return db.session.scalar(select(PaperworkUpload).where(PaperworkUpload.idempotency_key == idempotency_key))
+
+
+def _is_restageable(upload: PaperworkUpload) -> bool:
+    if upload.status in _RESTAGEABLE_STATUSES:
+        return True
+    if upload.status not in _IN_FLIGHT_STATUSES or upload.updated_at_utc is None:
+        return False
+    updated_at = upload.updated_at_utc
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    stale_after = timedelta(seconds=current_app.config.get("PAPERWORK_STALE_UPLOAD_SECONDS", 21600))
+    return datetime.now(timezone.utc) - updated_at > stale_after
+
+
+def is_duplicate(idempotency_key: str) -> bool:
+    """True when this exact scan is already uploaded, or staged/uploading and still recent.
+
+    A STAGED or UPLOADING row untouched for ``PAPERWORK_STALE_UPLOAD_SECONDS`` is treated as
+    abandoned, so the scan can be staged again rather than reported as a duplicate forever.
+    """
+    upload = find_upload(idempotency_key)
+    return upload is not None and not _is_restageable(upload)
+
+
+def _apply_staged(upload: PaperworkUpload, payload: dict) -> None:
+    upload.actor_user_id = payload["actor_user_id"]
+    upload.original_filename = payload["original_filename"]
+    upload.content_type = payload["content_type"]
+    upload.staged_blob_name = payload["staged_blob_name"]
+    upload.remote_path = payload["remote_path"]
+    upload.status = PaperworkUploadStatus.STAGED
+    upload.last_error = None
+
+
+def _stage_one(payload: dict) -> None:
+    upload = find_upload(payload["idempotency_key"])
+    if upload is None:
+        upload = PaperworkUpload(idempotency_key=payload["idempotency_key"], attempts=0)
+        db.session.add(upload)
+    elif not _is_restageable(upload):
+        return
+    _apply_staged(upload, payload)
+
+
+def record_staged(payloads: list[dict]) -> None:
+    """Record freshly staged files as STAGED in one commit.
+
+    A concurrent request staging the same scan can win the insert; the batch then falls back to
+    one commit per row and leaves the winner's row alone.
+    """
+    if not payloads:
+        return
+    try:
+        for payload in payloads:
+            _stage_one(payload)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        for payload in payloads:
+            try:
+                _stage_one(payload)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                current_app.logger.info(
+                    "paperwork.ledger_duplicate idempotency_key=%s", payload["idempotency_key"]
+                )
+
+
+def mark_failed(idempotency_key: str, reason: str) -> None:
+    upload = find_upload(idempotency_key)
+    if upload is None:
+        return
+    upload.status = PaperworkUploadStatus.FAILED
+    upload.last_error = reason[:120]
+    db.session.commit()
+
+
+def begin_upload(payload: dict) -> PaperworkUpload | None:
+    """Claim an upload attempt: mark it UPLOADING and count the attempt.
+
+    Returns ``None`` when the key is already UPLOADED, so the caller can skip the transfer.
+    Tasks queued before the ledger existed get their row created here.
+    """
+    upload = db.session.scalar(
+        select(PaperworkUpload)
+        .where(PaperworkUpload.idempotency_key == payload["idempotency_key"])
+        .with_for_update()
+    )
+    if upload is None:
+        upload = PaperworkUpload(idempotency_key=payload["idempotency_key"], attempts=0)
+        _apply_staged(upload, payload)
+        db.session.add(upload)
+    elif upload.status == PaperworkUploadStatus.UPLOADED:
+        db.session.rollback()
+        return None
+
+    upload.status = PaperworkUploadStatus.UPLOADING
+    upload.attempts = (upload.attempts or 0) + 1
+    db.session.commit()
+    return upload
+
+
+def finish_upload(upload: PaperworkUpload, uploaded: bool, reason: str) -> None:
+    if uploaded:
+        upload.status = PaperworkUploadStatus.UPLOADED
+        upload.uploaded_at_utc = datetime.now(timezone.utc)
+        upload.last_error = None
+    else:
+        upload.status = PaperworkUploadStatus.FAILED
+        upload.last_error = reason[:120]
+    db.session.commit()
+
+
+def paginate_driver_uploads(actor_user_id: int, page: int, per_page: int):
+    return db.paginate(
+        select(PaperworkUpload)
+        .where(PaperworkUpload.actor_user_id == actor_user_id)
+        .order_by(PaperworkUpload.id.desc()),
+        page=page,
+        per_page=per_page,
+        max_per_page=100,
+        error_out=False,
+    )
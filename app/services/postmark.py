@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from email.utils import parseaddr
-
-import base64
-import os
+import json
+import threading
+import time
+from concurrent.futures import Future
 
 import requests
 from flask import current_app
 
-from models import NotificationSettings
+from app.metrics import record_postmark_batch
+from app.services.attachments import build_email_attachments
+from app.services.http_clients import send_request
+from app.services.notification_settings import get_notification_settings, is_valid_email
 
-POSTMARK_EMAIL_ENDPOINT = "https://api.postmarkapp.com/email/withTemplate"
+POSTMARK_API_URL = "https://api.postmarkapp.com"
 _ACTION_TO_SETTING = {
     "SHIPPER_PICKUP": "notify_shipper_pickup",
     "ORIGIN_AIRPORT_DROP": "notify_origin_drop",
@@ -24,58 +27,174 @@ _ACTION_TO_TEMPLATE = {
     "CONSIGNEE_DROP": "pod-delivery-notification",
 }
 ALLOWED_SHIPMENT_ALERT_ACTIONS = frozenset(_ACTION_TO_SETTING)
+POSTMARK_BATCH_LIMIT = 500
+# Postmark rejects a batch over 50 MB in total; leave room for the JSON envelope and headers.
+POSTMARK_BATCH_MAX_BYTES = 48 * 1024 * 1024
+POSTMARK_BATCHER_EXTENSION = "postmark_batcher"
+
+_batcher_lock = threading.Lock()
+
+
+class PostmarkBatcher:
+    """Gathers shipment alerts from concurrent task handlers into ``batchWithTemplates`` calls.
+
+    The first alert to reach an empty batch leads it: its thread waits up to ``window_seconds``
+    (or until ``max_messages`` alerts or ``max_bytes`` of encoded messages are pending), sends
+    everything pending and resolves each caller's future with ``(sent, reason)`` for that
+    caller's message. Alerts arriving while a batch is in flight start the next one. No
+    background thread is involved, and every future is resolved even if the leader fails.
+    """
+
+    def __init__(self, window_seconds: float, max_messages: int, send_batch, max_bytes: int = POSTMARK_BATCH_MAX_BYTES) -> None:
+        self.window_seconds = window_seconds
+        self.max_messages = max(1, min(max_messages, POSTMARK_BATCH_LIMIT))
+        self.max_bytes = max_bytes
+        self._send_batch = send_batch
+        self._condition = threading.Condition()
+        self._pending: list[tuple[dict, Future, int]] = []
+        self._pending_bytes = 0
+
+    def _is_full(self) -> bool:
+        return len(self._pending) >= self.max_messages or self._pending_bytes >= self.max_bytes
+
+    def submit(self, message: dict) -> Future:
+        future: Future = Future()
+        size = len(json.dumps(message))
+        with self._condition:
+            self._pending.append((message, future, size))
+            self._pending_bytes += size
+            leader = len(self._pending) == 1
+            if self._is_full():
+                self._condition.notify_all()
+            if not leader:
+                return future
+            try:
+                deadline = time.monotonic() + self.window_seconds
+                while not self._is_full():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            finally:
+                batch, self._pending, self._pending_bytes = self._pending, [], 0
+
+        try:
+            for chunk in self._chunks(batch):
+                self._flush(chunk)
+        finally:
+            for _, pending_future, _ in batch:
+                if not pending_future.done():
+                    pending_future.set_exception(RuntimeError("Postmark batch was abandoned before it was sent."))
+        return future
+
+    def _chunks(self, batch: list[tuple[dict, Future, int]]):
+        """Split ``batch`` into calls within both limits; a message over ``max_bytes`` goes alone."""
+        chunk: list[tuple[dict, Future]] = []
+        chunk_bytes = 0
+        for message, future, size in batch:
+            if chunk and (len(chunk) >= self.max_messages or chunk_bytes + size > self.max_bytes):
+                yield chunk
+                chunk, chunk_bytes = [], 0
+            chunk.append((message, future))
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    def _flush(self, batch: list[tuple[dict, Future]]) -> None:
+        try:
+            outcomes = self._send_batch([message for message, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), outcome in zip(batch, outcomes):
+            future.set_result(outcome)
+
+
+def _get_batcher() -> PostmarkBatcher:
+    batcher = current_app.extensions.get(POSTMARK_BATCHER_EXTENSION)
+    if batcher is None:
+        with _batcher_lock:
+            batcher = current_app.extensions.get(POSTMARK_BATCHER_EXTENSION)
+            if batcher is None:
+                batcher = PostmarkBatcher(
+                    window_seconds=current_app.config.get("POSTMARK_BATCH_WINDOW_MS", 0) / 1000,
+                    max_messages=current_app.config.get("POSTMARK_BATCH_MAX_MESSAGES", POSTMARK_BATCH_LIMIT),
+                    send_batch=_send_template_batch,
+                )
+                current_app.extensions[POSTMARK_BATCHER_EXTENSION] = batcher
+    return batcher
+
+
+def _postmark_headers(postmark_token: str) -> dict[str, str]:
+    return {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "X-Postmark-Server-Token": postmark_token,
+    }
+
+
+def _send_template_batch(messages: list[dict]) -> list[tuple[bool, str]]:
+    """Send ``messages`` in one ``/email/batchWithTemplates`` call; one outcome per message, in order."""
+    postmark_token = current_app.config.get("POSTMARK_SERVER_TOKEN", "").strip()
+    api_url = current_app.config.get("POSTMARK_API_URL") or POSTMARK_API_URL
+    record_postmark_batch(len(messages))
+    rejected = [(False, "postmark_api_rejection")] * len(messages)
+    try:
+        response = send_request(
+            "postmark",
+            "POST",
+            f"{api_url}/email/batchWithTemplates",
+            headers=_postmark_headers(postmark_token),
+            json={"Messages": messages},
+            timeout=30,
+        )
+        response.raise_for_status()
+        results = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        response = getattr(exc, "response", None)
+        current_app.logger.error(
+            "Shipment alert batch failed: Postmark exception messages=%s details=%s",
+            len(messages),
+            response.text if response is not None else str(exc),
+        )
+        return rejected
 
+    if not isinstance(results, list) or len(results) != len(messages):
+        current_app.logger.error(
+            "Shipment alert batch failed: unexpected Postmark response messages=%s results=%s",
+            len(messages),
+            len(results) if isinstance(results, list) else type(results).__name__,
+        )
+        return rejected
+
+    outcomes = []
+    for message, result in zip(messages, results):
+        error_code = result.get("ErrorCode", 0) if isinstance(result, dict) else -1
+        if error_code == 0:
+            outcomes.append((True, "sent"))
+            continue
+        current_app.logger.error(
+            "Shipment alert failed: Postmark rejected batch message hwb_number=%s error_code=%s details=%s",
+            message.get("TemplateModel", {}).get("hwb_number"),
+            error_code,
+            result.get("Message") if isinstance(result, dict) else result,
+        )
+        outcomes.append((False, "postmark_api_rejection"))
+    return outcomes
 
-def _create_inline_attachment(blob_name: str | None) -> dict | None:
-    if not blob_name or str(blob_name).startswith("http"):
-        return None
 
-    clean_blob = str(blob_name).replace("gs://fsi-pod/", "").replace("POD/", "").lstrip("/")
-    file_path = os.path.join("/POD", clean_blob)
+def _send_batched(payload: dict) -> tuple[bool, str]:
+    # No timeout: the leader resolves every future, and giving up early would report a failure
+    # for a message the leader may still deliver, so the task retry would send it twice.
+    return _get_batcher().submit(payload).result()
 
-    if not os.path.exists(file_path):
-        current_app.logger.warning("Attachment bypassed: Local file not found at %s", file_path)
-        return None
 
-    try:
-        with open(file_path, "rb") as f:
-            b64_content = base64.b64encode(f.read()).decode("utf-8")
-
-        filename = os.path.basename(file_path)
-        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else "jpg"
-        content_type = "image/png" if ext == "png" else "image/jpeg"
-
-        return {
-            "Name": filename,
-            "Content": b64_content,
-            "ContentType": content_type,
-            "ContentID": f"cid:{filename}",
-        }
-    except Exception as e:
-        current_app.logger.error("Attachment encoding failed for %s: %s", file_path, e)
-        return None
-
-
-def _is_valid_email(email: str | None) -> bool:
-    if not email:
-        return False
-    candidate = email.strip()
-    if not candidate:
-        return False
-    _, parsed = parseaddr(candidate)
-    return bool(parsed and "@" in parsed and " " not in parsed)
-
-
-def _parse_custom_cc_emails(raw_emails: str | None) -> list[str]:
-    if not raw_emails:
-        return []
-
-    valid: list[str] = []
-    for entry in raw_emails.split(","):
-        candidate = entry.strip()
-        if _is_valid_email(candidate):
-            valid.append(candidate)
-    return valid
+def _media_source(url, blob_name) -> tuple[str | None, str | None]:
+    """Split an alert's media argument into ``(blob_name, link)``; older callers pass the blob as the URL."""
+    if url and str(url).startswith("http"):
+        return blob_name, url
+    return blob_name or url, None
 
 
 def send_shipment_alert(
@@ -89,6 +208,8 @@ def send_shipment_alert(
     shipper_email,
     consignee_email,
     timestamp,
+    photo_blob_name=None,
+    signature_blob_name=None,
 ):
     action = str(action_type or "").strip().upper()
     setting_name = _ACTION_TO_SETTING.get(action)
@@ -96,7 +217,7 @@ def send_shipment_alert(
         current_app.logger.warning("Shipment alert skipped: unsupported action_type=%s hwb_number=%s", action_type, hwb_number)
         return False, "unsupported_action_type"
 
-    settings = NotificationSettings.query.first()
+    settings = get_notification_settings()
     if settings is None or not getattr(settings, setting_name, False):
         current_app.logger.warning(
             "Shipment alert skipped: notifications disabled action_type=%s hwb_number=%s setting=%s",
@@ -113,7 +234,7 @@ def send_shipment_alert(
         "Consignee": consignee_email,
     }
     for role, email in check_list.items():
-        if _is_valid_email(email):
+        if is_valid_email(email):
             recipients.append(email.strip())
         else:
             current_app.logger.info(
@@ -123,7 +244,7 @@ def send_shipment_alert(
                 email,
             )
 
-    recipients.extend(_parse_custom_cc_emails(settings.custom_cc_emails))
+    recipients.extend(settings.cc_emails)
 
     deduped: list[str] = []
     seen: set[str] = set()
@@ -166,15 +287,14 @@ def send_shipment_alert(
     attachments = []
 
     if action == "CONSIGNEE_DROP":
-        photo_att = _create_inline_attachment(photo_url)
-        if photo_att:
-            attachments.append(photo_att)
-            template_model["photo_url"] = photo_att["ContentID"]
-
-        sig_att = _create_inline_attachment(signature_url)
-        if sig_att:
-            attachments.append(sig_att)
-            template_model["signature_url"] = sig_att["ContentID"]
+        # The signature goes first so a large photo is the one that falls back to a link.
+        attachments, media_fields = build_email_attachments(
+            [
+                ("signature_url", *_media_source(signature_url, signature_blob_name)),
+                ("photo_url", *_media_source(photo_url, photo_blob_name)),
+            ]
+        )
+        template_model.update(media_fields)
 
     payload = {
         "From": from_email,
@@ -187,14 +307,16 @@ def send_shipment_alert(
     if attachments:
         payload["Attachments"] = attachments
 
+    if current_app.config.get("POSTMARK_BATCH_WINDOW_MS", 0) > 0:
+        return _send_batched(payload)
+
     try:
-        response = requests.post(
-            POSTMARK_EMAIL_ENDPOINT,
-            headers={
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-                "X-Postmark-Server-Token": postmark_token,
-            },
+        api_url = current_app.config.get("POSTMARK_API_URL") or POSTMARK_API_URL
+        response = send_request(
+            "postmark",
+            "POST",
+            f"{api_url}/email/withTemplate",
+            headers=_postmark_headers(postmark_token),
             json=payload,
             timeout=10,
         )
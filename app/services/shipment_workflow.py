@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import TypeVar
+
+from flask import current_app
+from sqlalchemy.orm.exc import StaleDataError
 
 from app import db
+from app.metrics import record_pod_notification_outbox, record_version_conflict
+from app.services.notification_outbox import (
+    clear_notifications,
+    due_notifications,
+    load_payload,
+    mark_notification_failed,
+    stage_notification,
+)
 from app.services.tasks import EmailTaskPayload, enqueue_email_task
-from models import Shipment, ShipmentLeg, ShipmentLegStatus, ShipmentLegTransition, ShipmentStatus, User
+from app.services.user_snapshots import get_user_snapshot
+from models import Shipment, ShipmentLeg, ShipmentLegStatus, ShipmentLegTransition, ShipmentStatus
+
+T = TypeVar("T")
 
 
 class ShipmentTransitionError(ValueError):
@@ -26,6 +44,123 @@ ACTION_ALIASES = {
 }
 
 
+@dataclass(frozen=True)
+class TransitionRule:
+    """One row of the POD transition table: which leg an action moves, from where, and to what."""
+
+    action: str
+    leg_sequence: int
+    allowed_from: frozenset[ShipmentLegStatus]
+    to_status: ShipmentLegStatus
+    current_leg_index: int
+    shipment_status: ShipmentStatus
+    missing_leg_error: str
+    invalid_state_error: str
+    claims_leg: bool = False
+    notify: bool = True
+    prerequisite_leg_sequence: int | None = None
+    prerequisite_status: ShipmentLegStatus | None = None
+    prerequisite_error: str | None = None
+
+
+@dataclass(frozen=True)
+class TransitionRejection:
+    shipment_id: int
+    hwb_number: str
+    error: str
+
+
+# Pickups accept any leg that is not completed, including a FAILED leg being attempted again.
+_PICKUP_FROM_STATUSES = frozenset(ShipmentLegStatus) - {ShipmentLegStatus.COMPLETED}
+
+TRANSITION_TABLE: tuple[TransitionRule, ...] = (
+    TransitionRule(
+        action="SHIPPER_PICKUP",
+        leg_sequence=1,
+        allowed_from=_PICKUP_FROM_STATUSES,
+        to_status=ShipmentLegStatus.IN_PROGRESS,
+        current_leg_index=1,
+        shipment_status=ShipmentStatus.IN_PROGRESS,
+        claims_leg=True,
+        missing_leg_error="Cannot start shipper pickup: shipment leg 1 is missing.",
+        invalid_state_error="Cannot start shipper pickup: leg 1 is already completed.",
+    ),
+    TransitionRule(
+        action="ORIGIN_AIRPORT_DROP",
+        leg_sequence=1,
+        allowed_from=frozenset({ShipmentLegStatus.IN_PROGRESS}),
+        to_status=ShipmentLegStatus.COMPLETED,
+        current_leg_index=2,
+        shipment_status=ShipmentStatus.PICKED_UP,
+        missing_leg_error="Cannot complete origin airport drop: shipment leg 1 is missing.",
+        invalid_state_error="Cannot complete origin airport drop before shipper pickup is in progress.",
+    ),
+    TransitionRule(
+        action="DEST_AIRPORT_PICKUP",
+        leg_sequence=3,
+        allowed_from=_PICKUP_FROM_STATUSES,
+        to_status=ShipmentLegStatus.IN_PROGRESS,
+        current_leg_index=3,
+        shipment_status=ShipmentStatus.IN_PROGRESS,
+        claims_leg=True,
+        prerequisite_leg_sequence=1,
+        prerequisite_status=ShipmentLegStatus.COMPLETED,
+        prerequisite_error="Cannot mark destination-airport pickup before origin-airport drop.",
+        missing_leg_error="Cannot start destination-airport pickup: shipment leg 3 is missing.",
+        invalid_state_error="Cannot start destination-airport pickup: final leg is already completed.",
+    ),
+    TransitionRule(
+        action="CONSIGNEE_DROP",
+        leg_sequence=3,
+        allowed_from=frozenset({ShipmentLegStatus.IN_PROGRESS}),
+        to_status=ShipmentLegStatus.COMPLETED,
+        current_leg_index=3,
+        shipment_status=ShipmentStatus.DELIVERED,
+        missing_leg_error="Cannot mark consignee drop before destination-airport pickup.",
+        invalid_state_error="Cannot mark consignee drop before destination-airport pickup.",
+    ),
+)
+
+
+def _compile_transitions(table: Iterable[TransitionRule]) -> Mapping[str, TransitionRule]:
+    compiled: dict[str, TransitionRule] = {}
+    for rule in table:
+        if rule.action in compiled:
+            raise RuntimeError(f"Duplicate POD transition for {rule.action}.")
+        if rule.action not in ACTION_ALIASES.values():
+            raise RuntimeError(f"POD transition {rule.action} has no action alias.")
+        compiled[rule.action] = rule
+    missing = set(ACTION_ALIASES.values()) - compiled.keys()
+    if missing:
+        raise RuntimeError(f"POD actions without a transition: {', '.join(sorted(missing))}.")
+    return MappingProxyType(compiled)
+
+
+TRANSITIONS = _compile_transitions(TRANSITION_TABLE)
+
+
+def retry_on_stale_data(operation: Callable[[], T], *, operation_name: str) -> T:
+    """Run ``operation`` and retry it from a clean session when a versioned row changed underneath it.
+
+    ``operation`` must re-read everything it writes, flush its changes, and avoid side effects
+    before the flush; the session is rolled back between attempts.
+    """
+    attempts = current_app.config.get("STALE_DATA_RETRY_ATTEMPTS", 3)
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except StaleDataError:
+            db.session.rollback()
+            if attempt == attempts:
+                record_version_conflict(operation_name, "exhausted")
+                current_app.logger.warning(
+                    "shipment.version_conflict operation=%s attempts=%s outcome=exhausted", operation_name, attempts
+                )
+                raise
+            record_version_conflict(operation_name, "retried")
+    raise AssertionError("unreachable")
+
+
 def normalize_pod_action(action_type: str) -> str:
     normalized = str(action_type or "").strip().upper().replace("-", " ")
     canonical = ACTION_ALIASES.get(normalized)
@@ -47,20 +182,20 @@ def _record_leg_transition(
     latitude: str | None,
     longitude: str | None,
     event_at_utc: datetime,
-) -> None:
-    db.session.add(
-        ShipmentLegTransition(
-            shipment_id=shipment.id,
-            shipment_leg_id=leg.id,
-            actor_user_id=actor_user_id,
-            pod_action=pod_action,
-            from_status=from_status,
-            to_status=to_status,
-            latitude=latitude,
-            longitude=longitude,
-            event_at_utc=event_at_utc,
-        )
+) -> ShipmentLegTransition:
+    transition = ShipmentLegTransition(
+        shipment_id=shipment.id,
+        shipment_leg_id=leg.id,
+        actor_user_id=actor_user_id,
+        pod_action=pod_action,
+        from_status=from_status,
+        to_status=to_status,
+        latitude=latitude,
+        longitude=longitude,
+        event_at_utc=event_at_utc,
     )
+    db.session.add(transition)
+    return transition
 
 
 def _resolve_location_name(action: str, leg1: ShipmentLeg | None, leg3: ShipmentLeg | None) -> str | None:
@@ -75,7 +210,7 @@ def _resolve_location_name(action: str, leg1: ShipmentLeg | None, leg3: Shipment
     return None
 
 
-def _enqueue_pod_notification(
+def _pod_notification_payload(
     *,
     shipment: Shipment,
     action: str,
@@ -84,26 +219,104 @@ def _enqueue_pod_notification(
     leg3: ShipmentLeg | None,
     photo_blob_name: str | None,
     signature_blob_name: str | None,
-) -> None:
-    actor = db.session.get(User, actor_user_id)
+    transition_id: int,
+) -> EmailTaskPayload:
+    actor = get_user_snapshot(actor_user_id)
 
-    enqueue_email_task(
-        EmailTaskPayload(
-            shipment_id=shipment.id,
-            action_type=action,
-            actor_user_id=actor_user_id,
-            driver_email=actor.email if actor else None,
-            driver_name=actor.name if actor else None,
-            hwb_number=shipment.hwb_number,
-            location_name=_resolve_location_name(action, leg1, leg3),
-            photo_blob_name=photo_blob_name,
-            signature_blob_name=signature_blob_name,
-            shipper_email=shipment.shipper_email,
-            consignee_email=shipment.consignee_email,
-        )
+    return EmailTaskPayload(
+        shipment_id=shipment.id,
+        action_type=action,
+        actor_user_id=actor_user_id,
+        driver_email=actor.email if actor else None,
+        driver_name=actor.name if actor else None,
+        hwb_number=shipment.hwb_number,
+        location_name=_resolve_location_name(action, leg1, leg3),
+        photo_blob_name=photo_blob_name,
+        signature_blob_name=signature_blob_name,
+        shipper_email=shipment.shipper_email,
+        consignee_email=shipment.consignee_email,
+        transition_id=transition_id,
     )
 
 
+def _enqueue_notifications(payloads: Iterable[EmailTaskPayload]) -> tuple[int, int]:
+    """Enqueue each payload and settle its outbox row; returns ``(enqueued, failed)`` counts."""
+    enqueued_transition_ids = []
+    failed = 0
+    for payload in payloads:
+        try:
+            enqueue_email_task(payload)
+        except Exception as exc:
+            failed += 1
+            current_app.logger.exception(
+                "shipment.notification_enqueue_failed shipment_id=%s action=%s transition_id=%s",
+                payload.shipment_id,
+                payload.action_type,
+                payload.transition_id,
+            )
+            record_pod_notification_outbox("deferred")
+            mark_notification_failed(payload.transition_id, exc)
+        else:
+            enqueued_transition_ids.append(payload.transition_id)
+    clear_notifications(enqueued_transition_ids)
+    return len(enqueued_transition_ids), failed
+
+
+def enqueue_pod_notifications(payloads: Iterable[EmailTaskPayload]) -> None:
+    """Enqueue notifications collected by ``apply_pod_transition`` once their transitions are committed.
+
+    The POD is already recorded at this point, so a failed enqueue is logged rather than raised:
+    failing the request would only invite a resubmit that the transition table now rejects.
+    The alert stays in the outbox for ``redrive_pod_notifications``; the caller commits the
+    outbox updates.
+    """
+    _enqueue_notifications(payloads)
+
+
+def redrive_pod_notifications(*, limit: int, min_age_seconds: int) -> tuple[int, int]:
+    """Enqueue up to ``limit`` outbox alerts older than ``min_age_seconds`` and commit.
+
+    Returns ``(redriven, failed)``. An alert enqueued twice (its row survived a failed commit)
+    is dropped by the email task's per-transition delivery ledger.
+    """
+    payloads = [load_payload(row) for row in due_notifications(limit=limit, min_age_seconds=min_age_seconds)]
+    redriven, failed = _enqueue_notifications(payloads)
+    db.session.commit()
+    for _ in range(redriven):
+        record_pod_notification_outbox("redriven")
+    return redriven, failed
+
+
+def _check_transition(rule: TransitionRule, legs_by_sequence: dict[int, ShipmentLeg]) -> str | None:
+    """Return why ``rule`` cannot apply to a shipment with these legs, or ``None`` if it can."""
+    if rule.prerequisite_leg_sequence is not None:
+        prerequisite_leg = legs_by_sequence.get(rule.prerequisite_leg_sequence)
+        if not prerequisite_leg or prerequisite_leg.status != rule.prerequisite_status:
+            return rule.prerequisite_error
+
+    leg = legs_by_sequence.get(rule.leg_sequence)
+    if not leg:
+        return rule.missing_leg_error
+    if leg.status not in rule.allowed_from:
+        return rule.invalid_state_error
+    return None
+
+
+def validate_transitions(shipments: Iterable[Shipment], action_type: str) -> list[TransitionRejection]:
+    """Check ``action_type`` against many shipments in one pass, without writing anything.
+
+    Returns one rejection per shipment the action cannot apply to; an empty list means every
+    shipment can transition. Raises ``ShipmentTransitionError`` for an unknown action.
+    """
+    rule = TRANSITIONS[normalize_pod_action(action_type)]
+    rejections = []
+    for shipment in shipments:
+        error = _check_transition(rule, {leg.leg_sequence: leg for leg in shipment.legs})
+        if error:
+            rejections.append(TransitionRejection(shipment_id=shipment.id, hwb_number=shipment.hwb_number, error=error))
+    return rejections
+
+
 def apply_pod_transition(
     *,
     shipment: Shipment,
@@ -113,158 +326,69 @@ def apply_pod_transition(
     longitude: str | None = None,
     photo_blob_name: str | None = None,
     signature_blob_name: str | None = None,
+    notifications: list[EmailTaskPayload] | None = None,
 ) -> str:
+    """Apply one POD action to ``shipment`` and enqueue its notification.
+
+    Changes are flushed before the notification is built, so a version conflict
+    (``StaleDataError``) surfaces while the transition can still be retried. Callers running
+    inside ``retry_on_stale_data`` pass ``notifications`` to collect the payload instead, and
+    hand the list to ``enqueue_pod_notifications`` after committing: an attempt that is rolled
+    back must not have sent anything. Collected payloads are also staged in the notification
+    outbox, in the same transaction, so a failed enqueue can be re-driven later.
+    """
     action = normalize_pod_action(action_type)
+    rule = TRANSITIONS[action]
     legs_by_sequence = {leg.leg_sequence: leg for leg in shipment.legs}
-    leg1 = legs_by_sequence.get(1)
-    leg3 = legs_by_sequence.get(3)
+    error = _check_transition(rule, legs_by_sequence)
+    if error:
+        raise ShipmentTransitionError(error)
+
+    leg = legs_by_sequence[rule.leg_sequence]
     now_utc = datetime.now(timezone.utc)
 
     # Force tracking of object mutations
     db.session.add(shipment)
-    if leg1:
-        db.session.add(leg1)
-    if leg3:
-        db.session.add(leg3)
-
-    if action == "SHIPPER_PICKUP":
-        if not leg1:
-            raise ShipmentTransitionError("Cannot start shipper pickup: shipment leg 1 is missing.")
-        if leg1.status == ShipmentLegStatus.COMPLETED:
-            raise ShipmentTransitionError("Cannot start shipper pickup: leg 1 is already completed.")
-
-        leg1.assigned_driver_id = actor_user_id
-
-        from_status = leg1.status
-        if leg1.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
-            leg1.status = ShipmentLegStatus.IN_PROGRESS
-            leg1.started_at_utc = leg1.started_at_utc or now_utc
-
-        shipment.current_leg_index = 1
-        shipment.overall_status = ShipmentStatus.IN_PROGRESS
-        _record_leg_transition(
-            shipment=shipment,
-            leg=leg1,
-            actor_user_id=actor_user_id,
-            pod_action=action,
-            from_status=from_status,
-            to_status=leg1.status,
-            latitude=latitude,
-            longitude=longitude,
-            event_at_utc=now_utc,
-        )
-        _enqueue_pod_notification(
-            shipment=shipment,
-            action=action,
-            actor_user_id=actor_user_id,
-            leg1=leg1,
-            leg3=leg3,
-            photo_blob_name=photo_blob_name,
-            signature_blob_name=signature_blob_name,
-        )
-        return action
-
-    if action == "ORIGIN_AIRPORT_DROP":
-        if not leg1:
-            raise ShipmentTransitionError("Cannot complete origin airport drop: shipment leg 1 is missing.")
-        if leg1.status != ShipmentLegStatus.IN_PROGRESS:
-            raise ShipmentTransitionError("Cannot complete origin airport drop before shipper pickup is in progress.")
-
-        from_status = leg1.status
-        leg1.status = ShipmentLegStatus.COMPLETED
-        leg1.completed_at_utc = now_utc
-        shipment.current_leg_index = 2
-        shipment.overall_status = ShipmentStatus.PICKED_UP
-        _record_leg_transition(
-            shipment=shipment,
-            leg=leg1,
-            actor_user_id=actor_user_id,
-            pod_action=action,
-            from_status=from_status,
-            to_status=leg1.status,
-            latitude=latitude,
-            longitude=longitude,
-            event_at_utc=now_utc,
-        )
-        _enqueue_pod_notification(
-            shipment=shipment,
-            action=action,
-            actor_user_id=actor_user_id,
-            leg1=leg1,
-            leg3=leg3,
-            photo_blob_name=photo_blob_name,
-            signature_blob_name=signature_blob_name,
-        )
-        return action
-
-    if action == "DEST_AIRPORT_PICKUP":
-        if not leg1 or leg1.status != ShipmentLegStatus.COMPLETED:
-            raise ShipmentTransitionError("Cannot mark destination-airport pickup before origin-airport drop.")
-        if not leg3:
-            raise ShipmentTransitionError("Cannot start destination-airport pickup: shipment leg 3 is missing.")
-        if leg3.status == ShipmentLegStatus.COMPLETED:
-            raise ShipmentTransitionError("Cannot start destination-airport pickup: final leg is already completed.")
-
-        leg3.assigned_driver_id = actor_user_id
-
-        from_status = leg3.status
-        if leg3.status in {ShipmentLegStatus.PENDING, ShipmentLegStatus.ASSIGNED}:
-            leg3.status = ShipmentLegStatus.IN_PROGRESS
-            leg3.started_at_utc = leg3.started_at_utc or now_utc
-
-        shipment.current_leg_index = 3
-        shipment.overall_status = ShipmentStatus.IN_PROGRESS
-        _record_leg_transition(
-            shipment=shipment,
-            leg=leg3,
-            actor_user_id=actor_user_id,
-            pod_action=action,
-            from_status=from_status,
-            to_status=leg3.status,
-            latitude=latitude,
-            longitude=longitude,
-            event_at_utc=now_utc,
-        )
-        _enqueue_pod_notification(
-            shipment=shipment,
-            action=action,
-            actor_user_id=actor_user_id,
-            leg1=leg1,
-            leg3=leg3,
-            photo_blob_name=photo_blob_name,
-            signature_blob_name=signature_blob_name,
-        )
-        return action
-
-    if action == "CONSIGNEE_DROP":
-        if not leg3 or leg3.status != ShipmentLegStatus.IN_PROGRESS:
-            raise ShipmentTransitionError("Cannot mark consignee drop before destination-airport pickup.")
-
-        from_status = leg3.status
-        leg3.status = ShipmentLegStatus.COMPLETED
-        leg3.completed_at_utc = now_utc
-        shipment.current_leg_index = 3
-        shipment.overall_status = ShipmentStatus.DELIVERED
-        _record_leg_transition(
-            shipment=shipment,
-            leg=leg3,
-            actor_user_id=actor_user_id,
-            pod_action=action,
-            from_status=from_status,
-            to_status=leg3.status,
-            latitude=latitude,
-            longitude=longitude,
-            event_at_utc=now_utc,
-        )
-        _enqueue_pod_notification(
+    db.session.add(leg)
+
+    from_status = leg.status
+    if rule.claims_leg:
+        leg.assigned_driver_id = actor_user_id
+    leg.status = rule.to_status
+    if rule.to_status == ShipmentLegStatus.IN_PROGRESS:
+        leg.started_at_utc = leg.started_at_utc or now_utc
+    elif rule.to_status == ShipmentLegStatus.COMPLETED:
+        leg.completed_at_utc = now_utc
+
+    shipment.current_leg_index = rule.current_leg_index
+    shipment.overall_status = rule.shipment_status
+    transition = _record_leg_transition(
+        shipment=shipment,
+        leg=leg,
+        actor_user_id=actor_user_id,
+        pod_action=action,
+        from_status=from_status,
+        to_status=leg.status,
+        latitude=latitude,
+        longitude=longitude,
+        event_at_utc=now_utc,
+    )
+    db.session.flush()
+
+    if rule.notify:
+        payload = _pod_notification_payload(
             shipment=shipment,
             action=action,
             actor_user_id=actor_user_id,
-            leg1=leg1,
-            leg3=leg3,
+            leg1=legs_by_sequence.get(1),
+            leg3=legs_by_sequence.get(3),
             photo_blob_name=photo_blob_name,
             signature_blob_name=signature_blob_name,
+            transition_id=transition.id,
         )
-        return action
-
-    raise ShipmentTransitionError("Unsupported POD transition requested.")
+        if notifications is None:
+            enqueue_email_task(payload)
+        else:
+            stage_notification(payload)
+            notifications.append(payload)
+    return action
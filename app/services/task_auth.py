@@ -0,0 +1,130 @@
+"""Verification of the Google OIDC tokens Cloud Tasks attaches to task deliveries.
+
+``google.oauth2.id_token.verify_oauth2_token`` fetches Google's signing certificates on every
+call unless it is handed a caching transport. ``TaskTokenVerifier`` keeps the certificates for as
+long as Google's ``Cache-Control`` allows, fetches them on the pooled ``google_oauth`` session,
+and remembers tokens it has already verified until they expire. Cloud Tasks reuses one token for
+many deliveries, so most deliveries are verified without touching a certificate at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+
+from flask import current_app
+
+from app.services.http_clients import send_request
+
+GOOGLE_OAUTH2_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = frozenset({"accounts.google.com", "https://accounts.google.com"})
+TASK_TOKEN_VERIFIER_EXTENSION = "task_token_verifier"
+_DEFAULT_CERTS_MAX_AGE_SECONDS = 300
+# An unknown key id forces a refetch (Google rotated its keys), but no more often than this.
+_MIN_CERTS_REFRESH_SECONDS = 30
+_MAX_VERIFIED_TOKENS = 1024
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+_verifier_lock = threading.Lock()
+
+
+def _get_jwt_module():
+    try:
+        from google.auth import jwt
+    except ImportError as exc:
+        raise RuntimeError("google-auth is required to verify Cloud Tasks OIDC tokens.") from exc
+    return jwt
+
+
+def _cache_lifetime_seconds(headers) -> int:
+    match = _MAX_AGE_PATTERN.search(headers.get("Cache-Control", ""))
+    if not match:
+        return _DEFAULT_CERTS_MAX_AGE_SECONDS
+    try:
+        age = int(headers.get("Age", "0"))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class TaskTokenVerifier:
+    """Per-worker verifier with cached signing certificates and verified-token claims.
+
+    ``certs_file`` replaces the Google certificate endpoint with a local ``{key id: PEM
+    certificate}`` JSON file, for tests and emulators that sign their own tokens.
+    """
+
+    def __init__(self, certs_url: str, certs_file: str = "") -> None:
+        self.certs_url = certs_url
+        self.certs_file = certs_file
+        self._certs: dict[str, str] = {}
+        self._certs_expire_at = 0.0
+        self._certs_fetched_at = 0.0
+        self._verified: dict[str, tuple[float, str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def verify(self, token: str, audience: str) -> dict[str, object]:
+        """Return the token's claims, raising ``ValueError`` (or ``GoogleAuthError``) if it is invalid."""
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock:
+            cached = self._verified.get(token_hash)
+        if cached is not None and cached[0] > now and cached[1] == audience:
+            return dict(cached[2])
+
+        jwt = _get_jwt_module()
+        kid = jwt.decode_header(token).get("kid")
+        certs = self._get_certs()
+        if kid not in certs and time.monotonic() - self._certs_fetched_at >= _MIN_CERTS_REFRESH_SECONDS:
+            certs = self._get_certs(force=True)
+        claims = jwt.decode(token, certs=certs, audience=audience)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            from google.auth.exceptions import GoogleAuthError
+
+            raise GoogleAuthError(f"Wrong issuer {claims.get('iss')!r} for a Cloud Tasks token.")
+
+        expires_at = float(claims.get("exp", 0))
+        with self._lock:
+            if len(self._verified) >= _MAX_VERIFIED_TOKENS:
+                self._verified = {key: entry for key, entry in self._verified.items() if entry[0] > now}
+                while len(self._verified) >= _MAX_VERIFIED_TOKENS:
+                    self._verified.pop(next(iter(self._verified)))
+            self._verified[token_hash] = (expires_at, audience, dict(claims))
+        return claims
+
+    def _get_certs(self, force: bool = False) -> dict[str, str]:
+        with self._lock:
+            if not force and self._certs and self._certs_expire_at > time.monotonic():
+                return self._certs
+
+        if self.certs_file:
+            with open(self.certs_file, encoding="utf-8") as certs_file:
+                certs, lifetime = json.load(certs_file), _DEFAULT_CERTS_MAX_AGE_SECONDS
+        else:
+            response = send_request("google_oauth", "GET", self.certs_url, timeout=5)
+            response.raise_for_status()
+            certs, lifetime = response.json(), _cache_lifetime_seconds(response.headers)
+
+        fetched_at = time.monotonic()
+        with self._lock:
+            self._certs = certs
+            self._certs_fetched_at = fetched_at
+            self._certs_expire_at = fetched_at + lifetime
+        return certs
+
+
+def get_task_token_verifier() -> TaskTokenVerifier:
+    verifier = current_app.extensions.get(TASK_TOKEN_VERIFIER_EXTENSION)
+    if verifier is None:
+        with _verifier_lock:
+            verifier = current_app.extensions.get(TASK_TOKEN_VERIFIER_EXTENSION)
+            if verifier is None:
+                verifier = TaskTokenVerifier(
+                    certs_url=current_app.config.get("GOOGLE_OAUTH2_CERTS_URL") or GOOGLE_OAUTH2_CERTS_URL,
+                    certs_file=current_app.config.get("TASKS_OIDC_CERTS_FILE", ""),
+                )
+                current_app.extensions[TASK_TOKEN_VERIFIER_EXTENSION] = verifier
+    return verifier
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 import json
 
 from flask import current_app
 
+from app.instrumentation import track_outbound
+from app.services.bulkheads import guard
+from app.services.google_clients import get_client
+
 
 def _get_tasks_v2_module():
     try:
@@ -27,6 +32,7 @@ class EmailTaskPayload:
     signature_blob_name: str | None = None
     shipper_email: str | None = None
     consignee_email: str | None = None
+    transition_id: int | None = None
 
 
 @dataclass(slots=True)
@@ -65,7 +71,7 @@ def enqueue_email_task(payload: EmailTaskPayload) -> None:
         raise RuntimeError("TASK_SERVICE_ACCOUNT_EMAIL is required to enqueue Cloud Tasks email jobs.")
 
     tasks_v2 = _get_tasks_v2_module()
-    client = tasks_v2.CloudTasksClient()
+    client = get_client(tasks_v2.CloudTasksClient)
     parent = client.queue_path(project_id, region, queue_name)
     task = {
         "http_request": {
@@ -76,7 +82,8 @@ def enqueue_email_task(payload: EmailTaskPayload) -> None:
             "body": json.dumps(asdict(payload)).encode("utf-8"),
         }
     }
-    client.create_task(parent=parent, task=task)
+    with guard("cloud_tasks"), track_outbound("cloud_tasks"):
+        client.create_task(parent=parent, task=task)
 
 
 def _validate_couchdrop_required_fields(payload: CouchdropTaskPayload) -> None:
@@ -94,9 +101,7 @@ def _validate_couchdrop_required_fields(payload: CouchdropTaskPayload) -> None:
         raise ValueError("CouchdropTaskPayload.idempotency_key is required.")
 
 
-def enqueue_couchdrop_task(payload: CouchdropTaskPayload) -> None:
-    _validate_couchdrop_required_fields(payload)
-
+def _couchdrop_task_target():
     project_id = current_app.config.get("GCP_PROJECT_ID", "").strip()
     public_service_url = current_app.config.get("PUBLIC_SERVICE_URL", "").strip()
     service_account_email = current_app.config.get("TASK_SERVICE_ACCOUNT_EMAIL", "").strip()
@@ -115,15 +120,58 @@ def enqueue_couchdrop_task(payload: CouchdropTaskPayload) -> None:
         raise RuntimeError("TASK_SERVICE_ACCOUNT_EMAIL is required to enqueue Cloud Tasks couchdrop jobs.")
 
     tasks_v2 = _get_tasks_v2_module()
-    client = tasks_v2.CloudTasksClient()
+    client = get_client(tasks_v2.CloudTasksClient)
     parent = client.queue_path(project_id, region, queue_name)
-    task = {
-        "http_request": {
-            "http_method": tasks_v2.HttpMethod.POST,
-            "url": f"{public_service_url.rstrip('/')}/tasks/api/tasks/upload-couchdrop",
-            "headers": {"Content-Type": "application/json"},
-            "oidc_token": {"service_account_email": service_account_email},
-            "body": json.dumps(asdict(payload)).encode("utf-8"),
+
+    def build_task(payload: CouchdropTaskPayload) -> dict:
+        return {
+            "http_request": {
+                "http_method": tasks_v2.HttpMethod.POST,
+                "url": f"{public_service_url.rstrip('/')}/tasks/api/tasks/upload-couchdrop",
+                "headers": {"Content-Type": "application/json"},
+                "oidc_token": {"service_account_email": service_account_email},
+                "body": json.dumps(asdict(payload)).encode("utf-8"),
+            }
         }
-    }
-    client.create_task(parent=parent, task=task)
+
+    return client, parent, build_task
+
+
+def enqueue_couchdrop_task(payload: CouchdropTaskPayload) -> None:
+    _validate_couchdrop_required_fields(payload)
+    client, parent, build_task = _couchdrop_task_target()
+    with guard("cloud_tasks"), track_outbound("cloud_tasks"):
+        client.create_task(parent=parent, task=build_task(payload))
+
+
+def enqueue_couchdrop_tasks(payloads: list[CouchdropTaskPayload], max_concurrency: int = 8) -> list[Exception | None]:
+    """Enqueue a batch of Couchdrop uploads with one client and queue lookup.
+
+    Cloud Tasks has no batch-create RPC, so the ``create_task`` calls run concurrently, at most
+    ``max_concurrency`` at a time. Returns one entry per payload, in order: ``None`` once queued,
+    or the exception that kept it from being queued. Configuration errors still raise.
+    """
+    if not payloads:
+        return []
+    client, parent, build_task = _couchdrop_task_target()
+
+    def _create(payload: CouchdropTaskPayload) -> Exception | None:
+        try:
+            _validate_couchdrop_required_fields(payload)
+            client.create_task(parent=parent, task=build_task(payload))
+        except Exception as exc:
+            return exc
+        return None
+
+    # The whole batch holds one bulkhead slot; it only counts as a failure if nothing was queued.
+    with guard("cloud_tasks") as permit, track_outbound("cloud_tasks"):
+        if len(payloads) == 1:
+            errors = [_create(payloads[0])]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(max_concurrency, len(payloads)), thread_name_prefix="couchdrop-enqueue"
+            ) as executor:
+                errors = list(executor.map(_create, payloads))
+        if all(error is not None for error in errors):
+            permit.mark_failed()
+    return errors
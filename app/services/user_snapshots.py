@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from flask import current_app
+
+from app import db
+from models import User
+
+USER_SNAPSHOT_CACHE_EXTENSION = "user_snapshot_cache"
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Immutable view of the user fields read by guards, templates, and services."""
+
+    id: int
+    email: str
+    role: str
+    employee_approved: bool
+    is_active: bool
+    is_ops: bool
+    is_driver: bool
+    first_name: str | None = None
+    last_name: str | None = None
+    name: str | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        raw_role = getattr(user.role, "value", user.role)
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=str(raw_role or ""),
+            employee_approved=bool(user.employee_approved),
+            is_active=bool(user.is_active),
+            is_ops=bool(user.is_ops),
+            is_driver=bool(user.is_driver),
+            first_name=user.first_name,
+            last_name=user.last_name,
+            name=user.name,
+        )
+
+    def can_access_portal(self) -> bool:
+        return self.employee_approved and self.is_active
+
+
+class UserSnapshotCache:
+    """Per-worker TTL cache of user snapshots keyed by user id."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, tuple[float, UserSnapshot | None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> UserSnapshot | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        user = db.session.get(User, user_id)
+        snapshot = UserSnapshot.from_user(user) if user is not None else None
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl_seconds, snapshot)
+        return snapshot
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _get_cache() -> UserSnapshotCache:
+    cache = current_app.extensions.get(USER_SNAPSHOT_CACHE_EXTENSION)
+    if cache is None:
+        cache = UserSnapshotCache(ttl_seconds=current_app.config.get("USER_SNAPSHOT_TTL_SECONDS", 30))
+        current_app.extensions[USER_SNAPSHOT_CACHE_EXTENSION] = cache
+    return cache
+
+
+def get_user_snapshot(user_id: int) -> UserSnapshot | None:
+    return _get_cache().get(user_id)
+
+
+def invalidate_user_snapshot(user_id: int) -> None:
+    _get_cache().invalidate(user_id)
@@ -0,0 +1,40 @@
+"""Jinja bytecode cache wiring.
+
+When ``JINJA_BYTECODE_CACHE_DIR`` is set, compiled templates are persisted there.
+The container build runs ``flask compile-templates`` so a cold instance loads
+precompiled bytecode instead of parsing every template on its first render.
+"""
+
+import os
+
+import click
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+
+
+def configure_template_cache(app: Flask) -> None:
+    cache_dir = (app.config.get("JINJA_BYTECODE_CACHE_DIR") or "").strip()
+    if not cache_dir:
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+
+def compile_templates(app: Flask) -> list[str]:
+    """Load every template once so the bytecode cache (if configured) is populated."""
+    compiled: list[str] = []
+    for template_name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(template_name)
+        compiled.append(template_name)
+    return compiled
+
+
+def register_template_cache_commands(app: Flask) -> None:
+    @app.cli.command("compile-templates")
+    def compile_templates_command() -> None:
+        """Precompile Jinja templates into JINJA_BYTECODE_CACHE_DIR."""
+        if app.jinja_env.bytecode_cache is None:
+            raise click.ClickException("Set JINJA_BYTECODE_CACHE_DIR before compiling templates.")
+        compiled = compile_templates(app)
+        click.echo(f"Compiled {len(compiled)} templates into {app.config['JINJA_BYTECODE_CACHE_DIR']}.")
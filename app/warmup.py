@@ -0,0 +1,65 @@
+"""Worker warmup and post-fork hygiene used by ``gunicorn.conf.py``.
+
+Both entry points are best-effort: a failed warmup step is logged and the
+worker still starts, because readiness reporting is the authority on health.
+"""
+
+from __future__ import annotations
+
+from flask import Flask
+from sqlalchemy import text
+
+from app import db
+from app.services.bulkheads import reset_bulkheads
+from app.services.google_clients import reset_google_clients
+from app.services.http_clients import reset_http_sessions
+from app.template_cache import compile_templates
+
+
+def reset_after_fork(app: Flask) -> None:
+    """Drop connections and clients inherited from a preloading master process.
+
+    Pooled DB sockets, Google gRPC channels and outbound HTTP keep-alive sockets must never be
+    shared across processes, and bulkhead locks may have been held by a thread that did not
+    survive the fork.
+    ``close=False`` leaves the parent's sockets alone and just forgets them here.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    reset_google_clients()
+    reset_http_sessions()
+    reset_bulkheads()
+
+
+def _warm_database_pool(app: Flask, connections: int) -> int:
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = db.engine.connect()
+            connection.execute(text("SELECT 1"))
+            opened.append(connection)
+    finally:
+        # Returning the connections parks them in the pool for the first requests.
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def warm_up(app: Flask, db_connections: int) -> dict[str, object]:
+    """Open pooled DB connections, load templates, and prime readiness before serving."""
+    results: dict[str, object] = {}
+    steps = {
+        "db_connections": lambda: _warm_database_pool(app, db_connections),
+        "templates": lambda: len(compile_templates(app)),
+        "readiness": lambda: app.extensions["readiness_monitor"].get_report()["ok"],
+    }
+    for name, step in steps.items():
+        try:
+            with app.app_context():
+                results[name] = step()
+        except Exception as exc:
+            app.logger.warning("worker.warmup_step_failed step=%s error=%s", name, exc)
+            results[name] = None
+    app.logger.info("worker.warmup_completed")
+    return results
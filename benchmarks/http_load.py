@@ -0,0 +1,405 @@
+"""HTTP load test for the polled dashboard endpoints and the driver capture flow.
+
+Runs entirely offline. For each worker configuration the harness reseeds the database, then starts
+gunicorn (``gunicorn.conf.py``) on ``benchmarks.loadtest_app:app``, which serves the real app with
+GCS, Cloud Tasks and Postmark faked. Against that server it drives two kinds of virtual user:
+
+* ops users poll ``/api/deliveries/live`` and ``/load-board``;
+* drivers scan an HWB on ``/pod/scan`` and then submit the next POD action for it on ``/pod/event``,
+  walking each HWB from SHIPPER_PICKUP to CONSIGNEE_DROP.
+
+Load rises in steps: at step ``k`` there are ``k * --ops`` ops users and ``k * --drivers`` drivers.
+Each step reports RPS and p50/p95/p99 latency, overall and per endpoint. Each worker configuration
+reports its capacity: the highest RPS reached with p95 within ``--slo-p95-ms`` and under 1% errors.
+Virtual users authenticate with session cookies and CSRF tokens signed locally.
+
+The target database is dropped and recreated. Without ``--database-url`` a temporary SQLite
+file is used; point Postgres runs at a disposable database.
+
+Usage:
+    python benchmarks/http_load.py --worker-configs 1x4,2x4 --steps 1,2,4 --step-seconds 15
+    python benchmarks/http_load.py --database-url postgresql+psycopg://localhost/fsi_load --worker-configs 2x8,4x8
+    python benchmarks/http_load.py --json > benchmarks/baselines/http_load_sqlite.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import requests  # noqa: E402
+from flask import session  # noqa: E402
+from flask_wtf.csrf import generate_csrf  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from models import ExpectedDelivery, Role, User  # noqa: E402
+from seed_deliveries import seed_fleet  # noqa: E402
+
+ACTIONS = ("SHIPPER_PICKUP", "ORIGIN_AIRPORT_DROP", "DEST_AIRPORT_PICKUP", "CONSIGNEE_DROP")
+SECRET_KEY = "loadtest-only-secret-key"
+SIGNATURE_DATA_URL = "data:image/png;base64," + base64.b64encode(b"loadtest-signature").decode()
+PHOTO_BYTES = b"\xff\xd8\xff" + b"0" * 48_000
+
+
+@dataclass
+class Credentials:
+    user_id: int
+    cookie: str
+    csrf_token: str
+
+
+@dataclass
+class DriverPlan:
+    """One driver's remaining (hwb, action) pairs; carried across load steps."""
+
+    credentials: Credentials
+    pending: list[tuple[str, str]]
+    last_hwb: str
+
+
+@dataclass
+class StepSamples:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, endpoint: str, elapsed_ms: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies[endpoint].append(elapsed_ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = round(values[0], 2) if values else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50_ms": round(cuts[49], 2), "p95_ms": round(cuts[94], 2), "p99_ms": round(cuts[98], 2)}
+
+
+def build_seed_app(database_url: str):
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "SQLALCHEMY_ENGINE_OPTIONS": {},
+            "SECRET_KEY": SECRET_KEY,
+            "READINESS_BACKGROUND_REFRESH": False,
+            "SCHEMA_FAIL_FAST_ON_STARTUP": False,
+        }
+    )
+
+
+def sign_credentials(app, user_id: int) -> Credentials:
+    """Build the cookie and CSRF token a browser would hold after signing in."""
+    # A fresh app context each time: Flask-WTF caches the token on ``g``.
+    with app.app_context(), app.test_request_context():
+        session["current_user_id"] = user_id
+        csrf_token = generate_csrf()
+        cookie = app.session_interface.get_signing_serializer(app).dumps(dict(session))
+    return Credentials(user_id=user_id, cookie=cookie, csrf_token=csrf_token)
+
+
+def seed(app, *, ops_users: int, drivers: int, hwbs_per_driver: int) -> tuple[list[Credentials], list[DriverPlan]]:
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        fleet = seed_fleet(groups=drivers, hwbs_per_group=hwbs_per_driver, drivers=drivers)
+        ops = [
+            User(
+                email=f"loadtest-ops-{index}@example.com",
+                password_hash="loadtest",
+                role=Role.EMPLOYEE,
+                employee_approved=True,
+                is_ops=True,
+            )
+            for index in range(ops_users)
+        ]
+        db.session.add_all(ops)
+        all_hwbs = [hwb for hwbs in fleet.hwbs_by_driver.values() for hwb in hwbs]
+        db.session.add_all(
+            ExpectedDelivery(
+                batch_id=f"LOADTEST-{fleet.run_id}",
+                reference_id=hwb,
+                consignee_name=f"Consignee {hwb}",
+                destination_address="Phoenix, AZ",
+            )
+            for hwb in all_hwbs[:50]
+        )
+        db.session.commit()
+
+        ops_credentials = [sign_credentials(app, user.id) for user in ops]
+        plans = [
+            DriverPlan(
+                credentials=sign_credentials(app, driver_id),
+                pending=[(hwb, action) for hwb in hwbs for action in ACTIONS],
+                last_hwb=hwbs[0],
+            )
+            for driver_id, hwbs in fleet.hwbs_by_driver.items()
+        ]
+        db.session.remove()
+        db.engine.dispose()
+    return ops_credentials, plans
+
+
+def _session_for(app_cookie_name: str, credentials: Credentials) -> requests.Session:
+    http = requests.Session()
+    http.cookies.set(app_cookie_name, credentials.cookie)
+    http.headers["X-CSRFToken"] = credentials.csrf_token
+    # A redirect means the session was rejected (login page); count it instead of following it.
+    http.max_redirects = 0
+    return http
+
+
+def _timed(samples: StepSamples, endpoint: str, send) -> None:
+    started_at = time.perf_counter()
+    try:
+        response = send()
+        ok = response.status_code < 300
+    except requests.RequestException:
+        ok = False
+    samples.record(endpoint, (time.perf_counter() - started_at) * 1000, ok)
+
+
+def ops_user(base_url, cookie_name, credentials, samples, deadline, think_seconds) -> None:
+    http = _session_for(cookie_name, credentials)
+    while time.monotonic() < deadline:
+        _timed(samples, "GET /api/deliveries/live", lambda: http.get(f"{base_url}/api/deliveries/live", timeout=30))
+        time.sleep(think_seconds)
+        _timed(samples, "GET /load-board", lambda: http.get(f"{base_url}/load-board", timeout=30))
+        time.sleep(think_seconds)
+
+
+def driver_user(base_url, cookie_name, plan: DriverPlan, samples, deadline, think_seconds) -> None:
+    http = _session_for(cookie_name, plan.credentials)
+    while time.monotonic() < deadline:
+        hwb_number, action = plan.pending.pop(0) if plan.pending else (plan.last_hwb, None)
+        plan.last_hwb = hwb_number
+        _timed(samples, "POST /pod/scan", lambda: http.post(f"{base_url}/pod/scan", json={"hwb_number": hwb_number}, timeout=30))
+        time.sleep(think_seconds)
+        if action is None:
+            continue
+
+        form = {"hwb_number": hwb_number, "action_type": action, "recipient_name": "Load Test Receiver"}
+        files = None
+        if action == "CONSIGNEE_DROP":
+            form["signature_base64"] = SIGNATURE_DATA_URL
+            files = {"pod_photo": ("pod.jpg", PHOTO_BYTES, "image/jpeg")}
+        _timed(
+            samples,
+            "POST /pod/event",
+            lambda: http.post(
+                f"{base_url}/pod/event",
+                data=form,
+                files=files,
+                headers={"Accept": "application/json"},
+                timeout=60,
+            ),
+        )
+        time.sleep(think_seconds)
+
+
+def start_server(database_url: str, workers: int, threads: int, port: int, log_path: Path) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.pop("FSI_PRODUCTION", None)
+    env.update(
+        {
+            "APP_ENV": "local",
+            "DATABASE_URL": database_url,
+            "SECRET_KEY": SECRET_KEY,
+            "PORT": str(port),
+            "GUNICORN_WORKERS": str(workers),
+            "GUNICORN_THREADS": str(threads),
+            "DB_POOL_SIZE": str(threads),
+            "READINESS_BACKGROUND_REFRESH": "false",
+            "PROMETHEUS_MULTIPROC_DIR": tempfile.mkdtemp(prefix="fsi-loadtest-metrics-"),
+        }
+    )
+    log_file = log_path.open("w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "benchmarks.loadtest_app:app"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(120):
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}; see {log_path}")
+        try:
+            if requests.get(f"{base_url}/livez", timeout=1).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"gunicorn did not become live; see {log_path}")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def run_step(base_url, cookie_name, ops_credentials, plans, multiplier, args) -> dict:
+    samples = StepSamples()
+    deadline = time.monotonic() + args.step_seconds
+    threads = [
+        threading.Thread(
+            target=ops_user,
+            args=(base_url, cookie_name, credentials, samples, deadline, args.ops_think_ms / 1000),
+        )
+        for credentials in ops_credentials[: args.ops * multiplier]
+    ] + [
+        threading.Thread(
+            target=driver_user,
+            args=(base_url, cookie_name, plan, samples, deadline, args.driver_think_ms / 1000),
+        )
+        for plan in plans[: args.drivers * multiplier]
+    ]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    all_latencies = [value for values in samples.latencies.values() for value in values]
+    total_errors = sum(samples.errors.values())
+    return {
+        "ops_users": args.ops * multiplier,
+        "drivers": args.drivers * multiplier,
+        "requests": len(all_latencies),
+        "rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(total_errors / len(all_latencies), 4) if all_latencies else 0.0,
+        **_percentiles(all_latencies),
+        "endpoints": {
+            endpoint: {
+                "requests": len(values),
+                "errors": samples.errors.get(endpoint, 0),
+                **_percentiles(values),
+            }
+            for endpoint, values in sorted(samples.latencies.items())
+        },
+    }
+
+
+def run_config(workers: int, threads: int, database_url: str, args, log_dir: Path) -> dict:
+    seed_app = build_seed_app(database_url)
+    max_multiplier = max(args.steps)
+    ops_credentials, plans = seed(
+        seed_app,
+        ops_users=args.ops * max_multiplier,
+        drivers=args.drivers * max_multiplier,
+        hwbs_per_driver=args.hwbs_per_driver,
+    )
+    cookie_name = seed_app.config.get("SESSION_COOKIE_NAME", "session")
+
+    server = start_server(database_url, workers, threads, args.port, log_dir / f"gunicorn-{workers}x{threads}.log")
+    try:
+        base_url = f"http://127.0.0.1:{args.port}"
+        steps = [run_step(base_url, cookie_name, ops_credentials, plans, multiplier, args) for multiplier in args.steps]
+    finally:
+        stop_server(server)
+
+    within_slo = [step for step in steps if step["p95_ms"] <= args.slo_p95_ms and step["error_rate"] < 0.01]
+    return {
+        "workers": workers,
+        "threads": threads,
+        "capacity_rps": max((step["rps"] for step in within_slo), default=0.0),
+        "steps": steps,
+    }
+
+
+def print_report(summary: dict) -> None:
+    print(
+        f"HTTP load test: {summary['dialect']}, {summary['step_seconds']}s per step, "
+        f"p95 SLO {summary['slo_p95_ms']} ms, Python {summary['python']}"
+    )
+    for config in summary["configs"]:
+        print(
+            f"\n{config['workers']} worker(s) x {config['threads']} thread(s): "
+            f"capacity {config['capacity_rps']:.1f} req/s within SLO"
+        )
+        print(f"  {'ops':>4}{'drivers':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for step in config["steps"]:
+            print(
+                f"  {step['ops_users']:>4}{step['drivers']:>9}{step['rps']:>9.1f}{step['p50_ms']:>9.1f}"
+                f"{step['p95_ms']:>9.1f}{step['p99_ms']:>9.1f}{step['error_rate']:>8.1%}"
+            )
+        print("  p95 ms by endpoint, per step")
+        endpoints = sorted({name for step in config["steps"] for name in step["endpoints"]})
+        for endpoint in endpoints:
+            curve = "  ".join(
+                f"{step['endpoints'].get(endpoint, {}).get('p95_ms', 0.0):>7.1f}" for step in config["steps"]
+            )
+            print(f"    {endpoint:<26}{curve}")
+
+
+def _parse_worker_configs(raw: str) -> list[tuple[int, int]]:
+    configs = []
+    for item in raw.split(","):
+        workers, _, threads = item.strip().lower().partition("x")
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="Disposable database; defaults to a temporary SQLite file.")
+    parser.add_argument("--worker-configs", default="1x4,2x4", help="Comma-separated WORKERSxTHREADS, e.g. 1x4,2x8.")
+    parser.add_argument("--ops", type=int, default=2, help="Ops users at step multiplier 1.")
+    parser.add_argument("--drivers", type=int, default=4, help="Drivers at step multiplier 1.")
+    parser.add_argument("--steps", default="1,2,4", help="Comma-separated load multipliers.")
+    parser.add_argument("--step-seconds", type=float, default=15.0)
+    parser.add_argument("--ops-think-ms", type=int, default=500, help="Pause between an ops user's polls.")
+    parser.add_argument("--driver-think-ms", type=int, default=1000, help="Pause between a driver's requests.")
+    parser.add_argument("--hwbs-per-driver", type=int, default=25)
+    parser.add_argument("--slo-p95-ms", type=float, default=500.0)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON (for saving baselines).")
+    args = parser.parse_args(argv)
+    args.steps = [int(step) for step in args.steps.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="fsi-http-load-") as work_dir:
+        work_path = Path(work_dir)
+        database_url = args.database_url or f"sqlite:///{work_path / 'loadtest.db'}"
+        configs = [
+            run_config(workers, threads, database_url, args, work_path)
+            for workers, threads in _parse_worker_configs(args.worker_configs)
+        ]
+
+    summary = {
+        "python": sys.version.split()[0],
+        "dialect": database_url.split(":", 1)[0].split("+", 1)[0],
+        "step_seconds": args.step_seconds,
+        "slo_p95_ms": args.slo_p95_ms,
+        "configs": configs,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
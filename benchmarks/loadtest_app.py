@@ -0,0 +1,80 @@
+"""WSGI entrypoint for offline load tests: the real app with its external dependencies faked.
+
+``benchmarks/http_load.py`` serves this module under gunicorn:
+
+    gunicorn --config gunicorn.conf.py benchmarks.loadtest_app:app
+
+* GCS: ``GCSService.upload_file`` reads the upload and returns a fake ``/POD/...`` path.
+* Cloud Tasks: ``enqueue_*_task`` runs for real against an in-process ``CloudTasksClient`` fake.
+* Postmark: ``send_request`` in the Postmark service returns a canned 200.
+
+Each fake sleeps for a configurable latency, so outbound time still holds a worker thread as it
+would in production: ``LOADTEST_GCS_LATENCY_MS`` (default 40), ``LOADTEST_TASKS_LATENCY_MS``
+(25) and ``LOADTEST_POSTMARK_LATENCY_MS`` (80). Rate limiting is disabled because every virtual
+user shares one client address.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from app import create_app
+
+
+def _latency_seconds(name: str, default_ms: int) -> float:
+    return int(os.getenv(name, str(default_ms))) / 1000
+
+
+GCS_LATENCY = _latency_seconds("LOADTEST_GCS_LATENCY_MS", 40)
+TASKS_LATENCY = _latency_seconds("LOADTEST_TASKS_LATENCY_MS", 25)
+POSTMARK_LATENCY = _latency_seconds("LOADTEST_POSTMARK_LATENCY_MS", 80)
+
+
+def fake_upload_file(file_obj, folder: str = "pod_events") -> str | None:
+    if not file_obj or not getattr(file_obj, "filename", ""):
+        return None
+    file_obj.stream.seek(0)
+    file_obj.stream.read()
+    time.sleep(GCS_LATENCY)
+    return f"/POD/{folder}/{uuid.uuid4().hex}.bin"
+
+
+class FakeCloudTasksClient:
+    def queue_path(self, project: str, location: str, queue: str) -> str:
+        return f"projects/{project}/locations/{location}/queues/{queue}"
+
+    def create_task(self, parent: str, task: dict) -> dict:
+        time.sleep(TASKS_LATENCY)
+        return {"name": f"{parent}/tasks/{uuid.uuid4().hex}"}
+
+
+FAKE_TASKS_V2 = SimpleNamespace(CloudTasksClient=FakeCloudTasksClient, HttpMethod=SimpleNamespace(POST="POST"))
+
+
+def fake_postmark_send(dependency: str, method: str, url: str, **kwargs):
+    time.sleep(POSTMARK_LATENCY)
+    response = mock.Mock(status_code=200, ok=True, text='{"ErrorCode":0}')
+    response.json.return_value = {"ErrorCode": 0, "Message": "OK", "MessageID": uuid.uuid4().hex}
+    response.raise_for_status.return_value = None
+    return response
+
+
+def install_fakes() -> None:
+    mock.patch("app.services.gcs.GCSService.upload_file", side_effect=fake_upload_file).start()
+    mock.patch("app.services.tasks._get_tasks_v2_module", return_value=FAKE_TASKS_V2).start()
+    mock.patch("app.services.postmark.send_request", side_effect=fake_postmark_send).start()
+
+
+install_fakes()
+app = create_app(
+    {
+        "RATELIMIT_ENABLED": False,
+        "GCP_PROJECT_ID": "fsi-loadtest",
+        "PUBLIC_SERVICE_URL": "http://loadtest.invalid",
+        "TASK_SERVICE_ACCOUNT_EMAIL": "loadtest@fsi-loadtest.iam.gserviceaccount.com",
+    }
+)
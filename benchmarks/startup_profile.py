@@ -0,0 +1,154 @@
+"""Cold-start profile for ``create_app()``.
+
+Each trial runs in a fresh interpreter (``python -X importtime``) so module
+caches never leak between samples. Reports:
+
+* import-time breakdown by top-level module (self and cumulative),
+* init-time phases recorded by ``create_app()`` in ``app.extensions["startup_timings"]``,
+* time-to-first-request against ``/livez``.
+
+Usage:
+    python benchmarks/startup_profile.py --trials 5
+    python benchmarks/startup_profile.py --json > benchmarks/baselines/startup.json
+    python benchmarks/startup_profile.py --compare benchmarks/baselines/startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+_TRIAL_SNIPPET = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get("/livez")
+first_request = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (first_request - created) * 1000,
+    "total_ms": (first_request - started) * 1000,
+    "phases_ms": app.extensions.get("startup_timings", {}),
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> dict[str, dict[str, float]]:
+    """Collapse ``-X importtime`` output per top-level package.
+
+    ``self_ms`` sums the package's own module bodies wherever they were imported from;
+    ``cumulative_ms`` counts only imports triggered directly by the trial snippet.
+    """
+    modules: dict[str, dict[str, float]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_part, name = line.split("|", 2)
+        root = name.strip().split(".", 1)[0]
+        entry = modules.setdefault(root, {"self_ms": 0.0, "cumulative_ms": 0.0})
+        entry["self_ms"] += int(self_part.removeprefix("import time:").strip()) / 1000
+        if not name[1:].startswith(" "):
+            entry["cumulative_ms"] += int(cumulative_part.strip()) / 1000
+    return modules
+
+
+def run_trial(python: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("APP_ENV", "local")
+    env.pop("FSI_PRODUCTION", None)
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", _TRIAL_SNIPPET],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["imports"] = _parse_importtime(completed.stderr)
+    return result
+
+
+def summarize(trials: list[dict]) -> dict:
+    def _median(key: str) -> float:
+        return round(statistics.median(trial[key] for trial in trials), 2)
+
+    phase_names = sorted({name for trial in trials for name in trial["phases_ms"]})
+    module_names = {name for trial in trials for name in trial["imports"]}
+    imports = {
+        name: {
+            "self_ms": round(statistics.median(t["imports"].get(name, {}).get("self_ms", 0.0) for t in trials), 2),
+            "cumulative_ms": round(
+                statistics.median(t["imports"].get(name, {}).get("cumulative_ms", 0.0) for t in trials), 2
+            ),
+        }
+        for name in module_names
+    }
+    return {
+        "python": sys.version.split()[0],
+        "trials": len(trials),
+        "import_ms": _median("import_ms"),
+        "create_app_ms": _median("create_app_ms"),
+        "first_request_ms": _median("first_request_ms"),
+        "total_ms": _median("total_ms"),
+        "phases_ms": {
+            name: round(statistics.median(t["phases_ms"].get(name, 0.0) for t in trials), 2) for name in phase_names
+        },
+        "imports": dict(sorted(imports.items(), key=lambda item: item[1]["self_ms"], reverse=True)),
+    }
+
+
+def print_report(summary: dict, baseline: dict | None, top: int) -> None:
+    def _delta(key: str) -> str:
+        if not baseline or key not in baseline:
+            return ""
+        return f"  (baseline {baseline[key]:.1f} ms, {summary[key] - baseline[key]:+.1f} ms)"
+
+    print(f"Startup profile: median of {summary['trials']} cold interpreter(s), Python {summary['python']}")
+    for key in ("import_ms", "create_app_ms", "first_request_ms", "total_ms"):
+        print(f"  {key:<18} {summary[key]:>9.1f} ms{_delta(key)}")
+
+    if summary["phases_ms"]:
+        print("\ncreate_app() phases")
+        for name, value in summary["phases_ms"].items():
+            print(f"  {name:<18} {value:>9.1f} ms")
+
+    print(f"\nTop {top} packages by own import time")
+    for name, timing in list(summary["imports"].items())[:top]:
+        print(f"  {name:<24} {timing['self_ms']:>9.1f} ms  (cumulative at top level {timing['cumulative_ms']:.1f} ms)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON (for saving baselines).")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON produced by --json.")
+    args = parser.parse_args(argv)
+
+    summary = summarize([run_trial(args.python) for _ in range(args.trials)])
+    if args.json:
+        summary["imports"] = dict(list(summary["imports"].items())[: args.top])
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(summary, baseline, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
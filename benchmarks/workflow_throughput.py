@@ -0,0 +1,262 @@
+"""POD workflow throughput under concurrent simulated drivers.
+
+Seeds a synthetic fleet with ``seed_deliveries.seed_fleet`` and has one thread per driver walk
+each of its HWBs through SHIPPER_PICKUP -> ORIGIN_AIRPORT_DROP -> DEST_AIRPORT_PICKUP ->
+CONSIGNEE_DROP. Every transition runs in its own request context and commits, like a real
+``/pod/event`` submission. GCS uploads and Cloud Tasks enqueues are replaced with in-process
+fakes, so the numbers measure the workflow and the database rather than the network. Reports:
+
+* transitions per second across all drivers,
+* p50/p95/p99 latency, overall and per action,
+* queries per transition,
+* failures by exception type, including version conflicts that exhausted their retries.
+
+The target database is dropped and recreated. Without ``--database-url`` a temporary SQLite
+file is used; point Postgres runs at a disposable database.
+
+Usage:
+    python benchmarks/workflow_throughput.py --groups 20 --hwbs-per-group 10 --drivers 8
+    python benchmarks/workflow_throughput.py --database-url postgresql+psycopg://localhost/fsi_bench
+    python benchmarks/workflow_throughput.py --json > benchmarks/baselines/workflow_sqlite.json
+    python benchmarks/workflow_throughput.py --compare benchmarks/baselines/workflow_sqlite.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from flask import g  # noqa: E402
+from werkzeug.datastructures import FileStorage  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.instrumentation import RequestTiming  # noqa: E402
+from app.services.user_snapshots import get_user_snapshot  # noqa: E402
+from seed_deliveries import seed_fleet  # noqa: E402
+
+ACTIONS = ("SHIPPER_PICKUP", "ORIGIN_AIRPORT_DROP", "DEST_AIRPORT_PICKUP", "CONSIGNEE_DROP")
+ENTRYPOINTS = ("submit_pod", "apply_pod_transition")
+
+
+def build_app(database_url: str, drivers: int):
+    engine_options = {}
+    if database_url.startswith("sqlite"):
+        # One writer at a time; wait on the file lock rather than failing fast.
+        engine_options = {"connect_args": {"timeout": 30, "check_same_thread": False}}
+    else:
+        engine_options = {"pool_size": drivers, "max_overflow": 0, "pool_pre_ping": False}
+    return create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "SQLALCHEMY_ENGINE_OPTIONS": engine_options,
+            "READINESS_BACKGROUND_REFRESH": False,
+            "SCHEMA_FAIL_FAST_ON_STARTUP": False,
+            "SLOW_QUERY_THRESHOLD_MS": 0,
+        }
+    )
+
+
+def _fake_upload(file_obj, folder: str = "", *args, **kwargs) -> str:
+    return f"gs://benchmark/{folder}/{uuid.uuid4().hex}"
+
+
+def _run_transition(entrypoint: str, hwb_number: str, action: str, driver_id: int) -> None:
+    if entrypoint == "submit_pod":
+        from app.blueprints.paperwork.routes import submit_pod
+
+        submit_pod(
+            hwb_number=hwb_number,
+            action_type=action,
+            recipient_name="Benchmark Receiver",
+            pod_photo=FileStorage(stream=BytesIO(b"photo"), filename="pod.jpg", content_type="image/jpeg"),
+            signature_file=FileStorage(stream=BytesIO(b"signature"), filename="sig.png", content_type="image/png"),
+            latitude="32.2226",
+            longitude="-110.9747",
+            shipper=None,
+            consignee=None,
+            contact_name=None,
+            phone=None,
+            off_sheet_confirmed=False,
+            reassignment_note=None,
+        )
+        return
+
+    from app.services.shipment_workflow import apply_pod_transition
+    from models import Shipment
+
+    shipment = Shipment.query.filter_by(hwb_number=hwb_number).one()
+    apply_pod_transition(shipment=shipment, action_type=action, actor_user_id=driver_id)
+
+
+def drive(app, entrypoint: str, driver_id: int, hwb_numbers: list[str], samples: list, failures: Counter, lock) -> None:
+    for hwb_number in hwb_numbers:
+        for action in ACTIONS:
+            with app.test_request_context("/pod/event", method="POST"):
+                g.current_user = get_user_snapshot(driver_id)
+                g.request_timing = timing = RequestTiming()
+                try:
+                    _run_transition(entrypoint, hwb_number, action, driver_id)
+                    db.session.commit()
+                except Exception as exc:
+                    db.session.rollback()
+                    with lock:
+                        failures[type(exc).__name__] += 1
+                    break
+                elapsed_ms = timing.elapsed_ms()
+                with lock:
+                    samples.append((action, elapsed_ms, timing.db_queries))
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = round(values[0], 2) if values else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50_ms": round(cuts[49], 2), "p95_ms": round(cuts[94], 2), "p99_ms": round(cuts[98], 2)}
+
+
+def summarize(samples: list, failures: Counter, wall_seconds: float, config: dict) -> dict:
+    per_action = {}
+    for action in ACTIONS:
+        latencies = [elapsed for name, elapsed, _ in samples if name == action]
+        queries = [count for name, _, count in samples if name == action]
+        per_action[action] = {
+            "count": len(latencies),
+            **_percentiles(latencies),
+            "queries_mean": round(statistics.fmean(queries), 2) if queries else 0.0,
+            "queries_max": max(queries, default=0),
+        }
+    all_queries = [count for _, _, count in samples]
+    return {
+        "python": sys.version.split()[0],
+        "config": config,
+        "transitions": len(samples),
+        "wall_seconds": round(wall_seconds, 3),
+        "transitions_per_second": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        **_percentiles([elapsed for _, elapsed, _ in samples]),
+        "queries_per_transition": round(statistics.fmean(all_queries), 2) if all_queries else 0.0,
+        "failures": dict(failures),
+        "actions": per_action,
+    }
+
+
+def run(args) -> dict:
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory(prefix="fsi-workflow-bench-")
+        database_url = f"sqlite:///{Path(temp_dir.name) / 'bench.db'}"
+
+    app = build_app(database_url, args.drivers)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed = seed_fleet(groups=args.groups, hwbs_per_group=args.hwbs_per_group, drivers=args.drivers)
+
+    samples: list = []
+    failures: Counter = Counter()
+    lock = threading.Lock()
+    with (
+        mock.patch("app.services.gcs.GCSService.upload_file", side_effect=_fake_upload),
+        mock.patch("app.services.shipment_workflow.enqueue_email_task"),
+    ):
+        threads = [
+            threading.Thread(
+                target=drive,
+                args=(app, args.entrypoint, driver_id, hwbs, samples, failures, lock),
+                name=f"driver-{driver_id}",
+            )
+            for driver_id, hwbs in seed.hwbs_by_driver.items()
+        ]
+        started_at = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started_at
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    config = {
+        "dialect": database_url.split(":", 1)[0].split("+", 1)[0],
+        "entrypoint": args.entrypoint,
+        "groups": args.groups,
+        "hwbs_per_group": args.hwbs_per_group,
+        "drivers": args.drivers,
+    }
+    return summarize(samples, failures, wall_seconds, config)
+
+
+def print_report(summary: dict, baseline: dict | None) -> None:
+    def _delta(key: str, higher_is_better: bool = False) -> str:
+        if not baseline or key not in baseline or not baseline[key]:
+            return ""
+        change = (summary[key] - baseline[key]) / baseline[key] * 100
+        if abs(change) < 0.05:
+            return f"  (baseline {baseline[key]:.2f}, unchanged)"
+        direction = "better" if (change > 0) == higher_is_better else "worse"
+        return f"  (baseline {baseline[key]:.2f}, {change:+.1f}% {direction})"
+
+    config = summary["config"]
+    print(
+        f"Workflow throughput: {config['dialect']} via {config['entrypoint']}, {config['drivers']} drivers, "
+        f"{config['groups']}x{config['hwbs_per_group']} HWBs, Python {summary['python']}"
+    )
+    if baseline and baseline.get("config") != config:
+        print(f"  note: baseline was recorded with a different config: {baseline.get('config')}")
+    print(f"  {'transitions':<24} {summary['transitions']:>9}  in {summary['wall_seconds']:.2f}s")
+    print(f"  {'transitions_per_second':<24} {summary['transitions_per_second']:>9.2f}{_delta('transitions_per_second', True)}")
+    for key in ("p50_ms", "p95_ms", "p99_ms", "queries_per_transition"):
+        print(f"  {key:<24} {summary[key]:>9.2f}{_delta(key)}")
+    if summary["failures"]:
+        print(f"  {'failures':<24} {summary['failures']}")
+
+    print("\nPer action")
+    print(f"  {'action':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'max':>5}")
+    for action, stats in summary["actions"].items():
+        print(
+            f"  {action:<22}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+            f"{stats['p99_ms']:>10.2f}{stats['queries_mean']:>9.1f}{stats['queries_max']:>5}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="", help="Disposable database; defaults to a temporary SQLite file.")
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--hwbs-per-group", type=int, default=10)
+    parser.add_argument("--drivers", type=int, default=4)
+    parser.add_argument("--entrypoint", choices=ENTRYPOINTS, default="submit_pod")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON (for saving baselines).")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON produced by --json.")
+    args = parser.parse_args(argv)
+
+    summary = run(args)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(summary, baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
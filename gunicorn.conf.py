@@ -0,0 +1,92 @@
+"""Gunicorn runtime profile for Cloud Run.
+
+Sizing (each overridable by env var):
+- workers: ``GUNICORN_WORKERS`` / ``WEB_CONCURRENCY``, else one per available CPU.
+- threads: ``GUNICORN_THREADS``, else ``DB_POOL_SIZE``. Never more than
+  ``DB_POOL_SIZE + DB_MAX_OVERFLOW``: a thread beyond pool capacity can only wait
+  ``DB_POOL_TIMEOUT`` for a connection.
+- preload: ``GUNICORN_PRELOAD`` (default on) imports the app once in the master.
+  ``post_fork`` then discards the inherited DB pool and Google clients.
+
+``post_worker_init`` warms DB connections, templates, and the readiness report
+before the worker accepts its first request.
+
+Metrics: ``PROMETHEUS_MULTIPROC_DIR`` (default under the temp dir) is emptied and
+exported here, before the app import creates any metric, so ``/metrics`` can
+aggregate every worker. ``child_exit`` drops a dead worker's live gauges.
+"""
+
+import os
+import shutil
+import tempfile
+
+_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "prometheus_multiproc")
+)
+shutil.rmtree(_multiproc_dir, ignore_errors=True)
+os.makedirs(_multiproc_dir, exist_ok=True)
+
+from app.config import RuntimeSettings, _str_to_bool  # noqa: E402
+
+
+def _available_cpus() -> int:
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:  # pragma: no cover - non-Linux hosts
+        return max(1, os.cpu_count() or 1)
+
+
+def _env_int(*names: str) -> int | None:
+    for name in names:
+        raw = (os.getenv(name) or "").strip()
+        if raw:
+            return max(1, int(raw))
+    return None
+
+
+_settings = RuntimeSettings.model_validate(dict(os.environ))
+_pool_capacity = _settings.DB_POOL_SIZE + _settings.DB_MAX_OVERFLOW
+
+bind = f"0.0.0.0:{_settings.PORT}"
+workers = _env_int("GUNICORN_WORKERS", "WEB_CONCURRENCY") or _available_cpus()
+threads = min(_env_int("GUNICORN_THREADS") or _settings.DB_POOL_SIZE, _pool_capacity)
+worker_class = "gthread"
+preload_app = _str_to_bool(os.getenv("GUNICORN_PRELOAD"), default=True)
+timeout = _env_int("GUNICORN_TIMEOUT") or 120
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT") or 30
+keepalive = 5
+accesslog = None
+errorlog = "-"
+
+
+def on_starting(server):
+    server.log.info(
+        "gunicorn.profile workers=%s threads=%s preload=%s db_pool_size=%s db_max_overflow=%s",
+        workers,
+        threads,
+        preload_app,
+        _settings.DB_POOL_SIZE,
+        _settings.DB_MAX_OVERFLOW,
+    )
+
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+
+    from app.warmup import reset_after_fork
+
+    reset_after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    from app.warmup import warm_up
+
+    results = warm_up(worker.wsgi, db_connections=min(threads, _settings.DB_POOL_SIZE))
+    worker.log.info("worker.warmup pid=%s results=%s", worker.pid, results)
+
+
+def child_exit(server, worker):
+    from app.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
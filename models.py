@@ -13,6 +13,7 @@ from sqlalchemy import (
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import Mapped, relationship
 
@@ -33,6 +34,9 @@ SHIPMENT_LEGS_TABLE = "shipment_legs"
 SHIPMENT_LEG_TRANSITIONS_TABLE = "shipment_leg_transitions"
 POD_RECORDS_TABLE = "pod_records"
 NOTIFICATION_SETTINGS_TABLE = "notification_settings"
+PAPERWORK_UPLOADS_TABLE = "paperwork_uploads"
+EMAIL_DELIVERIES_TABLE = "email_deliveries"
+PENDING_NOTIFICATIONS_TABLE = "pending_notifications"
 
 
 class Role(str, Enum):
@@ -83,6 +87,13 @@ class ShipmentLegStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class PaperworkUploadStatus(str, Enum):
+    STAGED = "STAGED"
+    UPLOADING = "UPLOADING"
+    UPLOADED = "UPLOADED"
+    FAILED = "FAILED"
+
+
 class User(db.Model):
     """Paperwork Portal User model."""
 
@@ -134,6 +145,11 @@ class PODEvent(db.Model):
     signature_url = db.Column(db.String(512))
     photo_url = db.Column(db.String(512))
 
+    __table_args__ = (
+        # Latest event per delivery: WHERE reference_id = ? ORDER BY id DESC LIMIT 1.
+        Index("ix_pod_events_reference_id_id", "reference_id", "id"),
+    )
+
     def set_az_timestamp(self):
         utc_now = datetime.now(ZoneInfo("UTC"))
         self.az_timestamp = utc_now.astimezone(ZoneInfo("America/Phoenix"))
@@ -178,7 +194,7 @@ class ShipmentGroup(db.Model):
     created_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    shipments = relationship("Shipment", back_populates="shipment_group", cascade="all, delete-orphan")
+    shipments = relationship("Shipment", back_populates="shipment_group", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class Shipment(db.Model):
@@ -205,9 +221,27 @@ class Shipment(db.Model):
     )
     created_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version_id = db.Column(Integer, nullable=False, server_default="1")
 
     shipment_group = relationship("ShipmentGroup", back_populates="shipments")
-    legs = relationship("ShipmentLeg", back_populates="shipment", cascade="all, delete-orphan", order_by="ShipmentLeg.leg_sequence")
+    legs = relationship(
+        "ShipmentLeg",
+        back_populates="shipment",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="ShipmentLeg.leg_sequence",
+    )
+
+    __table_args__ = (
+        # Only open shipments are indexed; delivered/cancelled rows dominate the table.
+        Index(
+            "ix_shipments_open_overall_status",
+            "overall_status",
+            postgresql_where=text("overall_status NOT IN ('DELIVERED', 'CANCELLED')"),
+            sqlite_where=text("overall_status NOT IN ('DELIVERED', 'CANCELLED')"),
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version_id}
 
 
 class ShipmentLeg(db.Model):
@@ -248,13 +282,19 @@ class ShipmentLeg(db.Model):
     completed_at_utc = db.Column(DateTime(timezone=True), nullable=True)
     created_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
     updated_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version_id = db.Column(Integer, nullable=False, server_default="1")
 
     shipment = relationship("Shipment", back_populates="legs")
 
+    # Concurrent POD transitions, dispatch assignment and CSV imports write the same legs;
+    # a stale version raises StaleDataError instead of silently overwriting.
+    __mapper_args__ = {"version_id_col": version_id}
+
     __table_args__ = (
         UniqueConstraint("shipment_id", "leg_sequence", name="uq_shipment_legs_shipment_id_leg_sequence"),
         CheckConstraint("leg_sequence > 0", name="ck_shipment_legs_leg_sequence_positive"),
         Index("ix_shipment_legs_shipment_id_leg_sequence", "shipment_id", "leg_sequence"),
+        Index("ix_shipment_legs_assigned_driver_id_status", "assigned_driver_id", "status"),
     )
 
 
@@ -300,7 +340,7 @@ class PODRecord(db.Model):
     delivery_photo = db.Column(db.String(512), nullable=True)
     signature_image = db.Column(db.String(512), nullable=True)
     recipient_name = db.Column(db.String(120), nullable=True)
-    timestamp = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    timestamp = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True)
     driver_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     action_type = db.Column(db.String(64), nullable=False)
 
@@ -317,6 +357,11 @@ class PODRecord(db.Model):
     leg_sequence = db.Column(db.Integer, nullable=True)
     leg_type = db.Column(db.String(64), nullable=True)
 
+    __table_args__ = (
+        # Latest POD per HWB on the load board: WHERE hwb_number IN (...) ORDER BY id DESC.
+        Index("ix_pod_records_hwb_number_id", "hwb_number", "id"),
+    )
+
 
 class NotificationSettings(db.Model):
     __tablename__ = NOTIFICATION_SETTINGS_TABLE
@@ -327,3 +372,76 @@ class NotificationSettings(db.Model):
     notify_dest_pickup = db.Column(Boolean, nullable=False, default=False)
     notify_consignee_drop = db.Column(Boolean, nullable=False, default=False)
     custom_cc_emails = db.Column(Text, nullable=True)
+    # Bumped in SQL on every save; workers compare it to decide whether their cached copy is stale.
+    # Not a version_id_col: concurrent admin saves keep last-write-wins instead of raising.
+    version_id = db.Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version_id + 1"))
+
+
+class PaperworkUpload(db.Model):
+    """Ledger of driver paperwork sent to Couchdrop, one row per idempotency key."""
+
+    __tablename__ = PAPERWORK_UPLOADS_TABLE
+
+    id = db.Column(Integer, primary_key=True)
+    idempotency_key = db.Column(String(64), nullable=False)
+    actor_user_id = db.Column(Integer, ForeignKey("users.id"), nullable=False)
+    original_filename = db.Column(String(255), nullable=False)
+    content_type = db.Column(String(120), nullable=False)
+    staged_blob_name = db.Column(String(512), nullable=False)
+    remote_path = db.Column(String(512), nullable=False)
+    status = db.Column(
+        SQLAlchemyEnum(
+            PaperworkUploadStatus,
+            name="paperwork_upload_status_enum",
+            native_enum=False,
+            create_constraint=True,
+            validate_strings=True,
+        ),
+        nullable=False,
+        default=PaperworkUploadStatus.STAGED,
+    )
+    attempts = db.Column(Integer, nullable=False, default=0)
+    last_error = db.Column(String(120), nullable=True)
+    uploaded_at_utc = db.Column(DateTime(timezone=True), nullable=True)
+    created_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("idempotency_key", name="uq_paperwork_uploads_idempotency_key"),
+        # Per-driver history, newest first: WHERE actor_user_id = ? ORDER BY id DESC.
+        Index("ix_paperwork_uploads_actor_user_id_id", "actor_user_id", "id"),
+    )
+
+
+class EmailDelivery(db.Model):
+    """Shipment alert emails already sent, so a redelivered Cloud Task does not send twice."""
+
+    __tablename__ = EMAIL_DELIVERIES_TABLE
+
+    id = db.Column(Integer, primary_key=True)
+    delivery_key = db.Column(String(255), nullable=False)
+    shipment_id = db.Column(Integer, nullable=True)
+    action_type = db.Column(String(64), nullable=False)
+    transition_id = db.Column(Integer, nullable=True)
+    task_name = db.Column(String(500), nullable=True)
+    sent_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("delivery_key", name="uq_email_deliveries_delivery_key"),)
+
+
+class PendingNotification(db.Model):
+    """Outbox of shipment alerts committed with their transition but not yet on Cloud Tasks."""
+
+    __tablename__ = PENDING_NOTIFICATIONS_TABLE
+
+    id = db.Column(Integer, primary_key=True)
+    transition_id = db.Column(
+        Integer, ForeignKey("shipment_leg_transitions.id", ondelete="CASCADE"), nullable=False
+    )
+    payload = db.Column(Text, nullable=False)
+    attempts = db.Column(Integer, nullable=False, default=0)
+    last_error = db.Column(String(120), nullable=True)
+    created_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    updated_at_utc = db.Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("transition_id", name="uq_pending_notifications_transition_id"),)
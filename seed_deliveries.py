@@ -1,14 +1,130 @@
+"""Seed demo data.
+
+With no arguments this seeds a small batch of expected deliveries (the original demo data).
+``--fleet`` instead generates a synthetic fleet for load testing and benchmarks:
+N shipment groups (MAWBs), M HWBs per group with the standard three legs, and D drivers
+who own both the first and last mile of the HWBs dealt to them.
+
+Usage:
+    python seed_deliveries.py
+    python seed_deliveries.py --fleet --groups 50 --hwbs-per-group 20 --drivers 10
+"""
+
+from __future__ import annotations
+
+import argparse
 import uuid
+from dataclasses import dataclass, field
+
 from app import create_app, db
-from models import ExpectedDelivery
+from models import (
+    ExpectedDelivery,
+    Role,
+    Shipment,
+    ShipmentGroup,
+    ShipmentLeg,
+    ShipmentLegStatus,
+    ShipmentLegType,
+    ShipmentStatus,
+    User,
+)
+
+
+@dataclass
+class FleetSeed:
+    run_id: str
+    driver_ids: list[int]
+    hwbs_by_driver: dict[int, list[str]] = field(default_factory=dict)
+
+    @property
+    def hwb_count(self) -> int:
+        return sum(len(hwbs) for hwbs in self.hwbs_by_driver.values())
+
+
+def seed_fleet(*, groups: int, hwbs_per_group: int, drivers: int, run_id: str | None = None) -> FleetSeed:
+    """Create ``groups`` MAWBs with ``hwbs_per_group`` three-leg HWBs each, dealt round-robin to ``drivers``.
+
+    Must run inside an app context. Commits once per shipment group.
+    """
+    run_id = run_id or uuid.uuid4().hex[:6].upper()
+    driver_users = [
+        User(
+            email=f"fleet-{run_id.lower()}-driver-{index}@example.com",
+            password_hash="seeded-driver",
+            name=f"Fleet Driver {index}",
+            role=Role.EMPLOYEE,
+            employee_approved=True,
+            is_driver=True,
+        )
+        for index in range(1, drivers + 1)
+    ]
+    db.session.add_all(driver_users)
+    db.session.commit()
+
+    seed = FleetSeed(run_id=run_id, driver_ids=[user.id for user in driver_users])
+    seed.hwbs_by_driver = {driver_id: [] for driver_id in seed.driver_ids}
+    dealt = 0
+    for group_index in range(1, groups + 1):
+        group = ShipmentGroup(
+            mawb_number=f"MAWB-{run_id}-{group_index:04d}",
+            carrier="FLEET_SIM",
+            origin_airport="TUS",
+            destination_airport="PHX",
+        )
+        for hwb_index in range(1, hwbs_per_group + 1):
+            driver_id = seed.driver_ids[dealt % drivers]
+            dealt += 1
+            hwb_number = f"HWB-{run_id}-{group_index:04d}-{hwb_index:03d}"
+            shipment = Shipment(
+                hwb_number=hwb_number,
+                shipment_group=group,
+                shipper_address=f"{hwb_index} Shipper Way, Tucson, AZ",
+                consignee_address=f"{hwb_index} Consignee Ave, Phoenix, AZ",
+                overall_status=ShipmentStatus.PENDING,
+            )
+            shipment.legs = [
+                ShipmentLeg(
+                    leg_sequence=1,
+                    leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
+                    from_location_type="SHIPPER",
+                    to_location_type="ORIGIN_AIRPORT",
+                    from_address=shipment.shipper_address,
+                    to_airport="TUS",
+                    assigned_driver_id=driver_id,
+                    status=ShipmentLegStatus.ASSIGNED,
+                ),
+                ShipmentLeg(
+                    leg_sequence=2,
+                    leg_type=ShipmentLegType.AIRPORT_TO_AIRPORT,
+                    from_location_type="ORIGIN_AIRPORT",
+                    to_location_type="DESTINATION_AIRPORT",
+                    from_airport="TUS",
+                    to_airport="PHX",
+                ),
+                ShipmentLeg(
+                    leg_sequence=3,
+                    leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE,
+                    from_location_type="DESTINATION_AIRPORT",
+                    to_location_type="CONSIGNEE",
+                    from_airport="PHX",
+                    to_address=shipment.consignee_address,
+                    assigned_driver_id=driver_id,
+                    status=ShipmentLegStatus.ASSIGNED,
+                ),
+            ]
+            seed.hwbs_by_driver[driver_id].append(hwb_number)
+        db.session.add(group)
+        db.session.commit()
+    return seed
+
 
 def seed_expected_deliveries():
     app = create_app()
-    
+
     with app.app_context():
         # Generate a mock batch ID to group this specific route/manifest
         current_batch_id = f"BATCH-{uuid.uuid4().hex[:6].upper()}"
-        
+
         deliveries = [
             ExpectedDelivery(
                 batch_id=current_batch_id,
@@ -32,9 +148,34 @@ def seed_expected_deliveries():
                 status="PENDING"
             )
         ]
-        
+
         try:
             db.session.bulk_save_objects(deliveries)
             db.session.commit()
             print(f"Successfully seeded {len(deliveries)} deliveries for batch {current_batch_id}.")
         except Exception as e:
+            db.session.rollback()
+            print(f"Failed to seed deliveries: {e}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fleet", action="store_true", help="Generate a synthetic shipment fleet instead of demo deliveries.")
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--hwbs-per-group", type=int, default=10)
+    parser.add_argument("--drivers", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if not args.fleet:
+        seed_expected_deliveries()
+        return 0
+
+    app = create_app()
+    with app.app_context():
+        seed = seed_fleet(groups=args.groups, hwbs_per_group=args.hwbs_per_group, drivers=args.drivers)
+    print(f"Seeded fleet {seed.run_id}: {args.groups} MAWBs, {seed.hwb_count} HWBs, {len(seed.driver_ids)} drivers.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
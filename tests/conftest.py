@@ -1,8 +1,17 @@
+import json
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
+from flask import request_finished
 
 from app import create_app, db
+from app.instrumentation import get_request_timing
+from app.query_inspection import repeated_statements
+from app.services.bulkheads import reset_bulkheads
+from app.services.http_clients import reset_http_sessions
 from models import Role, User
 
 os.environ.setdefault("GCP_PROJECT_ID", "test-project")
@@ -15,9 +24,13 @@ os.environ.setdefault("TASKS_EXPECTED_QUEUE_NAME", "email-queue")
 os.environ.setdefault("TASKS_EXPECTED_INVOKER_SERVICE_ACCOUNT_EMAIL", "tasks-invoker@example.iam.gserviceaccount.com")
 os.environ.setdefault("TASKS_EXPECTED_AUDIENCE", "https://example.run.app/tasks/api/tasks/send-email")
 
+DEFAULT_QUERY_REPEAT_LIMIT = 5
+
 
 @pytest.fixture()
 def app():
+    # Bulkheads are per process; a circuit opened by one test must not fail the next one fast.
+    reset_bulkheads()
     app = create_app(
         {
             "TESTING": True,
@@ -25,6 +38,7 @@ def app():
             "SQLALCHEMY_ENGINE_OPTIONS": {},
             "WTF_CSRF_ENABLED": False,
             "RATELIMIT_ENABLED": False,
+            "READINESS_BACKGROUND_REFRESH": False,
             "GCP_PROJECT_ID": "test-project",
             "PUBLIC_SERVICE_URL": "https://example.run.app",
             "TASK_SERVICE_ACCOUNT_EMAIL": "tasks-invoker@example.iam.gserviceaccount.com",
@@ -56,3 +70,145 @@ def create_user(app):
         return user.id
 
     return _create_user
+
+
+@pytest.fixture()
+def trusted_task_tokens(app, monkeypatch):
+    """Accept any Cloud Tasks bearer token as an OIDC token from the expected invoker."""
+    monkeypatch.setattr(
+        "app.blueprints.tasks.routes._verify_task_oidc_token",
+        lambda token, audience: {
+            "iss": "https://accounts.google.com",
+            "email": app.config["TASKS_EXPECTED_INVOKER_SERVICE_ACCOUNT_EMAIL"],
+            "email_verified": True,
+            "aud": audience,
+        },
+    )
+
+
+class QueryRepeatRecorder:
+    """Collects statements that one request ran more than ``limit`` times (N+1 patterns)."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.violations: list[tuple[str, str, int]] = []
+
+    def __call__(self, sender, response, **extra) -> None:
+        from flask import request
+
+        timing = get_request_timing()
+        if timing is None:
+            return
+        for statement, count in repeated_statements(timing.statement_counts, self.limit):
+            self.violations.append((f"{request.method} {request.path}", statement, count))
+
+    def assert_clean(self) -> None:
+        if self.violations:
+            lines = [f"{route}: {count}x {statement}" for route, statement, count in self.violations]
+            pytest.fail(
+                f"Statements repeated more than {self.limit} times in one request:\n" + "\n".join(lines),
+                pytrace=False,
+            )
+
+
+@pytest.fixture()
+def query_repeat_guard(app, request):
+    marker = request.node.get_closest_marker("query_repeat_limit")
+    recorder = QueryRepeatRecorder(marker.args[0] if marker else DEFAULT_QUERY_REPEAT_LIMIT)
+    with request_finished.connected_to(recorder, app):
+        yield recorder
+
+
+@pytest.fixture(autouse=True)
+def _enforce_query_repeat_limit(request):
+    if request.node.get_closest_marker("query_repeat_limit") is None:
+        yield
+        return
+    recorder = request.getfixturevalue("query_repeat_guard")
+    yield
+    recorder.assert_clean()
+
+
+class StubHTTPServer:
+    """Local HTTP/1.1 server standing in for Postmark/Couchdrop.
+
+    Queue responses per ``(method, path)`` with ``respond``; unqueued calls get ``200 {}``.
+    Every request is recorded, along with the client port so tests can assert keep-alive reuse.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.client_ports: set[int] = set()
+        self._responses: dict[tuple[str, str], list[tuple[int, dict, dict]]] = {}
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self) -> None:
+                parsed = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with stub._lock:
+                    stub.client_ports.add(self.client_address[1])
+                    stub.requests.append(
+                        {
+                            "method": self.command,
+                            "path": parsed.path,
+                            "query": {key: values[-1] for key, values in parse_qs(parsed.query).items()},
+                            "headers": dict(self.headers),
+                            "body": body,
+                        }
+                    )
+                    queued = stub._responses.get((self.command, parsed.path))
+                    status, payload, headers = queued.pop(0) if queued else (200, {}, {})
+                encoded = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            do_GET = do_POST = do_PUT = _handle
+
+            def log_message(self, format, *args) -> None:
+                return None
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def respond(self, method: str, path: str, status: int = 200, payload: dict | list | None = None, headers=None) -> None:
+        self._responses.setdefault((method, path), []).append((status, payload or {}, headers or {}))
+
+    def calls(self, method: str, path: str) -> list[dict]:
+        return [entry for entry in self.requests if entry["method"] == method and entry["path"] == path]
+
+    def start(self) -> "StubHTTPServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture()
+def http_stub(app):
+    """Start a stub server, point Postmark, Couchdrop and Google certs at it, and use fresh pooled sessions."""
+    stub = StubHTTPServer().start()
+    app.config.update(
+        POSTMARK_API_URL=stub.url,
+        COUCHDROP_API_URL=stub.url,
+        COUCHDROP_FILEIO_URL=stub.url,
+        GOOGLE_OAUTH2_CERTS_URL=f"{stub.url}/oauth2/v1/certs",
+        OUTBOUND_HTTP_RETRY_BACKOFF_MS=1,
+    )
+    reset_http_sessions()
+    yield stub
+    reset_http_sessions()
+    stub.stop()
@@ -0,0 +1,148 @@
+import base64
+import json
+import os
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app import db
+from app.services.attachments import AttachmentRenditionCache, build_email_attachments, render_for_email
+from app.services.postmark import send_shipment_alert
+from models import NotificationSettings
+
+
+def _image_bytes(fmt: str, size: tuple[int, int], noise: bool = False) -> bytes:
+    image = Image.effect_noise(size, 64).convert("RGB") if noise else Image.new("RGB", size, "white")
+    output = BytesIO()
+    image.save(output, fmt)
+    return output.getvalue()
+
+
+@pytest.fixture()
+def pod_mount(app, tmp_path, monkeypatch):
+    mount = tmp_path / "POD"
+    (mount / "pod_events").mkdir(parents=True)
+    monkeypatch.setattr("app.services.attachments.POD_MOUNT_ROOT", str(mount))
+    app.config["ATTACHMENT_CACHE_DIR"] = str(tmp_path / "renditions")
+    return mount
+
+
+def test_rendition_is_encoded_once_and_shared_through_disk(app, pod_mount, tmp_path):
+    (pod_mount / "pod_events" / "photo.jpg").write_bytes(_image_bytes("JPEG", (3200, 2400), noise=True))
+    cache = AttachmentRenditionCache(max_entries=4, cache_dir=str(tmp_path / "renditions"), max_dimension=800, max_disk_bytes=1 << 20)
+
+    first = cache.get("/POD/pod_events/photo.jpg")
+    with Image.open(BytesIO(base64.b64decode(first["Content"]))) as rendition:
+        assert max(rendition.size) == 800
+    assert (first["ContentType"], first["ContentID"]) == ("image/jpeg", "cid:photo.jpg")
+    assert cache.get("/POD/pod_events/photo.jpg") is first
+
+    # Another worker finds the encoded entry on disk without reading the source again.
+    (pod_mount / "pod_events" / "photo.jpg").unlink()
+    other_worker = AttachmentRenditionCache(max_entries=4, cache_dir=str(tmp_path / "renditions"), max_dimension=800, max_disk_bytes=1 << 20)
+    assert other_worker.get("/POD/pod_events/photo.jpg") == first
+
+
+def test_lru_keeps_only_the_most_recent_blobs(app, pod_mount, tmp_path):
+    for name in ("a.png", "b.png"):
+        (pod_mount / "pod_events" / name).write_bytes(_image_bytes("PNG", (20, 20)))
+    cache = AttachmentRenditionCache(max_entries=1, cache_dir=str(tmp_path / "renditions"), max_dimension=1600, max_disk_bytes=1 << 20)
+
+    cache.get("pod_events/a.png")
+    cache.get("pod_events/b.png")
+
+    assert list(cache._entries) == ["pod_events/b.png"]
+
+
+def test_disk_tier_evicts_the_oldest_renditions_past_its_cap(app, pod_mount, tmp_path):
+    cache_dir = tmp_path / "renditions"
+    for index in range(3):
+        (pod_mount / "pod_events" / f"{index}.png").write_bytes(_image_bytes("PNG", (20, 20)))
+    cache = AttachmentRenditionCache(max_entries=4, cache_dir=str(cache_dir), max_dimension=1600, max_disk_bytes=1 << 20)
+    cache.get("pod_events/0.png")
+    entry_bytes = next(cache_dir.iterdir()).stat().st_size
+    cache.max_disk_bytes = entry_bytes * 2
+
+    cache.get("pod_events/1.png")
+    oldest = cache._disk_path("pod_events/0.png")
+    os.utime(oldest, (1, 1))
+    cache.get("pod_events/2.png")
+
+    assert len(list(cache_dir.iterdir())) == 2
+    assert not os.path.exists(oldest)
+
+
+def test_media_past_the_budget_falls_back_to_a_signed_link(app, pod_mount):
+    (pod_mount / "pod_events" / "sig.png").write_bytes(_image_bytes("PNG", (40, 20)))
+    (pod_mount / "pod_events" / "photo.jpg").write_bytes(_image_bytes("JPEG", (200, 200), noise=True))
+    app.config["ATTACHMENT_PAYLOAD_BUDGET_KB"] = 2
+
+    attachments, fields = build_email_attachments(
+        [
+            ("signature_url", "pod_events/sig.png", "https://signed/sig.png"),
+            ("photo_url", "pod_events/photo.jpg", "https://signed/photo.jpg"),
+        ]
+    )
+
+    assert [attachment["Name"] for attachment in attachments] == ["sig.png"]
+    assert fields == {"signature_url": "cid:sig.png", "photo_url": "https://signed/photo.jpg"}
+
+
+def test_render_for_email_downscales_large_photos(app):
+    original = BytesIO()
+    Image.effect_noise((3200, 2400), 64).convert("RGB").save(original, "JPEG", quality=95)
+
+    rendition, content_type = render_for_email(original.getvalue(), "image/jpeg", 800)
+
+    assert content_type == "image/jpeg"
+    assert len(rendition) < len(original.getvalue())
+    with Image.open(BytesIO(rendition)) as image:
+        assert max(image.size) == 800
+
+
+def test_media_without_a_rendition_is_linked_not_inlined(app, pod_mount, monkeypatch):
+    (pod_mount / "pod_events" / "photo.jpg").write_bytes(b"not an image")
+    (pod_mount / "pod_events" / "sig.png").write_bytes(_image_bytes("PNG", (40, 20)))
+
+    attachments, fields = build_email_attachments(
+        [
+            ("signature_url", "pod_events/sig.png", "https://signed/sig.png"),
+            ("photo_url", "pod_events/photo.jpg", "https://signed/photo.jpg"),
+        ]
+    )
+
+    assert [attachment["Name"] for attachment in attachments] == ["sig.png"]
+    assert fields == {"signature_url": "cid:sig.png", "photo_url": "https://signed/photo.jpg"}
+
+    monkeypatch.setattr("app.services.attachments._get_image_modules", lambda: None)
+    assert render_for_email(_image_bytes("PNG", (40, 20)), "image/png", 800) is None
+
+
+def test_consignee_drop_alert_inlines_cached_media(app, http_stub, pod_mount):
+    (pod_mount / "pod_events" / "photo.jpg").write_bytes(_image_bytes("JPEG", (60, 40)))
+    (pod_mount / "pod_events" / "sig.png").write_bytes(_image_bytes("PNG", (40, 20)))
+    db.session.add(NotificationSettings(notify_consignee_drop=True))
+    db.session.commit()
+
+    sent, reason = send_shipment_alert(
+        action_type="CONSIGNEE_DROP",
+        hwb_number="HWB777",
+        location_name="PHX",
+        driver_email="driver@example.com",
+        driver_name="Driver One",
+        photo_url="https://signed/photo.jpg",
+        signature_url="https://signed/sig.png",
+        shipper_email=None,
+        consignee_email=None,
+        timestamp="2025-01-01 09:00 AM MST",
+        photo_blob_name="/POD/pod_events/photo.jpg",
+        signature_blob_name="/POD/pod_events/sig.png",
+    )
+
+    assert (sent, reason) == (True, "sent")
+    [call] = http_stub.calls("POST", "/email/withTemplate")
+    payload = json.loads(call["body"])
+    assert [attachment["Name"] for attachment in payload["Attachments"]] == ["sig.png", "photo.jpg"]
+    assert payload["TemplateModel"]["photo_url"] == "cid:photo.jpg"
+    assert payload["TemplateModel"]["signature_url"] == "cid:sig.png"
@@ -0,0 +1,132 @@
+import pytest
+
+from app import db
+from models import Role, Shipment, ShipmentGroup, ShipmentLeg, ShipmentLegStatus, ShipmentLegType, User
+
+
+def _create_user(email: str, role=Role.EMPLOYEE, is_ops=False, is_driver=False) -> int:
+    user = User(
+        email=email,
+        password_hash="test-hash",
+        role=role,
+        employee_approved=True,
+        is_ops=is_ops,
+        is_driver=is_driver,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def _login(client, user_id: int) -> None:
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user_id
+
+
+def _create_shipment(group: ShipmentGroup, hwb_number: str, current_leg_index=1, first_leg_status=ShipmentLegStatus.PENDING):
+    shipment = Shipment(hwb_number=hwb_number, shipment_group=group, current_leg_index=current_leg_index)
+    shipment.legs = [
+        ShipmentLeg(leg_sequence=1, leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT, status=first_leg_status),
+        ShipmentLeg(leg_sequence=2, leg_type=ShipmentLegType.AIRPORT_TO_AIRPORT, status=ShipmentLegStatus.PENDING),
+        ShipmentLeg(leg_sequence=3, leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE, status=ShipmentLegStatus.PENDING),
+    ]
+    db.session.add(shipment)
+    return shipment
+
+
+def _leg(hwb_number: str, leg_sequence: int) -> ShipmentLeg:
+    return db.session.execute(
+        db.select(ShipmentLeg).join(Shipment).where(Shipment.hwb_number == hwb_number, ShipmentLeg.leg_sequence == leg_sequence)
+    ).scalar_one()
+
+
+@pytest.fixture()
+def dispatch(client):
+    ops_id = _create_user("bulk-ops@example.com", role=Role.ADMIN, is_ops=True)
+    driver_id = _create_user("bulk-driver@example.com", is_driver=True)
+    group = ShipmentGroup(mawb_number="MAWB-BULK-1")
+    _create_shipment(group, "HWB-B1")
+    _create_shipment(group, "HWB-B2", current_leg_index=3)
+    _create_shipment(ShipmentGroup(mawb_number="MAWB-BULK-2"), "HWB-B3", first_leg_status=ShipmentLegStatus.COMPLETED)
+    db.session.commit()
+    _login(client, ops_id)
+    return driver_id
+
+
+@pytest.mark.query_repeat_limit(1)
+def test_bulk_assign_updates_current_legs_and_reports_each_hwb(client, dispatch):
+    response = client.post(
+        "/load-board/assign-driver/bulk",
+        json={"hwb_numbers": ["HWB-B1", "HWB-B2", "HWB-B3", "HWB-MISSING"], "driver_id": dispatch},
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated_count"] == 2
+    assert body["results"] == [
+        {"hwb_number": "HWB-B1", "status": "assigned"},
+        {"hwb_number": "HWB-B2", "status": "assigned"},
+        {"hwb_number": "HWB-B3", "status": "no_open_leg"},
+        {"hwb_number": "HWB-MISSING", "status": "not_found"},
+    ]
+
+    db.session.expire_all()
+    assert (_leg("HWB-B1", 1).assigned_driver_id, _leg("HWB-B1", 1).status) == (dispatch, ShipmentLegStatus.ASSIGNED)
+    assert (_leg("HWB-B2", 3).assigned_driver_id, _leg("HWB-B2", 3).status) == (dispatch, ShipmentLegStatus.ASSIGNED)
+    assert _leg("HWB-B2", 1).assigned_driver_id is None
+
+
+def test_bulk_assign_by_mawb_with_leg_selector_and_unassign(client, dispatch):
+    response = client.post(
+        "/load-board/assign-driver/bulk",
+        json={"mawb_number": "MAWB-BULK-1", "driver_id": dispatch, "leg": "last_mile"},
+    )
+
+    assert response.status_code == 200
+    assert [result["hwb_number"] for result in response.get_json()["results"]] == ["HWB-B1", "HWB-B2"]
+    db.session.expire_all()
+    assert _leg("HWB-B1", 3).assigned_driver_id == dispatch
+    assert _leg("HWB-B1", 1).assigned_driver_id is None
+
+    response = client.post(
+        "/load-board/assign-driver/bulk",
+        json={"hwb_numbers": ["HWB-B1"], "driver_id": None, "leg": "LAST_MILE"},
+    )
+
+    assert response.get_json()["results"] == [{"hwb_number": "HWB-B1", "status": "unassigned"}]
+    db.session.expire_all()
+    assert (_leg("HWB-B1", 3).assigned_driver_id, _leg("HWB-B1", 3).status) == (None, ShipmentLegStatus.PENDING)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"driver_id": 1},
+        {"hwb_numbers": ["HWB-B1"], "mawb_number": "MAWB-BULK-1"},
+        {"hwb_numbers": "HWB-B1"},
+        {"hwb_numbers": ["HWB-B1"], "leg": "MIDDLE"},
+        {"hwb_numbers": ["HWB-B1"], "driver_id": "abc"},
+    ],
+)
+def test_bulk_assign_rejects_invalid_payloads(client, dispatch, payload):
+    assert client.post("/load-board/assign-driver/bulk", json=payload).status_code == 400
+
+
+def test_bulk_assign_requires_ops_and_known_driver(client, dispatch):
+    assert client.post(
+        "/load-board/assign-driver/bulk", json={"hwb_numbers": ["HWB-B1"], "driver_id": 9999}
+    ).status_code == 404
+
+    _login(client, dispatch)
+    assert client.post(
+        "/load-board/assign-driver/bulk", json={"hwb_numbers": ["HWB-B1"], "driver_id": dispatch}
+    ).status_code == 403
+
+
+def test_load_board_renders_bulk_assignment_controls(client, dispatch):
+    response = client.get("/load-board")
+
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert 'class="fsi-load-select" value="HWB-B1"' in html
+    assert "bulkAssignDriver()" in html
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from app.services.bulkheads import OPEN, BulkheadRejected, get_bulkhead, guard
+from app.services.http_clients import DependencyUnavailable, send_request
+
+
+def test_circuit_opens_after_consecutive_failures_and_fails_fast(app, http_stub):
+    app.config.update(BULKHEAD_FAILURE_THRESHOLD=2, OUTBOUND_HTTP_RETRY_ATTEMPTS=1)
+    for _ in range(2):
+        http_stub.respond("GET", "/server", status=503)
+        assert send_request("postmark", "GET", f"{http_stub.url}/server", timeout=5).status_code == 503
+
+    assert get_bulkhead("postmark").breaker.state == OPEN
+    with pytest.raises(DependencyUnavailable):
+        send_request("postmark", "GET", f"{http_stub.url}/server", timeout=5)
+    assert len(http_stub.calls("GET", "/server")) == 2
+
+    # Other dependencies keep their own circuit.
+    assert send_request("couchdrop", "GET", f"{http_stub.url}/manage/fileprops", timeout=5).status_code == 200
+
+
+def test_half_open_trial_call_closes_the_circuit(app, http_stub):
+    app.config.update(BULKHEAD_FAILURE_THRESHOLD=1, BULKHEAD_RESET_SECONDS=0, OUTBOUND_HTTP_RETRY_ATTEMPTS=1)
+    http_stub.respond("GET", "/server", status=503)
+    send_request("postmark", "GET", f"{http_stub.url}/server", timeout=5)
+
+    assert send_request("postmark", "GET", f"{http_stub.url}/server", timeout=5).status_code == 200
+    assert get_bulkhead("postmark").breaker.state == "closed"
+
+
+def test_full_bulkhead_rejects_without_waiting(app):
+    app.config.update(BULKHEAD_MAX_CONCURRENT=1, BULKHEAD_MAX_QUEUE=0)
+    entered, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with app.app_context(), guard("couchdrop"):
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    try:
+        assert entered.wait(5)
+        with pytest.raises(BulkheadRejected) as excinfo:
+            with guard("couchdrop"):
+                pass
+        assert excinfo.value.reason == "queue_full"
+        assert get_bulkhead("couchdrop").health()["in_flight"] == 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_retries_stop_at_the_dependency_deadline(app, http_stub, monkeypatch):
+    app.config.update(OUTBOUND_HTTP_RETRY_ATTEMPTS=5)
+    monkeypatch.setattr(get_bulkhead("couchdrop"), "deadline_seconds", 0.05)
+    http_stub.respond("GET", "/manage/fileprops", status=503, headers={"Retry-After": "1"})
+
+    response = send_request("couchdrop", "GET", f"{http_stub.url}/manage/fileprops", timeout=5)
+
+    assert response.status_code == 503
+    assert len(http_stub.calls("GET", "/manage/fileprops")) == 1
+
+
+def test_readyz_reports_bulkheads_without_failing(app, client):
+    app.config.update(BULKHEAD_FAILURE_THRESHOLD=1)
+    with pytest.raises(RuntimeError):
+        with guard("postmark"):
+            raise RuntimeError("boom")
+
+    response = client.get("/readyz")
+
+    bulkheads = response.get_json()["components"]["bulkheads"]
+    assert bulkheads["ok"] is True
+    assert bulkheads["postmark"]["state"] == OPEN
@@ -0,0 +1,70 @@
+from io import BytesIO
+from types import SimpleNamespace
+
+from werkzeug.datastructures import FileStorage
+
+from app.services.couchdrop import CouchdropFolderCache, CouchdropService
+
+DRIVER = SimpleNamespace(id=7, first_name="Jane", last_name="Doe")
+
+
+def _scan(name: str = "scan.pdf") -> FileStorage:
+    return FileStorage(stream=BytesIO(b"%PDF-1.4 scan"), filename=name, content_type="application/pdf")
+
+
+def test_repeat_uploads_skip_the_folder_walk(app, http_stub, monkeypatch):
+    monkeypatch.setenv("COUCHDROP_TOKEN", "token")
+
+    assert CouchdropService.upload_driver_paperwork(DRIVER, _scan("one.pdf")) is True
+    first_batch = len(http_stub.requests)
+    assert CouchdropService.upload_driver_paperwork(DRIVER, _scan("two.pdf")) is True
+
+    assert first_batch == 4  # three fileprops checks and the upload
+    assert [call["path"] for call in http_stub.requests[first_batch:]] == ["/file/upload"]
+
+
+def test_sibling_folders_reuse_cached_parents(app, http_stub):
+    http_stub.respond("GET", "/manage/fileprops", status=404)
+
+    assert CouchdropService._ensure_path_exists("token", "/Paperwork/Jane_Doe/2026-10-19") is True
+    walked = len(http_stub.requests)
+    assert CouchdropService._ensure_path_exists("token", "/Paperwork/Jane_Doe/2026-10-20") is True
+
+    assert [call["query"]["path"] for call in http_stub.requests[walked:]] == ["/Paperwork/Jane_Doe/2026-10-20"]
+
+
+def test_path_error_invalidates_and_recreates_the_folder(app, http_stub, monkeypatch):
+    monkeypatch.setenv("COUCHDROP_TOKEN", "token")
+    assert CouchdropService.upload_driver_paperwork(DRIVER, _scan("one.pdf")) is True
+    http_stub.requests.clear()
+    http_stub.respond("POST", "/file/upload", status=404, payload={"error": "path does not exist"})
+    http_stub.respond("GET", "/manage/fileprops", status=200)
+    http_stub.respond("GET", "/manage/fileprops", status=200)
+    http_stub.respond("GET", "/manage/fileprops", status=404)
+
+    assert CouchdropService.upload_driver_paperwork(DRIVER, _scan("two.pdf")) is True
+
+    assert [(call["method"], call["path"]) for call in http_stub.requests] == [
+        ("POST", "/file/upload"),
+        ("GET", "/manage/fileprops"),
+        ("GET", "/manage/fileprops"),
+        ("GET", "/manage/fileprops"),
+        ("POST", "/file/mkdir"),
+        ("POST", "/file/upload"),
+    ]
+
+
+def test_cache_entries_expire_and_invalidate_by_token():
+    cache = CouchdropFolderCache(ttl_seconds=60)
+    cache.add("token", "/a/b/c")
+    cache.add("other", "/a/b")
+
+    assert cache.contains("token", "/a") and cache.contains("token", "/a/b/c")
+    cache.invalidate("token", "/a/b")
+    assert not cache.contains("token", "/a")
+    assert not cache.contains("token", "/a/b/c")
+    assert cache.contains("other", "/a/b")
+
+    expired = CouchdropFolderCache(ttl_seconds=0)
+    expired.add("token", "/a")
+    assert not expired.contains("token", "/a")
@@ -0,0 +1,165 @@
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from io import BytesIO
+from types import SimpleNamespace
+
+from werkzeug.datastructures import FileStorage
+
+from app.services.couchdrop import CouchdropService
+from app.services.http_clients import MultipartFileStream
+
+SCAN = b"%PDF-1.4 " + bytes(range(256)) * 4096
+
+
+class _FakeBlob:
+    def __init__(self, data: bytes) -> None:
+        self.size = len(data)
+        self._data = data
+        self.read_sizes: list[int] = []
+
+    def open(self, mode, chunk_size):
+        blob = self
+
+        class _Reader(BytesIO):
+            def read(self, size=-1):
+                blob.read_sizes.append(size)
+                return super().read(size)
+
+        return _Reader(self._data)
+
+
+class _FakeBucket:
+    def __init__(self, blobs: dict) -> None:
+        self.blobs = blobs
+        self.metadata_fetches = 0
+
+    def get_blob(self, name):
+        self.metadata_fetches += 1
+        return self.blobs.get(name)
+
+
+def _use_bucket(app, monkeypatch, bucket):
+    app.config["GCS_BUCKET_NAME"] = "staging-bucket"
+    monkeypatch.setenv("COUCHDROP_TOKEN", "token")
+    client = type("Client", (), {"bucket": lambda self, name: bucket})()
+    monkeypatch.setattr("app.services.couchdrop.get_storage_client", lambda: client)
+
+
+def _uploaded_file(call) -> tuple[str, bytes]:
+    content_type = call["headers"]["Content-Type"]
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + call["body"])
+    [part] = message.iter_parts()
+    return part.get_filename(), part.get_payload(decode=True)
+
+
+def test_staged_upload_streams_blob_with_one_metadata_fetch(app, http_stub, monkeypatch):
+    blob = _FakeBlob(SCAN)
+    bucket = _FakeBucket({"couchdrop_queue/scan.pdf": blob})
+    _use_bucket(app, monkeypatch, bucket)
+
+    uploaded, reason = CouchdropService.upload_staged_paperwork(
+        "couchdrop_queue/scan.pdf", "/Paperwork/Jane_Doe/2026-10-19/scan.pdf", "scan.pdf", "application/pdf"
+    )
+
+    assert (uploaded, reason) == (True, "uploaded")
+    assert bucket.metadata_fetches == 1
+    assert max(blob.read_sizes) < len(SCAN)
+    [call] = http_stub.calls("POST", "/file/upload")
+    assert call["query"]["path"] == "/Paperwork/Jane_Doe/2026-10-19/scan.pdf"
+    assert int(call["headers"]["Content-Length"]) == len(call["body"])
+    assert _uploaded_file(call) == ("scan.pdf", SCAN)
+
+
+def test_staged_upload_resends_the_whole_stream_after_a_transient_error(app, http_stub, monkeypatch):
+    _use_bucket(app, monkeypatch, _FakeBucket({"couchdrop_queue/scan.pdf": _FakeBlob(SCAN)}))
+    http_stub.respond("POST", "/file/upload", status=503)
+
+    uploaded, _ = CouchdropService.upload_staged_paperwork(
+        "couchdrop_queue/scan.pdf", "/Paperwork/Jane_Doe/2026-10-19/scan.pdf", "scan.pdf", "application/pdf"
+    )
+
+    assert uploaded is True
+    attempts = http_stub.calls("POST", "/file/upload")
+    assert len(attempts) == 2
+    assert _uploaded_file(attempts[1]) == ("scan.pdf", SCAN)
+
+
+def test_staged_upload_skips_missing_and_empty_blobs(app, http_stub, monkeypatch):
+    _use_bucket(app, monkeypatch, _FakeBucket({"couchdrop_queue/empty.pdf": _FakeBlob(b"")}))
+
+    assert CouchdropService.upload_staged_paperwork("couchdrop_queue/gone.pdf", "/P/x.pdf", "x.pdf", None) == (
+        False,
+        "staged_blob_missing",
+    )
+    assert CouchdropService.upload_staged_paperwork("couchdrop_queue/empty.pdf", "/P/x.pdf", "x.pdf", None) == (
+        False,
+        "staged_blob_empty",
+    )
+    assert http_stub.requests == []
+
+
+def test_multipart_stream_reads_in_blocks_and_rewinds():
+    stream = MultipartFileStream("file", 'odd"name.pdf', BytesIO(b"abcdef"), 6, "application/pdf")
+
+    first = b"".join(iter(lambda: stream.read(5), b""))
+    stream.seek(0)
+
+    assert len(first) == len(stream)
+    assert stream.read() == first
+    assert b'filename="odd_name.pdf"' in first
+
+
+def test_staging_hashes_and_uploads_from_the_request_stream(app, monkeypatch):
+    uploads = []
+
+    class _Blob:
+        def __init__(self, name):
+            self.name = name
+
+        def upload_from_file(self, stream, rewind, size, content_type):
+            if rewind:
+                stream.seek(0)
+            uploads.append((self.name, stream.read(), size, content_type))
+
+    bucket = SimpleNamespace(blob=_Blob)
+    monkeypatch.setattr("app.services.couchdrop.get_storage_client", lambda: SimpleNamespace(bucket=lambda name: bucket))
+    app.config["GCS_BUCKET_NAME"] = "staging-bucket"
+    driver = SimpleNamespace(id=7, first_name="Jane", last_name="Doe")
+    scan = FileStorage(stream=BytesIO(SCAN), filename="scan 1.pdf", content_type="application/pdf")
+
+    payload = CouchdropService.stage_driver_paperwork_for_task(driver, scan)
+
+    [(blob_name, data, size, content_type)] = uploads
+    assert (data, size, content_type) == (SCAN, len(SCAN), "application/pdf")
+    assert blob_name == payload["staged_blob_name"]
+    assert payload["original_filename"] == "scan_1.pdf"
+    assert payload["idempotency_key"] in blob_name
+
+
+def test_batch_staging_gets_a_slot_for_every_staging_thread(app, monkeypatch):
+    # The shared gcs bulkhead has 3 slots and would turn the 4th slow upload away after 50 ms.
+    app.config.update(PAPERWORK_STAGING_WORKERS=4, BULKHEAD_MAX_CONCURRENT=3, BULKHEAD_QUEUE_WAIT_MS=50)
+    all_uploading = threading.Barrier(4, timeout=5)
+
+    class _SlowBlob:
+        def __init__(self, name):
+            self.name = name
+
+        def upload_from_file(self, stream, rewind, size, content_type):
+            all_uploading.wait()
+            time.sleep(0.2)
+
+    bucket = SimpleNamespace(blob=_SlowBlob)
+    monkeypatch.setattr("app.services.couchdrop.get_storage_client", lambda: SimpleNamespace(bucket=lambda name: bucket))
+    app.config["GCS_BUCKET_NAME"] = "staging-bucket"
+    driver = SimpleNamespace(id=7, first_name="Jane", last_name="Doe")
+    scans = [
+        FileStorage(stream=BytesIO(SCAN + bytes([index])), filename=f"scan-{index}.pdf", content_type="application/pdf")
+        for index in range(4)
+    ]
+
+    results = CouchdropService.stage_paperwork_batch(driver, scans)
+
+    assert [result["original_filename"] for result in results] == [f"scan-{index}.pdf" for index in range(4)]
@@ -0,0 +1,71 @@
+from app import db
+from models import EmailDelivery
+
+
+def _deliver(client, task_name: str, **payload):
+    return client.post(
+        "/tasks/api/tasks/send-email",
+        headers={"X-CloudTasks-TaskName": task_name, "Authorization": "Bearer valid-token"},
+        json={"shipment_id": 7, "action_type": "CONSIGNEE_DROP", "actor_user_id": 1, **payload},
+    )
+
+
+def _fake_outbound(monkeypatch, outcomes=None):
+    sends, signed = [], []
+    outcomes = iter(outcomes or [])
+
+    def _fake_send(**kwargs):
+        sends.append(kwargs)
+        return next(outcomes, (True, "sent"))
+
+    monkeypatch.setattr("app.blueprints.tasks.routes.send_shipment_alert", _fake_send)
+    monkeypatch.setattr(
+        "app.blueprints.tasks.routes.generate_signed_url",
+        lambda blob_name: signed.append(blob_name) or f"https://signed/{blob_name}",
+    )
+    return sends, signed
+
+
+def test_redelivered_task_is_acknowledged_without_sending_again(client, monkeypatch, trusted_task_tokens):
+    sends, signed = _fake_outbound(monkeypatch)
+
+    first = _deliver(client, "task-dedup-1", photo_blob_name="pods/photo.jpg")
+    again = _deliver(client, "task-dedup-1", photo_blob_name="pods/photo.jpg")
+
+    assert first.get_json() == {"status": "ok"}
+    assert again.status_code == 200
+    assert again.get_json() == {"status": "skipped", "reason": "already_sent"}
+    assert len(sends) == 1
+    assert signed == ["pods/photo.jpg"]
+    assert db.session.query(EmailDelivery).one().delivery_key == "task:task-dedup-1"
+
+
+def test_transition_id_deduplicates_across_task_names(client, monkeypatch, trusted_task_tokens):
+    sends, _ = _fake_outbound(monkeypatch)
+
+    assert _deliver(client, "task-a", transition_id=41).get_json() == {"status": "ok"}
+    assert _deliver(client, "task-b", transition_id=41).get_json()["reason"] == "already_sent"
+    assert _deliver(client, "task-c", transition_id=42).get_json() == {"status": "ok"}
+
+    assert len(sends) == 2
+    delivery = db.session.query(EmailDelivery).filter_by(transition_id=41).one()
+    assert (delivery.delivery_key, delivery.task_name) == ("transition:7:CONSIGNEE_DROP:41", "task-a")
+
+
+def test_failed_send_is_not_recorded_so_the_retry_sends(client, monkeypatch, trusted_task_tokens):
+    sends, _ = _fake_outbound(monkeypatch, outcomes=[(False, "postmark_api_rejection")])
+
+    assert _deliver(client, "task-retry", transition_id=9).status_code == 500
+    assert _deliver(client, "task-retry", transition_id=9).get_json() == {"status": "ok"}
+
+    assert len(sends) == 2
+    assert db.session.query(EmailDelivery).count() == 1
+
+
+def test_malformed_transition_id_is_rejected(client, monkeypatch, trusted_task_tokens):
+    _fake_outbound(monkeypatch)
+
+    response = _deliver(client, "task-bad", transition_id="abc")
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid transition_id for email task."
@@ -0,0 +1,65 @@
+import runpy
+from pathlib import Path
+
+from app import db
+from app.services import google_clients
+from app.warmup import reset_after_fork, warm_up
+
+GUNICORN_CONFIG_PATH = Path(__file__).resolve().parents[1] / "gunicorn.conf.py"
+
+
+def _load_gunicorn_config(monkeypatch, tmp_path, **env):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+    for name in ("GUNICORN_WORKERS", "WEB_CONCURRENCY", "GUNICORN_THREADS", "GUNICORN_PRELOAD"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(GUNICORN_CONFIG_PATH))
+
+
+def test_threads_default_to_db_pool_size(monkeypatch, tmp_path):
+    config = _load_gunicorn_config(monkeypatch, tmp_path, DB_POOL_SIZE="6", DB_MAX_OVERFLOW="2", GUNICORN_WORKERS="3")
+
+    assert config["workers"] == 3
+    assert config["threads"] == 6
+    assert config["worker_class"] == "gthread"
+    assert config["preload_app"] is True
+    assert (tmp_path / "metrics").is_dir()
+
+
+def test_threads_are_capped_at_pool_capacity(monkeypatch, tmp_path):
+    config = _load_gunicorn_config(
+        monkeypatch,
+        tmp_path,
+        DB_POOL_SIZE="2",
+        DB_MAX_OVERFLOW="1",
+        GUNICORN_THREADS="16",
+        GUNICORN_PRELOAD="false",
+    )
+
+    assert config["threads"] == 3
+    assert config["preload_app"] is False
+
+
+def test_reset_after_fork_disposes_pool_and_drops_google_clients(app, monkeypatch):
+    disposed = []
+    google_clients._clients[object] = object()
+    monkeypatch.setattr(type(db.engine), "dispose", lambda engine, close=True: disposed.append(close))
+
+    reset_after_fork(app)
+
+    assert disposed == [False]
+    assert google_clients._clients == {}
+
+
+def test_warm_up_primes_pool_templates_and_readiness(app, monkeypatch):
+    monkeypatch.setattr(
+        "app.schema_checks.get_readiness_report",
+        lambda: {"ok": True, "components": {}, "errors": {}},
+    )
+
+    results = warm_up(app, db_connections=2)
+
+    assert results["db_connections"] == 2
+    assert results["templates"] > 0
+    assert results["readiness"] is True
@@ -0,0 +1,73 @@
+import pytest
+import requests
+
+from app.metrics import OUTBOUND_REQUESTS
+from app.services.couchdrop import CouchdropService
+from app.services.http_clients import backoff_seconds, send_request
+
+
+def _outcome_count(dependency: str, outcome: str) -> float:
+    return OUTBOUND_REQUESTS.labels(dependency=dependency, outcome=outcome)._value.get()
+
+
+def test_send_request_reuses_one_keep_alive_connection(app, http_stub):
+    for _ in range(3):
+        assert send_request("couchdrop", "GET", f"{http_stub.url}/manage/fileprops", timeout=5).status_code == 200
+
+    assert len(http_stub.requests) == 3
+    assert len(http_stub.client_ports) == 1
+
+
+def test_idempotent_calls_retry_transient_statuses(app, http_stub):
+    http_stub.respond("GET", "/manage/fileprops", status=503)
+    http_stub.respond("GET", "/manage/fileprops", status=429, headers={"Retry-After": "0"})
+    retried_before = _outcome_count("couchdrop", "retried")
+
+    response = send_request("couchdrop", "GET", f"{http_stub.url}/manage/fileprops", timeout=5)
+
+    assert response.status_code == 200
+    assert len(http_stub.calls("GET", "/manage/fileprops")) == 3
+    assert _outcome_count("couchdrop", "retried") - retried_before == 2
+
+
+def test_non_idempotent_calls_are_sent_once_unless_marked(app, http_stub):
+    http_stub.respond("POST", "/file/mkdir", status=503)
+    assert send_request("couchdrop", "POST", f"{http_stub.url}/file/mkdir", timeout=5).status_code == 503
+    assert len(http_stub.calls("POST", "/file/mkdir")) == 1
+
+    http_stub.respond("POST", "/file/mkdir", status=503)
+    assert send_request("couchdrop", "POST", f"{http_stub.url}/file/mkdir", timeout=5, idempotent=True).status_code == 200
+    assert len(http_stub.calls("POST", "/file/mkdir")) == 3
+
+
+def test_connection_errors_raise_after_the_last_attempt(app, http_stub):
+    closed_url = http_stub.url
+    http_stub.stop()
+    errors_before = _outcome_count("postmark", "error")
+
+    with pytest.raises(requests.ConnectionError):
+        send_request("postmark", "GET", f"{closed_url}/server", timeout=1)
+
+    assert _outcome_count("postmark", "error") - errors_before == 1
+
+
+def test_backoff_is_jittered_within_the_exponential_cap():
+    delays = [backoff_seconds(3, 0.2) for _ in range(200)]
+    assert all(0 <= delay <= 0.8 for delay in delays)
+    assert len(set(delays)) > 1
+    assert backoff_seconds(20, 0.2) <= 5.0
+
+
+def test_couchdrop_folder_walk_creates_missing_segments_over_one_connection(app, http_stub):
+    http_stub.respond("GET", "/manage/fileprops", status=200)
+    http_stub.respond("GET", "/manage/fileprops", status=404)
+    http_stub.respond("GET", "/manage/fileprops", status=404)
+
+    assert CouchdropService._ensure_path_exists("token", "/Paperwork/Jane_Doe/2026-10-19") is True
+
+    assert [call["query"]["path"] for call in http_stub.calls("POST", "/file/mkdir")] == [
+        "/Paperwork/Jane_Doe",
+        "/Paperwork/Jane_Doe/2026-10-19",
+    ]
+    assert all(call["headers"]["token"] == "token" for call in http_stub.requests)
+    assert len(http_stub.client_ports) == 1
@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import event, text
+
+from app import db
+from models import (
+    PODRecord,
+    Role,
+    Shipment,
+    ShipmentGroup,
+    ShipmentLeg,
+    ShipmentLegStatus,
+    ShipmentLegType,
+    ShipmentStatus,
+    User,
+)
+
+
+def _login_ops(client) -> int:
+    user = User(
+        email="clear-ops@example.com",
+        password_hash="test-hash",
+        role=Role.ADMIN,
+        employee_approved=True,
+        is_ops=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+    return user.id
+
+
+def _create_shipments(statuses: dict[str, ShipmentStatus]) -> None:
+    group = ShipmentGroup(mawb_number="MAWB-CLEAR-1")
+    db.session.add(group)
+    db.session.flush()
+    for hwb_number, status in statuses.items():
+        shipment = Shipment(hwb_number=hwb_number, shipment_group_id=group.id, overall_status=status)
+        shipment.legs = [
+            ShipmentLeg(leg_sequence=1, leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT, status=ShipmentLegStatus.PENDING),
+            ShipmentLeg(leg_sequence=2, leg_type=ShipmentLegType.AIRPORT_TO_AIRPORT, status=ShipmentLegStatus.PENDING),
+        ]
+        db.session.add(shipment)
+    db.session.commit()
+    db.session.expunge_all()
+
+
+@pytest.mark.query_repeat_limit(1)
+def test_clear_all_cancels_open_shipments_in_one_statement(client):
+    ops_id = _login_ops(client)
+    _create_shipments(
+        {
+            "HWB-OPEN-1": ShipmentStatus.PENDING,
+            "HWB-OPEN-2": ShipmentStatus.IN_PROGRESS,
+            "HWB-OPEN-3": ShipmentStatus.PICKED_UP,
+            "HWB-DONE-1": ShipmentStatus.DELIVERED,
+        }
+    )
+
+    response = client.post("/load-board/clear", json={"hwb_number": "ALL"})
+
+    assert response.status_code == 200
+    assert "resolved 3 records" in response.get_json()["message"]
+    statuses = dict(db.session.execute(db.select(Shipment.hwb_number, Shipment.overall_status)).all())
+    assert statuses == {
+        "HWB-OPEN-1": ShipmentStatus.CANCELLED,
+        "HWB-OPEN-2": ShipmentStatus.CANCELLED,
+        "HWB-OPEN-3": ShipmentStatus.CANCELLED,
+        "HWB-DONE-1": ShipmentStatus.DELIVERED,
+    }
+    records = PODRecord.query.order_by(PODRecord.hwb_number).all()
+    assert [(record.hwb_number, record.action_type, record.driver_id) for record in records] == [
+        ("HWB-OPEN-1", "CANCELLED", ops_id),
+        ("HWB-OPEN-2", "CANCELLED", ops_id),
+        ("HWB-OPEN-3", "CANCELLED", ops_id),
+    ]
+    assert all(record.timestamp is not None for record in records)
+
+
+def test_clear_all_hard_delete_cascades_legs_in_the_database(client):
+    db.session.execute(text("PRAGMA foreign_keys=ON"))
+    _login_ops(client)
+    _create_shipments({"HWB-OPEN-1": ShipmentStatus.PENDING, "HWB-DONE-1": ShipmentStatus.DELIVERED})
+
+    response = client.post("/load-board/clear", json={"hwb_number": "ALL", "hard_delete": True})
+
+    assert response.status_code == 200
+    assert "resolved 1 records" in response.get_json()["message"]
+    assert db.session.scalars(db.select(Shipment.hwb_number)).all() == ["HWB-DONE-1"]
+    assert db.session.scalar(db.select(db.func.count(ShipmentLeg.id))) == 2
+    assert PODRecord.query.count() == 0
+
+
+def test_clear_single_hwb_hard_delete_does_not_load_legs(client):
+    db.session.execute(text("PRAGMA foreign_keys=ON"))
+    _login_ops(client)
+    _create_shipments({"HWB-OPEN-1": ShipmentStatus.PENDING})
+
+    statements = []
+    capture = lambda _conn, _cursor, statement, *_args: statements.append(statement)  # noqa: E731
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        response = client.post("/load-board/clear", json={"hwb_number": "HWB-OPEN-1", "hard_delete": True})
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert not [statement for statement in statements if "FROM shipment_legs" in statement]
+    assert Shipment.query.count() == 0
+    assert ShipmentLeg.query.count() == 0
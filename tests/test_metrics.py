@@ -0,0 +1,87 @@
+from prometheus_client import REGISTRY
+
+from app import db
+from app.metrics import InstrumentedQueuePool, init_metrics
+from models import Role, User
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _login(client, role=Role.EMPLOYEE.value):
+    user = User(
+        email=f"metrics-{role.lower()}@example.com",
+        password_hash="hash",
+        role=role,
+        employee_approved=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+    return user
+
+
+def test_metrics_requires_token_or_admin(app, client):
+    app.config["METRICS_AUTH_TOKEN"] = "scrape-secret"
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert b"http_request_duration_seconds" in response.data
+
+
+def test_metrics_allows_signed_in_admin_only(client):
+    _login(client)
+    assert client.get("/metrics").status_code == 401
+
+    _login(client, role=Role.ADMIN.value)
+    assert client.get("/metrics").status_code == 200
+
+
+def test_request_latency_is_labelled_by_route_template(client):
+    labels = {"method": "GET", "route": "/livez", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/livez")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_task_outcomes_are_counted_by_reason(client):
+    labels = {"task": "send_email", "outcome": "error", "reason": "auth_rejected"}
+    before = _sample("task_handler_outcomes_total", **labels)
+
+    response = client.post("/tasks/api/tasks/send-email", json={})
+
+    assert response.status_code == 403
+    assert _sample("task_handler_outcomes_total", **labels) == before + 1
+
+
+def test_pod_submissions_are_counted_by_action(client):
+    _login(client)
+    labels = {"action": "INVALID", "result": "rejected"}
+    before = _sample("pod_submissions_total", **labels)
+
+    response = client.post(
+        "/pod/event",
+        data={"hwb_number": "HWB-404", "action_type": "teleport"},
+        headers={"Accept": "application/json"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 400
+    assert _sample("pod_submissions_total", **labels) == before + 1
+
+
+def test_queue_pool_engines_use_instrumented_pool():
+    from flask import Flask
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"pool_size": 2}
+    init_metrics(app)
+
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["poolclass"] is InstrumentedQueuePool
@@ -0,0 +1,92 @@
+from sqlalchemy import event, update
+
+from app import db
+from app.services.notification_settings import NOTIFICATION_SETTINGS_CACHE_EXTENSION, get_notification_settings
+from models import NotificationSettings, Role, User
+
+
+def _expire_cache(app) -> None:
+    cache = app.extensions[NOTIFICATION_SETTINGS_CACHE_EXTENSION]
+    cache._entry = (0.0, cache._entry[1])
+
+
+def test_snapshot_is_parsed_once_and_reused_until_the_version_changes(app):
+    settings = NotificationSettings(
+        notify_shipper_pickup=True,
+        custom_cc_emails="ops@example.com, not-an-email, qa@example.com",
+    )
+    db.session.add(settings)
+    db.session.commit()
+
+    snapshot = get_notification_settings()
+    assert snapshot.notify_shipper_pickup is True
+    assert snapshot.cc_emails == ("ops@example.com", "qa@example.com")
+    assert get_notification_settings() is snapshot
+
+    _expire_cache(app)
+    assert get_notification_settings() is snapshot
+
+    # Another worker's save bumps version_id; this worker sees it once its TTL runs out.
+    settings.notify_shipper_pickup = False
+    db.session.commit()
+    assert get_notification_settings() is snapshot
+    _expire_cache(app)
+    refreshed = get_notification_settings()
+    assert refreshed.notify_shipper_pickup is False
+    assert refreshed.version == snapshot.version + 1
+
+
+def test_admin_save_invalidates_the_cached_settings(client, app):
+    db.session.add(NotificationSettings(notify_origin_drop=False))
+    admin = User(email="admin-cache@example.com", password_hash="hash", employee_approved=True, role=Role.ADMIN.value)
+    db.session.add(admin)
+    db.session.commit()
+    assert get_notification_settings().notify_origin_drop is False
+
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = admin.id
+    response = client.post(
+        "/account/admin/notifications",
+        data={"notify_origin_drop": "on", "custom_cc_emails": "ops@example.com"},
+    )
+
+    assert response.status_code == 302
+    snapshot = get_notification_settings()
+    assert snapshot.notify_origin_drop is True
+    assert snapshot.cc_emails == ("ops@example.com",)
+
+
+def test_concurrent_admin_saves_keep_last_write_wins(client, app):
+    settings = NotificationSettings(notify_dest_pickup=False)
+    admin = User(email="admin-race@example.com", password_hash="hash", employee_approved=True, role=Role.ADMIN.value)
+    db.session.add_all([settings, admin])
+    db.session.commit()
+    settings_id = settings.id
+
+    def concurrent_save(mapper, connection, target):
+        # Another admin commits between this request's read and its UPDATE.
+        connection.execute(
+            update(NotificationSettings)
+            .where(NotificationSettings.id == target.id)
+            .values(custom_cc_emails="other@example.com")
+        )
+
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = admin.id
+    event.listen(NotificationSettings, "before_update", concurrent_save, once=True)
+    response = client.post("/account/admin/notifications", data={"notify_dest_pickup": "on", "custom_cc_emails": "ops@example.com"})
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    saved = db.session.get(NotificationSettings, settings_id)
+    assert (saved.notify_dest_pickup, saved.custom_cc_emails) == (True, "ops@example.com")
+    assert saved.version_id == 3
+
+
+def test_missing_settings_row_is_cached_as_none(app):
+    assert get_notification_settings() is None
+    db.session.add(NotificationSettings(notify_consignee_drop=True))
+    db.session.commit()
+    assert get_notification_settings() is None
+    _expire_cache(app)
+    assert get_notification_settings().notify_consignee_drop is True
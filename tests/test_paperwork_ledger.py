@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from io import BytesIO
+from types import SimpleNamespace
+
+from sqlalchemy import update
+
+from app import db
+from app.services.paperwork_ledger import find_upload, is_duplicate, record_staged
+from models import PaperworkUpload, PaperworkUploadStatus, Role, User
+
+
+def _login(client, user_id: int) -> None:
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user_id
+
+
+def _driver(email: str) -> User:
+    user = User(
+        email=email,
+        password_hash="hash",
+        role=Role.EMPLOYEE,
+        employee_approved=True,
+        first_name="Driver",
+        last_name="Ledger",
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _payload(user_id: int, filename: str, key: str) -> dict:
+    return {
+        "actor_user_id": user_id,
+        "original_filename": filename,
+        "content_type": "application/pdf",
+        "staged_blob_name": f"couchdrop_queue/test/{filename}",
+        "remote_path": f"/Paperwork/Driver_Ledger/2026-10-19/{filename}",
+        "idempotency_key": key,
+    }
+
+
+def _post_upload_task(client, payload: dict):
+    return client.post(
+        "/tasks/api/tasks/upload-couchdrop",
+        headers={"X-CloudTasks-TaskName": "task-ledger", "Authorization": "Bearer valid-token"},
+        json=payload,
+    )
+
+
+def test_reupload_of_staged_scan_skips_gcs_and_queue(client, app, monkeypatch):
+    with app.app_context():
+        user_id = _driver("driver-ledger1@example.com").id
+    _login(client, user_id)
+    app.config["GCS_BUCKET_NAME"] = "paperwork-test"
+
+    staged_blobs = []
+
+    class _FakeBlob:
+        def __init__(self, name):
+            self.name = name
+
+        def upload_from_file(self, stream, rewind, size, content_type):
+            staged_blobs.append(self.name)
+
+    bucket = SimpleNamespace(blob=_FakeBlob)
+    monkeypatch.setattr("app.services.couchdrop.get_storage_client", lambda: SimpleNamespace(bucket=lambda name: bucket))
+    queued = []
+    monkeypatch.setattr(
+        "app.blueprints.paperwork.routes.enqueue_couchdrop_tasks",
+        lambda payloads: queued.extend(payloads) or [None] * len(payloads),
+    )
+
+    def _upload():
+        return client.post(
+            "/upload",
+            data={"scans": [(BytesIO(b"same scan"), "scan.pdf")]},
+            headers={"Accept": "application/json"},
+            content_type="multipart/form-data",
+        ).get_json()
+
+    first = _upload()
+    assert first["results"][0]["status"] == "queued"
+    with app.app_context():
+        assert find_upload(first["results"][0]["idempotency_key"]).status == PaperworkUploadStatus.STAGED
+
+    second = _upload()
+    assert second["success_count"] == 1
+    assert second["results"][0]["status"] == "duplicate"
+    assert second["results"][0]["idempotency_key"] == first["results"][0]["idempotency_key"]
+    assert len(staged_blobs) == 1
+    assert len(queued) == 1
+
+
+def test_upload_task_records_attempts_and_skips_once_uploaded(client, app, monkeypatch, trusted_task_tokens):
+    outcomes = iter([(False, "upload_connection_error"), (True, "uploaded")])
+    transfers = []
+
+    def _fake_upload(**kwargs):
+        transfers.append(kwargs["staged_blob_name"])
+        return next(outcomes)
+
+    monkeypatch.setattr("app.blueprints.tasks.routes.CouchdropService.upload_staged_paperwork", _fake_upload)
+    payload = _payload(1, "scan.pdf", "idem-task")
+
+    assert _post_upload_task(client, payload).status_code == 500
+    with app.app_context():
+        upload = find_upload("idem-task")
+        assert (upload.status, upload.attempts, upload.last_error) == (
+            PaperworkUploadStatus.FAILED,
+            1,
+            "upload_connection_error",
+        )
+
+    assert _post_upload_task(client, payload).status_code == 200
+    with app.app_context():
+        upload = find_upload("idem-task")
+        assert (upload.status, upload.attempts) == (PaperworkUploadStatus.UPLOADED, 2)
+        assert upload.uploaded_at_utc is not None
+
+    redelivered = _post_upload_task(client, payload)
+    assert redelivered.status_code == 200
+    assert redelivered.get_json()["reason"] == "already_uploaded"
+    assert len(transfers) == 2
+
+
+def test_history_pages_through_only_the_drivers_own_uploads(client, app):
+    with app.app_context():
+        user = _driver("driver-ledger2@example.com")
+        other = _driver("driver-ledger3@example.com")
+        record_staged([_payload(user.id, f"mine-{index}.pdf", f"idem-mine-{index}") for index in range(3)])
+        record_staged([_payload(other.id, "theirs.pdf", "idem-theirs")])
+        user_id = user.id
+        assert db.session.query(PaperworkUpload).count() == 4
+    _login(client, user_id)
+
+    first_page = client.get("/history?per_page=2").get_data(as_text=True)
+    assert "mine-2.pdf" in first_page and "mine-1.pdf" in first_page
+    assert "mine-0.pdf" not in first_page
+    assert "theirs.pdf" not in first_page
+    assert "Page 1 of 2" in first_page
+
+    second_page = client.get("/history?per_page=2&page=2").get_data(as_text=True)
+    assert "mine-0.pdf" in second_page
+    assert "theirs.pdf" not in second_page
+
+
+def test_abandoned_uploading_row_can_be_staged_again(app):
+    app.config["PAPERWORK_STALE_UPLOAD_SECONDS"] = 3600
+    user_id = _driver("driver-ledger4@example.com").id
+    record_staged([_payload(user_id, "stuck.pdf", "idem-stuck")])
+    db.session.execute(
+        update(PaperworkUpload)
+        .where(PaperworkUpload.idempotency_key == "idem-stuck")
+        .values(status=PaperworkUploadStatus.UPLOADING, updated_at_utc=datetime.utcnow() - timedelta(minutes=30))
+    )
+    db.session.commit()
+    assert is_duplicate("idem-stuck")
+
+    db.session.execute(
+        update(PaperworkUpload)
+        .where(PaperworkUpload.idempotency_key == "idem-stuck")
+        .values(updated_at_utc=datetime.utcnow() - timedelta(hours=2))
+    )
+    db.session.commit()
+    assert not is_duplicate("idem-stuck")
+
+    record_staged([_payload(user_id, "stuck.pdf", "idem-stuck")])
+    db.session.expire_all()
+    assert find_upload("idem-stuck").status == PaperworkUploadStatus.STAGED
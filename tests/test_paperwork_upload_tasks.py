@@ -1,3 +1,4 @@
+import threading
 from io import BytesIO
 
 from app import db
@@ -38,7 +39,10 @@ def test_paperwork_upload_enqueues_couchdrop_jobs(client, app, monkeypatch):
         }
 
     monkeypatch.setattr("app.blueprints.paperwork.routes.CouchdropService.stage_driver_paperwork_for_task", _fake_stage)
-    monkeypatch.setattr("app.blueprints.paperwork.routes.enqueue_couchdrop_task", lambda payload: queued.append(payload))
+    monkeypatch.setattr(
+        "app.blueprints.paperwork.routes.enqueue_couchdrop_tasks",
+        lambda payloads: queued.extend(payloads) or [None] * len(payloads),
+    )
 
     response = client.post(
         "/upload",
@@ -54,8 +58,8 @@ def test_paperwork_upload_enqueues_couchdrop_jobs(client, app, monkeypatch):
 
     assert response.status_code == 200
     assert response.get_json()["success_count"] == 2
-    assert len(staged_calls) == 2
-    assert len(queued) == 2
+    assert sorted(staged_calls) == [(user.id, "scan-1.pdf"), (user.id, "scan-2.pdf")]
+    assert [payload.original_filename for payload in queued] == ["scan-1.pdf", "scan-2.pdf"]
 
 
 def test_paperwork_upload_is_non_blocking_when_individual_stage_fails(client, app, monkeypatch):
@@ -72,22 +76,23 @@ def test_paperwork_upload_is_non_blocking_when_individual_stage_fails(client, ap
         db.session.commit()
         _login(client, user.id)
 
-    staged = iter(
-        [
-            None,
-            {
+    staged = {
+        "scan-1.pdf": None,
+        "scan-2.pdf": {
                 "actor_user_id": user.id,
                 "original_filename": "scan-2.pdf",
                 "content_type": "application/pdf",
                 "staged_blob_name": "couchdrop_queue/test/scan-2.pdf",
                 "remote_path": "/Paperwork/Driver_Two/2026-01-01/scan-2.pdf",
                 "idempotency_key": "idem-2",
-            },
-        ]
-    )
+        },
+    }
 
-    monkeypatch.setattr("app.blueprints.paperwork.routes.CouchdropService.stage_driver_paperwork_for_task", lambda *_args: next(staged))
-    monkeypatch.setattr("app.blueprints.paperwork.routes.enqueue_couchdrop_task", lambda _payload: None)
+    monkeypatch.setattr(
+        "app.blueprints.paperwork.routes.CouchdropService.stage_driver_paperwork_for_task",
+        lambda _user, file_storage: staged[file_storage.filename],
+    )
+    monkeypatch.setattr("app.blueprints.paperwork.routes.enqueue_couchdrop_tasks", lambda payloads: [None] * len(payloads))
 
     response = client.post(
         "/upload",
@@ -103,3 +108,76 @@ def test_paperwork_upload_is_non_blocking_when_individual_stage_fails(client, ap
 
     assert response.status_code == 200
     assert response.get_json()["success_count"] == 1
+    assert [result["status"] for result in response.get_json()["results"]] == ["failed", "queued"]
+
+
+def test_paperwork_upload_stages_concurrently_and_reports_each_file(client, app, monkeypatch):
+    with app.app_context():
+        user = User(
+            email="driver-upload3@example.com",
+            password_hash="hash",
+            role=Role.EMPLOYEE,
+            employee_approved=True,
+            first_name="Driver",
+            last_name="Three",
+        )
+        db.session.add(user)
+        db.session.commit()
+        _login(client, user.id)
+    app.config["PAPERWORK_STAGING_WORKERS"] = 3
+
+    # Every staging call waits for the other two, so this only passes if they overlap.
+    all_staging = threading.Barrier(3, timeout=5)
+
+    def _fake_stage(current_user, file_storage):
+        all_staging.wait()
+        if file_storage.filename == "broken.pdf":
+            raise RuntimeError("gcs unavailable")
+        return {
+            "actor_user_id": current_user.id,
+            "original_filename": file_storage.filename,
+            "content_type": "application/pdf",
+            "staged_blob_name": f"couchdrop_queue/test/{file_storage.filename}",
+            "remote_path": f"/Paperwork/Driver_Three/2026-01-01/{file_storage.filename}",
+            "idempotency_key": f"idem-{file_storage.filename}",
+        }
+
+    enqueue_batches = []
+
+    def _fake_enqueue(payloads):
+        enqueue_batches.append([payload.original_filename for payload in payloads])
+        return [RuntimeError("queue full") if payload.original_filename == "late.pdf" else None for payload in payloads]
+
+    monkeypatch.setattr("app.blueprints.paperwork.routes.CouchdropService.stage_driver_paperwork_for_task", _fake_stage)
+    monkeypatch.setattr("app.blueprints.paperwork.routes.enqueue_couchdrop_tasks", _fake_enqueue)
+
+    response = client.post(
+        "/upload",
+        data={"scans": [(BytesIO(b"a"), "ok.pdf"), (BytesIO(b"b"), "broken.pdf"), (BytesIO(b"c"), "late.pdf")]},
+        headers={"Accept": "application/json"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["success_count"] == 1
+    assert [(result["filename"], result["status"]) for result in body["results"]] == [
+        ("ok.pdf", "queued"),
+        ("broken.pdf", "failed"),
+        ("late.pdf", "failed"),
+    ]
+    assert body["results"][0]["idempotency_key"] == "idem-ok.pdf"
+    assert enqueue_batches == [["ok.pdf", "late.pdf"]]
+
+
+def test_upload_page_sizes_batches_from_the_request_limit(client, app):
+    app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024
+    user = User(email="driver-upload-page@example.com", password_hash="hash", role=Role.EMPLOYEE, employee_approved=True)
+    db.session.add(user)
+    db.session.commit()
+    _login(client, user.id)
+
+    response = client.get("/upload")
+
+    assert response.status_code == 200
+    assert "const MAX_REQUEST_BYTES = 16777216;" in response.get_data(as_text=True)
@@ -1,5 +1,11 @@
+import json
+import threading
+import time
+
+import pytest
+
 from app import db
-from app.services.postmark import send_shipment_alert
+from app.services.postmark import PostmarkBatcher, _send_batched, send_shipment_alert
 from models import NotificationSettings, User
 
 
@@ -8,7 +14,7 @@ class _FakeResponse:
         return None
 
 
-def test_send_shipment_alert_honors_toggle_and_recipients(app, monkeypatch):
+def test_send_shipment_alert_honors_toggle_and_recipients(app, http_stub):
     with app.app_context():
         app.config["POSTMARK_SERVER_TOKEN"] = "token"
         app.config["POSTMARK_FROM_EMAIL"] = "alerts@example.com"
@@ -23,17 +29,6 @@ def test_send_shipment_alert_honors_toggle_and_recipients(app, monkeypatch):
         )
         db.session.commit()
 
-        captured = {}
-
-        def _fake_post(url, headers, json, timeout):
-            captured["url"] = url
-            captured["headers"] = headers
-            captured["payload"] = json
-            captured["timeout"] = timeout
-            return _FakeResponse()
-
-        monkeypatch.setattr("app.services.postmark.requests.post", _fake_post)
-
         sent, reason = send_shipment_alert(
             action_type="SHIPPER_PICKUP",
             hwb_number="HWB123",
@@ -49,24 +44,42 @@ def test_send_shipment_alert_honors_toggle_and_recipients(app, monkeypatch):
 
         assert sent is True
         assert reason == "sent"
-        assert captured["headers"]["X-Postmark-Server-Token"] == "token"
-        assert captured["payload"]["To"] == "driver@example.com,shipper@example.com,consignee@example.com,ops@example.com,qa@example.com"
+        [call] = http_stub.calls("POST", "/email/withTemplate")
+        assert call["headers"]["X-Postmark-Server-Token"] == "token"
+        assert json.loads(call["body"])["To"] == (
+            "driver@example.com,shipper@example.com,consignee@example.com,ops@example.com,qa@example.com"
+        )
 
 
-def test_send_shipment_alert_returns_early_when_toggle_is_off(app, monkeypatch):
+def test_send_shipment_alert_does_not_resend_on_server_error(app, http_stub):
     with app.app_context():
-        driver = User(email="driver-off@example.com", password_hash="hash", employee_approved=True)
-        db.session.add(driver)
-        db.session.add(NotificationSettings(notify_shipper_pickup=False))
+        db.session.add(NotificationSettings(notify_shipper_pickup=True))
         db.session.commit()
+        http_stub.respond("POST", "/email/withTemplate", status=503)
+
+        sent, reason = send_shipment_alert(
+            action_type="SHIPPER_PICKUP",
+            hwb_number="HWB503",
+            location_name="PHX",
+            driver_email="driver@example.com",
+            driver_name="Driver One",
+            photo_url=None,
+            signature_url=None,
+            shipper_email=None,
+            consignee_email=None,
+            timestamp="2025-01-01 09:00 AM MST",
+        )
 
-        called = {"value": False}
+        assert (sent, reason) == (False, "postmark_api_rejection")
+        assert len(http_stub.calls("POST", "/email/withTemplate")) == 1
 
-        def _fake_post(*_args, **_kwargs):
-            called["value"] = True
-            return _FakeResponse()
 
-        monkeypatch.setattr("app.services.postmark.requests.post", _fake_post)
+def test_send_shipment_alert_returns_early_when_toggle_is_off(app, http_stub):
+    with app.app_context():
+        driver = User(email="driver-off@example.com", password_hash="hash", employee_approved=True)
+        db.session.add(driver)
+        db.session.add(NotificationSettings(notify_shipper_pickup=False))
+        db.session.commit()
 
         sent, reason = send_shipment_alert(
             action_type="SHIPPER_PICKUP",
@@ -83,7 +96,7 @@ def test_send_shipment_alert_returns_early_when_toggle_is_off(app, monkeypatch):
 
         assert sent is False
         assert reason == "disabled_settings"
-        assert called["value"] is False
+        assert http_stub.requests == []
 
 
 def test_send_shipment_alert_signs_media_for_consignee_drop(app, monkeypatch):
@@ -127,3 +140,148 @@ def test_send_shipment_alert_signs_media_for_consignee_drop(app, monkeypatch):
         assert reason == "sent"
         assert captured["payload"]["TemplateModel"]["photo_url"] == "https://signed.example.com/photo"
         assert captured["payload"]["TemplateModel"]["signature_url"] == "https://signed.example.com/signature"
+
+
+def _alert_message(recipient: str) -> dict:
+    return {
+        "From": "alerts@example.com",
+        "To": recipient,
+        "TemplateAlias": "pod-transit-notification",
+        "TemplateModel": {"hwb_number": recipient.split("@")[0]},
+        "MessageStream": "pod",
+    }
+
+
+def _send_concurrently(app, recipients: list[str]) -> dict[str, tuple[bool, str]]:
+    results: dict[str, tuple[bool, str]] = {}
+
+    def _send(recipient: str) -> None:
+        with app.app_context():
+            results[recipient] = _send_batched(_alert_message(recipient))
+
+    threads = [threading.Thread(target=_send, args=(recipient,)) for recipient in recipients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_batched_alerts_share_one_call_and_map_results_per_message(app, http_stub):
+    app.config["POSTMARK_BATCH_WINDOW_MS"] = 300
+    http_stub.respond(
+        "POST",
+        "/email/batchWithTemplates",
+        payload=[
+            {"ErrorCode": 0, "Message": "OK"},
+            {"ErrorCode": 406, "Message": "Inactive recipient"},
+            {"ErrorCode": 0, "Message": "OK"},
+        ],
+    )
+
+    results = _send_concurrently(app, ["a@example.com", "b@example.com", "c@example.com"])
+
+    [call] = http_stub.calls("POST", "/email/batchWithTemplates")
+    sent_order = [message["To"] for message in json.loads(call["body"])["Messages"]]
+    assert sorted(sent_order) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert results[sent_order[0]] == (True, "sent")
+    assert results[sent_order[1]] == (False, "postmark_api_rejection")
+    assert results[sent_order[2]] == (True, "sent")
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window(app, http_stub):
+    app.config["POSTMARK_BATCH_WINDOW_MS"] = 30_000
+    app.config["POSTMARK_BATCH_MAX_MESSAGES"] = 2
+    http_stub.respond("POST", "/email/batchWithTemplates", payload=[{"ErrorCode": 0}, {"ErrorCode": 0}])
+
+    started_at = time.monotonic()
+    results = _send_concurrently(app, ["a@example.com", "b@example.com"])
+
+    assert time.monotonic() - started_at < 5
+    assert set(results.values()) == {(True, "sent")}
+    assert len(http_stub.calls("POST", "/email/batchWithTemplates")) == 1
+
+
+def test_rejected_batch_fails_every_alert_without_resending(app, http_stub):
+    app.config["POSTMARK_BATCH_WINDOW_MS"] = 200
+    http_stub.respond("POST", "/email/batchWithTemplates", status=503)
+
+    results = _send_concurrently(app, ["a@example.com", "b@example.com"])
+
+    assert set(results.values()) == {(False, "postmark_api_rejection")}
+    assert len(http_stub.calls("POST", "/email/batchWithTemplates")) == 1
+
+
+def test_send_shipment_alert_uses_batch_endpoint_when_window_is_set(app, http_stub):
+    with app.app_context():
+        app.config["POSTMARK_BATCH_WINDOW_MS"] = 1
+        db.session.add(NotificationSettings(notify_shipper_pickup=True))
+        db.session.commit()
+        http_stub.respond("POST", "/email/batchWithTemplates", payload=[{"ErrorCode": 0}])
+
+        sent, reason = send_shipment_alert(
+            action_type="SHIPPER_PICKUP",
+            hwb_number="HWB900",
+            location_name="PHX",
+            driver_email="driver@example.com",
+            driver_name="Driver One",
+            photo_url=None,
+            signature_url=None,
+            shipper_email=None,
+            consignee_email=None,
+            timestamp="2025-01-01 09:00 AM MST",
+        )
+
+        assert (sent, reason) == (True, "sent")
+        [call] = http_stub.calls("POST", "/email/batchWithTemplates")
+        [message] = json.loads(call["body"])["Messages"]
+        assert message["TemplateModel"]["hwb_number"] == "HWB900"
+        assert http_stub.calls("POST", "/email/withTemplate") == []
+
+
+def _submit_concurrently(batcher: PostmarkBatcher, messages: list[dict]) -> list:
+    futures = []
+
+    def _submit(message: dict) -> None:
+        try:
+            futures.append(batcher.submit(message))
+        except SystemExit:
+            pass  # a leader killed mid-send returns nothing of its own
+
+    threads = [threading.Thread(target=_submit, args=(message,)) for message in messages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return futures
+
+
+def test_batches_are_split_by_encoded_size(app):
+    messages = [{**_alert_message(f"{name}@example.com"), "Attachments": [{"Content": "x" * 1000}]} for name in "abcd"]
+    sent_batches = []
+
+    def _send_batch(batch):
+        sent_batches.append(len(batch))
+        return [(True, "sent")] * len(batch)
+
+    message_bytes = len(json.dumps(messages[0]))
+    batcher = PostmarkBatcher(window_seconds=0.3, max_messages=500, send_batch=_send_batch, max_bytes=message_bytes * 2 + 10)
+
+    futures = _submit_concurrently(batcher, messages)
+
+    assert sum(sent_batches) == 4
+    assert max(sent_batches) <= 2
+    assert [future.result(timeout=1) for future in futures] == [(True, "sent")] * 4
+
+
+def test_followers_are_released_when_the_leader_dies(app):
+    def _send_batch(batch):
+        raise SystemExit("worker shutting down")
+
+    batcher = PostmarkBatcher(window_seconds=0.3, max_messages=500, send_batch=_send_batch)
+
+    futures = _submit_concurrently(batcher, [_alert_message("a@example.com"), _alert_message("b@example.com")])
+
+    assert len(futures) == 1
+    with pytest.raises(RuntimeError, match="abandoned"):
+        futures[0].result(timeout=1)
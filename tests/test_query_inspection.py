@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+
+from app import db
+from app.query_inspection import fingerprint_statement, normalize_statement, redact_parameters
+from models import User
+
+
+def test_fingerprint_ignores_literals_and_placeholder_list_length():
+    first = "SELECT * FROM pod_records WHERE hwb_number IN (?, ?) AND id > 10"
+    second = "SELECT *  FROM pod_records\nWHERE hwb_number IN (?, ?, ?, ?) AND id > 250"
+
+    assert normalize_statement(first) == "SELECT * FROM pod_records WHERE hwb_number IN (?) AND id > ?"
+    assert fingerprint_statement(first) == fingerprint_statement(second)
+    assert fingerprint_statement(first) != fingerprint_statement("SELECT * FROM shipments WHERE id = ?")
+
+
+def test_postgres_casts_are_kept_apart_from_named_placeholders():
+    as_text = "SELECT id FROM shipments WHERE hwb_number::text = :hwb_number"
+    as_date = "SELECT id FROM shipments WHERE hwb_number::date = :hwb_number"
+
+    assert normalize_statement(as_text) == "SELECT id FROM shipments WHERE hwb_number::text = ?"
+    assert fingerprint_statement(as_text) != fingerprint_statement(as_date)
+
+
+def test_redact_parameters_keeps_only_types():
+    assert redact_parameters(("driver@example.com", 7)) == ["str", "int"]
+    assert redact_parameters({"email": "driver@example.com"}) == {"email": "str"}
+
+
+def test_slow_query_log_redacts_parameters(app, client, caplog):
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = 0.000001
+    caplog.set_level(logging.WARNING, logger=app.logger.name)
+
+    db.session.execute(db.select(User).where(User.email == "secret@example.com")).all()
+
+    slow_logs = [record.getMessage() for record in caplog.records if record.getMessage().startswith("db.slow_query")]
+    assert slow_logs
+    assert "secret@example.com" not in slow_logs[-1]
+    assert "parameters=['str'" in slow_logs[-1]
+
+
+def test_query_repeat_guard_reports_statements_run_in_a_loop(app, client, query_repeat_guard):
+    for index in range(3):
+        db.session.add(User(email=f"loop-{index}@example.com", password_hash="hash"))
+    db.session.commit()
+
+    @app.get("/_n_plus_one")
+    def n_plus_one():
+        user_ids = db.session.scalars(db.select(User.id)).all()
+        for user_id in user_ids:
+            db.session.execute(db.select(User.email).where(User.id == user_id)).one()
+        return "ok"
+
+    query_repeat_guard.limit = 2
+    client.get("/_n_plus_one")
+
+    assert [(route, count) for route, _statement, count in query_repeat_guard.violations] == [("GET /_n_plus_one", 3)]
+    with pytest.raises(pytest.fail.Exception):
+        query_repeat_guard.assert_clean()
+    query_repeat_guard.violations.clear()
+
+
+@pytest.mark.query_repeat_limit(1)
+def test_help_page_loads_the_session_user_once(client):
+    user = User(email="help@example.com", password_hash="hash", employee_approved=True)
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+    db.session.expunge_all()
+
+    response = client.get("/help")
+
+    assert response.status_code == 200
+    assert 'db;desc="1 queries"' in response.headers["Server-Timing"]
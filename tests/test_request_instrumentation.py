@@ -0,0 +1,76 @@
+import json
+import logging
+
+from app import db
+from app.instrumentation import RequestTiming, track_outbound
+from models import Role, User
+
+
+def _request_completed_record(caplog):
+    return [record for record in caplog.records if record.getMessage() == "request.completed"][-1]
+
+
+def _login_user(client):
+    user = User(
+        email="timing@example.com",
+        password_hash="hash",
+        role=Role.EMPLOYEE.value,
+        employee_approved=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+
+
+def test_server_timing_header_reports_app_and_db_time(client):
+    _login_user(client)
+
+    response = client.get("/help")
+
+    assert response.status_code == 200
+    entries = [entry.strip() for entry in response.headers["Server-Timing"].split(",")]
+    assert entries[0].startswith("app;dur=")
+    assert entries[1].startswith('db;desc="1 queries";dur=')
+
+
+def test_server_timing_header_can_be_disabled(app, client):
+    app.config["SERVER_TIMING_ENABLED"] = False
+
+    response = client.get("/livez")
+
+    assert "Server-Timing" not in response.headers
+
+
+def test_request_log_includes_duration_queries_and_outbound_time(app, client, caplog):
+    caplog.set_level(logging.INFO, logger=app.logger.name)
+
+    @app.get("/_instrumented")
+    def instrumented():
+        db.session.execute(db.select(User)).all()
+        db.session.execute(db.select(User)).all()
+        with track_outbound("postmark"):
+            pass
+        return "ok"
+
+    response = client.get("/_instrumented")
+
+    assert "postmark;dur=" in response.headers["Server-Timing"]
+    record = _request_completed_record(caplog)
+    assert record.db_queries == "2"
+    assert float(record.duration_ms) >= float(record.db_ms)
+    assert set(json.loads(record.outbound_ms)) == {"postmark"}
+
+
+def test_track_outbound_is_a_noop_outside_requests(app):
+    with track_outbound("gcs"):
+        pass
+
+
+def test_request_timing_accumulates_repeated_outbound_calls():
+    timing = RequestTiming()
+    timing.record_outbound("couchdrop", 2.0)
+    timing.record_outbound("couchdrop", 3.5)
+
+    assert timing.outbound_ms == {"couchdrop": 5.5}
+    assert "couchdrop;dur=5.5" in timing.server_timing_header()
@@ -139,3 +139,81 @@ def test_all_model_table_names_have_module_level_table_constants():
         "Expected module-level constants in models.py named <TABLE_NAME_UPPER>_TABLE that match __tablename__. "
         f"Missing mappings: {missing_constants}"
     )
+
+
+def test_livez_is_dependency_free(client, monkeypatch):
+    def _fail_if_called():
+        raise AssertionError("livez must not run readiness checks")
+
+    monkeypatch.setattr("app.schema_checks.get_readiness_report", _fail_if_called)
+
+    response = client.get("/livez")
+
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "ok"}
+
+
+def test_readyz_serves_cached_report_with_age(client, monkeypatch):
+    calls = []
+
+    def _fake_report():
+        calls.append(1)
+        return {
+            "ok": True,
+            "components": {"schema": {"ok": True, "missing_columns": [], "error": None}},
+            "errors": {},
+        }
+
+    monkeypatch.setattr("app.schema_checks.get_readiness_report", _fake_report)
+
+    first = client.get("/readyz")
+    second = client.get("/readyz")
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert len(calls) == 1
+    assert second.get_json()["age_seconds"] >= 0
+    assert "checked_at" in second.get_json()
+
+
+def test_get_readiness_report_times_out_slow_component(app, monkeypatch):
+    import time
+
+    monkeypatch.setattr("app.schema_checks._check_database_liveness", lambda: {"ok": True, "error": None})
+
+    def _slow_gcs_check():
+        time.sleep(1)
+        return {"ok": True, "error": None, "bucket": "test-bucket"}
+
+    monkeypatch.setattr("app.schema_checks._check_gcs_bucket_metadata", _slow_gcs_check)
+
+    started = time.monotonic()
+    with app.app_context():
+        report = get_readiness_report(timeout_seconds=0.1)
+
+    assert time.monotonic() - started < 0.9
+    assert report["ok"] is False
+    assert report["components"]["database"]["ok"] is True
+    assert "timed out" in report["errors"]["gcs"]
+
+
+def test_concurrent_stale_probes_run_the_checks_once(client, monkeypatch):
+    import threading
+    import time
+
+    calls = []
+
+    def _slow_report():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"ok": True, "components": {}, "errors": {}}
+
+    monkeypatch.setattr("app.schema_checks.get_readiness_report", _slow_report)
+    monitor = client.application.extensions["readiness_monitor"]
+    threads = [threading.Thread(target=monitor.get_report) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert len(calls) == 1
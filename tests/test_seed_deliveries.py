@@ -0,0 +1,17 @@
+from app import db
+from models import Shipment, ShipmentLeg, ShipmentLegStatus
+from seed_deliveries import seed_fleet
+
+
+def test_seed_fleet_deals_three_leg_hwbs_round_robin_to_drivers(app):
+    seed = seed_fleet(groups=2, hwbs_per_group=3, drivers=2, run_id="T1")
+
+    assert seed.hwb_count == 6
+    assert [len(hwbs) for hwbs in seed.hwbs_by_driver.values()] == [3, 3]
+    assert db.session.query(Shipment).count() == 6
+
+    first_driver, first_hwbs = next(iter(seed.hwbs_by_driver.items()))
+    shipment = Shipment.query.filter_by(hwb_number=first_hwbs[0]).one()
+    assert [leg.leg_sequence for leg in shipment.legs] == [1, 2, 3]
+    assert [leg.assigned_driver_id for leg in shipment.legs] == [first_driver, None, first_driver]
+    assert ShipmentLeg.query.filter_by(status=ShipmentLegStatus.ASSIGNED).count() == 12
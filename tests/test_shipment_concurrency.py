@@ -0,0 +1,200 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import event, update
+
+from app import db
+from app.services.shipment_workflow import redrive_pod_notifications
+from models import (
+    PendingNotification,
+    PODRecord,
+    Role,
+    Shipment,
+    ShipmentGroup,
+    ShipmentLeg,
+    ShipmentLegStatus,
+    ShipmentLegTransition,
+    ShipmentLegType,
+    User,
+)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _create_user(email: str, **flags) -> User:
+    user = User(email=email, password_hash="hash", role=Role.EMPLOYEE, employee_approved=True, **flags)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _create_shipment(hwb_number: str, driver_id: int) -> Shipment:
+    group = ShipmentGroup(mawb_number=f"MAWB-{hwb_number}")
+    shipment = Shipment(hwb_number=hwb_number, shipment_group=group)
+    shipment.legs = [
+        ShipmentLeg(
+            leg_sequence=1,
+            leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
+            status=ShipmentLegStatus.ASSIGNED,
+            assigned_driver_id=driver_id,
+        ),
+        ShipmentLeg(leg_sequence=3, leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE),
+    ]
+    db.session.add(shipment)
+    db.session.commit()
+    return shipment
+
+
+@pytest.fixture()
+def concurrent_leg_writer():
+    """Bump a leg's version just before the ORM writes it, as another worker would."""
+    state = {"remaining": 0}
+
+    def bump_version(mapper, connection, target):
+        if state["remaining"]:
+            state["remaining"] -= 1
+            connection.execute(
+                update(ShipmentLeg).where(ShipmentLeg.id == target.id).values(version_id=ShipmentLeg.version_id + 1)
+            )
+
+    event.listen(ShipmentLeg, "before_update", bump_version)
+    yield state
+    event.remove(ShipmentLeg, "before_update", bump_version)
+
+
+@pytest.fixture()
+def driver(client, monkeypatch):
+    monkeypatch.setattr("app.services.shipment_workflow.enqueue_email_task", lambda _payload: None)
+    user = _create_user("concurrency-driver@example.com", is_driver=True)
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+    return user
+
+
+def _submit_pickup(client, hwb_number: str):
+    return client.post(
+        "/pod/event",
+        data={"hwb_number": hwb_number, "action_type": "shipper pickup"},
+        headers={"Accept": "application/json"},
+        content_type="multipart/form-data",
+    )
+
+
+def test_versions_advance_on_each_write(client, driver):
+    shipment = _create_shipment("HWB-VER-1", driver.id)
+    assert (shipment.version_id, shipment.legs[0].version_id) == (1, 1)
+
+    assert _submit_pickup(client, "HWB-VER-1").status_code == 200
+
+    db.session.expire_all()
+    shipment = db.session.get(Shipment, shipment.id)
+    assert (shipment.version_id, shipment.legs[0].version_id) == (2, 2)
+
+
+def test_pod_transition_retries_after_a_concurrent_leg_update(client, driver, concurrent_leg_writer):
+    _create_shipment("HWB-VER-2", driver.id)
+    labels = {"operation": "pod_transition", "outcome": "retried"}
+    before = _sample("shipment_version_conflicts_total", **labels)
+    concurrent_leg_writer["remaining"] = 1
+
+    response = _submit_pickup(client, "HWB-VER-2")
+
+    assert response.status_code == 200
+    assert _sample("shipment_version_conflicts_total", **labels) == before + 1
+    assert PODRecord.query.filter_by(hwb_number="HWB-VER-2").count() == 1
+    assert ShipmentLegTransition.query.count() == 1
+
+
+def test_pod_transition_returns_conflict_when_retries_run_out(client, driver, concurrent_leg_writer):
+    _create_shipment("HWB-VER-3", driver.id)
+    labels = {"operation": "pod_transition", "outcome": "exhausted"}
+    before = _sample("shipment_version_conflicts_total", **labels)
+    concurrent_leg_writer["remaining"] = 99
+
+    response = _submit_pickup(client, "HWB-VER-3")
+
+    assert response.status_code == 409
+    assert _sample("shipment_version_conflicts_total", **labels) == before + 1
+    assert PODRecord.query.filter_by(hwb_number="HWB-VER-3").count() == 0
+
+
+def test_set_based_assignment_bumps_leg_versions(client, driver):
+    ops = _create_user("concurrency-ops@example.com", is_ops=True)
+    shipment = _create_shipment("HWB-VER-4", driver.id)
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = ops.id
+
+    response = client.post("/load-board/assign-driver/bulk", json={"hwb_numbers": ["HWB-VER-4"], "driver_id": driver.id})
+
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(Shipment, shipment.id).legs[0].version_id == 2
+
+
+def test_mawb_retry_enqueues_one_notification_per_hwb_after_commit(client, driver, monkeypatch):
+    group = ShipmentGroup(mawb_number="MAWB-VER-5")
+    for hwb_number in ("HWB-VER-5A", "HWB-VER-5B"):
+        shipment = Shipment(hwb_number=hwb_number, shipment_group=group)
+        shipment.legs = [
+            ShipmentLeg(
+                leg_sequence=1,
+                leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
+                status=ShipmentLegStatus.ASSIGNED,
+                assigned_driver_id=driver.id,
+            )
+        ]
+        db.session.add(shipment)
+    db.session.commit()
+    second_leg_id = Shipment.query.filter_by(hwb_number="HWB-VER-5B").one().legs[0].id
+
+    enqueued = []
+    monkeypatch.setattr("app.services.shipment_workflow.enqueue_email_task", enqueued.append)
+    conflicts = {"remaining": 1}
+
+    def bump_second_leg(mapper, connection, target):
+        # The first HWB has already flushed (and built its notification) when the second one conflicts.
+        if target.id == second_leg_id and conflicts["remaining"]:
+            conflicts["remaining"] -= 1
+            connection.execute(
+                update(ShipmentLeg).where(ShipmentLeg.id == target.id).values(version_id=ShipmentLeg.version_id + 1)
+            )
+
+    event.listen(ShipmentLeg, "before_update", bump_second_leg)
+    try:
+        response = _submit_pickup(client, "MAWB-VER-5")
+    finally:
+        event.remove(ShipmentLeg, "before_update", bump_second_leg)
+
+    assert response.status_code == 200
+    assert conflicts["remaining"] == 0
+    assert sorted(payload.hwb_number for payload in enqueued) == ["HWB-VER-5A", "HWB-VER-5B"]
+    committed_ids = {transition.id for transition in ShipmentLegTransition.query.all()}
+    assert {payload.transition_id for payload in enqueued} == committed_ids
+    assert PendingNotification.query.count() == 0
+
+
+def test_failed_notification_enqueue_stays_in_outbox_until_redriven(client, driver, monkeypatch):
+    _create_shipment("HWB-VER-6", driver.id)
+    deferred_before = _sample("pod_notification_outbox_total", outcome="deferred")
+    redriven_before = _sample("pod_notification_outbox_total", outcome="redriven")
+
+    def fail_enqueue(_payload):
+        raise RuntimeError("Cloud Tasks unavailable")
+
+    monkeypatch.setattr("app.services.shipment_workflow.enqueue_email_task", fail_enqueue)
+    assert _submit_pickup(client, "HWB-VER-6").status_code == 200
+
+    pending = PendingNotification.query.one()
+    assert pending.attempts == 1
+    assert pending.last_error == "RuntimeError: Cloud Tasks unavailable"
+    assert _sample("pod_notification_outbox_total", outcome="deferred") == deferred_before + 1
+
+    enqueued = []
+    monkeypatch.setattr("app.services.shipment_workflow.enqueue_email_task", enqueued.append)
+    assert redrive_pod_notifications(limit=10, min_age_seconds=0) == (1, 0)
+
+    assert [payload.hwb_number for payload in enqueued] == ["HWB-VER-6"]
+    assert enqueued[0].transition_id == ShipmentLegTransition.query.one().id
+    assert PendingNotification.query.count() == 0
+    assert _sample("pod_notification_outbox_total", outcome="redriven") == redriven_before + 1
@@ -0,0 +1,101 @@
+import pytest
+
+from app import db
+from app.services.shipment_workflow import (
+    ACTION_ALIASES,
+    TRANSITION_TABLE,
+    TRANSITIONS,
+    ShipmentTransitionError,
+    _compile_transitions,
+    validate_transitions,
+)
+from models import PODRecord, Role, Shipment, ShipmentGroup, ShipmentLeg, ShipmentLegStatus, ShipmentLegType, User
+
+
+def _create_shipment(group: ShipmentGroup, hwb_number: str, leg1_status: ShipmentLegStatus, driver_id=None) -> Shipment:
+    shipment = Shipment(hwb_number=hwb_number, shipment_group=group)
+    shipment.legs = [
+        ShipmentLeg(
+            leg_sequence=1,
+            leg_type=ShipmentLegType.PICKUP_TO_ORIGIN_AIRPORT,
+            status=leg1_status,
+            assigned_driver_id=driver_id,
+        ),
+        ShipmentLeg(leg_sequence=3, leg_type=ShipmentLegType.DEST_AIRPORT_TO_CONSIGNEE),
+    ]
+    db.session.add(shipment)
+    return shipment
+
+
+def test_every_pod_action_compiles_to_exactly_one_rule():
+    assert set(TRANSITIONS) == set(ACTION_ALIASES.values())
+
+    with pytest.raises(RuntimeError, match="Duplicate"):
+        _compile_transitions(TRANSITION_TABLE + TRANSITION_TABLE[:1])
+    with pytest.raises(RuntimeError, match="without a transition"):
+        _compile_transitions(TRANSITION_TABLE[1:])
+
+
+def test_validate_transitions_checks_every_shipment_without_writing(app):
+    group = ShipmentGroup(mawb_number="MAWB-TABLE-1")
+    in_progress = _create_shipment(group, "HWB-TABLE-1", ShipmentLegStatus.IN_PROGRESS)
+    pending = _create_shipment(group, "HWB-TABLE-2", ShipmentLegStatus.PENDING)
+    completed = _create_shipment(group, "HWB-TABLE-3", ShipmentLegStatus.COMPLETED)
+    db.session.commit()
+
+    rejections = validate_transitions([in_progress, pending, completed], "origin airport drop")
+
+    assert [(rejection.hwb_number, rejection.error) for rejection in rejections] == [
+        ("HWB-TABLE-2", "Cannot complete origin airport drop before shipper pickup is in progress."),
+        ("HWB-TABLE-3", "Cannot complete origin airport drop before shipper pickup is in progress."),
+    ]
+    assert validate_transitions([pending], "destination airport pickup")[0].error == (
+        "Cannot mark destination-airport pickup before origin-airport drop."
+    )
+    assert not db.session.dirty
+    with pytest.raises(ShipmentTransitionError):
+        validate_transitions([pending], "teleport")
+
+
+def test_mawb_submission_is_rejected_before_any_upload(client, monkeypatch):
+    driver = User(email="table-driver@example.com", password_hash="hash", role=Role.ADMIN, employee_approved=True)
+    db.session.add(driver)
+    db.session.commit()
+    group = ShipmentGroup(mawb_number="MAWB-TABLE-2")
+    _create_shipment(group, "HWB-TABLE-4", ShipmentLegStatus.IN_PROGRESS, driver.id)
+    _create_shipment(group, "HWB-TABLE-5", ShipmentLegStatus.PENDING, driver.id)
+    db.session.commit()
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = driver.id
+    uploads = []
+    monkeypatch.setattr("app.services.gcs.GCSService.upload_file", lambda *args, **kwargs: uploads.append(args))
+
+    response = client.post(
+        "/pod/event",
+        data={
+            "hwb_number": "MAWB-TABLE-2",
+            "action_type": "origin airport drop",
+            "recipient_name": "Ramp Agent",
+            "signature_base64": "data:image/png;base64,aGVsbG8=",
+        },
+        headers={"Accept": "application/json"},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 400
+    assert "HWB HWB-TABLE-5: Cannot complete origin airport drop" in response.get_json()["error"]
+    assert uploads == []
+    assert PODRecord.query.count() == 0
+
+
+def test_pickup_accepts_a_failed_leg_and_rejects_only_completed_ones(app):
+    group = ShipmentGroup(mawb_number="MAWB-TABLE-FAILED")
+    failed = _create_shipment(group, "HWB-TABLE-FAILED", ShipmentLegStatus.FAILED)
+    completed = _create_shipment(group, "HWB-TABLE-DONE", ShipmentLegStatus.COMPLETED)
+    db.session.commit()
+
+    rejections = validate_transitions([failed, completed], "shipper pickup")
+
+    assert [(rejection.hwb_number, rejection.error) for rejection in rejections] == [
+        ("HWB-TABLE-DONE", "Cannot start shipper pickup: leg 1 is already completed."),
+    ]
@@ -0,0 +1,68 @@
+from app import create_app
+from app.template_cache import compile_templates
+
+_TEST_CONFIG = {
+    "TESTING": True,
+    "SQLALCHEMY_DATABASE_URI": "sqlite://",
+    "SQLALCHEMY_ENGINE_OPTIONS": {},
+    "RATELIMIT_ENABLED": False,
+    "READINESS_BACKGROUND_REFRESH": False,
+}
+
+
+def test_create_app_records_startup_phase_timings():
+    app = create_app(_TEST_CONFIG)
+
+    timings = app.extensions["startup_timings"]
+
+    assert {"config", "extensions", "models", "schema", "blueprints"} <= set(timings)
+    assert all(value >= 0 for value in timings.values())
+
+
+def test_serving_app_does_not_register_flask_migrate():
+    app = create_app(_TEST_CONFIG)
+
+    assert "migrate" not in app.extensions
+
+
+def test_template_bytecode_cache_is_populated_by_compile(tmp_path):
+    cache_dir = tmp_path / "jinja"
+    app = create_app({**_TEST_CONFIG, "JINJA_BYTECODE_CACHE_DIR": str(cache_dir)})
+
+    compiled = compile_templates(app)
+
+    assert "base.html" in compiled
+    assert "paperwork/load_board.html" in compiled
+    assert len(list(cache_dir.iterdir())) == len(compiled)
+
+
+def test_compile_templates_cli_requires_cache_dir():
+    app = create_app(_TEST_CONFIG)
+
+    result = app.test_cli_runner().invoke(args=["compile-templates"])
+
+    assert result.exit_code != 0
+    assert "JINJA_BYTECODE_CACHE_DIR" in result.output
+
+
+def test_deferred_schema_assertion_blocks_app_routes_until_schema_verifies(monkeypatch):
+    app = create_app({**_TEST_CONFIG, "SCHEMA_FAIL_FAST_ON_STARTUP": True})
+    reports = iter(
+        [
+            {"ok": False, "missing_columns": ["load_board.mawb_number"], "error": "Database schema is missing required columns."},
+            {"ok": True, "missing_columns": [], "error": None},
+        ]
+    )
+    monkeypatch.setattr("app.schema_checks.get_required_schema_report", lambda: next(reports))
+    client = app.test_client()
+
+    blocked = client.get("/auth/login")
+    probe = client.get("/livez")
+    verified = client.get("/auth/login")
+    after_verification = client.get("/auth/login")
+
+    assert blocked.status_code == 503
+    assert "missing required columns" in blocked.get_json()["error"]
+    assert probe.status_code == 200
+    assert verified.status_code == 200
+    assert after_verification.status_code == 200
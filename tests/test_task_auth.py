@@ -0,0 +1,140 @@
+import datetime
+import json
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from app.services.task_auth import get_task_token_verifier
+
+AUDIENCE = "https://example.run.app/tasks/api/tasks/upload-couchdrop"
+
+
+def _key_pair(kid: str) -> tuple[crypt.RSASigner, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    signer = crypt.RSASigner.from_string(private_pem, key_id=kid)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return {kid: _key_pair(kid) for kid in ("key-1", "key-2")}
+
+
+def _token(signer, audience: str = AUDIENCE, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "email": "tasks-invoker@example.iam.gserviceaccount.com",
+        "email_verified": True,
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(signer, payload).decode("utf-8")
+
+
+def test_certs_are_fetched_once_while_cache_headers_allow(app, http_stub, keys):
+    signer, cert = keys["key-1"]
+    http_stub.respond(
+        "GET", "/oauth2/v1/certs", payload={"key-1": cert}, headers={"Cache-Control": "public, max-age=3600"}
+    )
+    verifier = get_task_token_verifier()
+
+    assert verifier.verify(_token(signer, sub="a"), AUDIENCE)["sub"] == "a"
+    assert verifier.verify(_token(signer, sub="b"), AUDIENCE)["sub"] == "b"
+
+    assert len(http_stub.calls("GET", "/oauth2/v1/certs")) == 1
+
+
+def test_expired_cert_cache_is_refetched(app, http_stub, keys):
+    signer, cert = keys["key-1"]
+    for _ in range(2):
+        http_stub.respond(
+            "GET", "/oauth2/v1/certs", payload={"key-1": cert}, headers={"Cache-Control": "max-age=600", "Age": "600"}
+        )
+    verifier = get_task_token_verifier()
+
+    verifier.verify(_token(signer, sub="a"), AUDIENCE)
+    verifier.verify(_token(signer, sub="b"), AUDIENCE)
+
+    assert len(http_stub.calls("GET", "/oauth2/v1/certs")) == 2
+
+
+def test_verified_token_is_reused_until_it_expires(app, http_stub, keys):
+    signer, cert = keys["key-1"]
+    http_stub.respond("GET", "/oauth2/v1/certs", payload={"key-1": cert}, headers={"Cache-Control": "max-age=3600"})
+    verifier = get_task_token_verifier()
+    token = _token(signer)
+
+    claims = verifier.verify(token, AUDIENCE)
+    verifier._certs = {}  # a second verification would now have to fetch certs again
+    assert verifier.verify(token, AUDIENCE) == claims
+    assert len(http_stub.calls("GET", "/oauth2/v1/certs")) == 1
+
+    with pytest.raises(ValueError):
+        verifier.verify(token, "https://example.run.app/tasks/api/tasks/send-email")
+
+
+def test_unknown_key_id_refetches_rotated_certs(app, http_stub, keys, monkeypatch):
+    old_signer, old_cert = keys["key-1"]
+    new_signer, new_cert = keys["key-2"]
+    http_stub.respond("GET", "/oauth2/v1/certs", payload={"key-1": old_cert}, headers={"Cache-Control": "max-age=3600"})
+    http_stub.respond("GET", "/oauth2/v1/certs", payload={"key-2": new_cert}, headers={"Cache-Control": "max-age=3600"})
+    verifier = get_task_token_verifier()
+    verifier.verify(_token(old_signer), AUDIENCE)
+    monkeypatch.setattr("app.services.task_auth._MIN_CERTS_REFRESH_SECONDS", 0)
+
+    assert verifier.verify(_token(new_signer, sub="rotated"), AUDIENCE)["sub"] == "rotated"
+    assert len(http_stub.calls("GET", "/oauth2/v1/certs")) == 2
+
+
+def test_task_route_verifies_tokens_against_a_local_key_set(client, app, keys, tmp_path, monkeypatch):
+    signer, cert = keys["key-1"]
+    other_signer, _ = keys["key-2"]
+    certs_file = tmp_path / "certs.json"
+    certs_file.write_text(json.dumps({"key-1": cert}))
+    app.config["TASKS_OIDC_CERTS_FILE"] = str(certs_file)
+    monkeypatch.setattr(
+        "app.blueprints.tasks.routes.CouchdropService.upload_staged_paperwork",
+        lambda **_kwargs: (True, "uploaded"),
+    )
+    payload = {
+        "actor_user_id": 1,
+        "original_filename": "scan.pdf",
+        "content_type": "application/pdf",
+        "staged_blob_name": "couchdrop_queue/test/scan.pdf",
+        "remote_path": "/Paperwork/Driver_One/2026-01-01/scan.pdf",
+        "idempotency_key": "idem-oidc",
+    }
+
+    def _post(token: str):
+        return client.post(
+            "/tasks/api/tasks/upload-couchdrop",
+            headers={"X-CloudTasks-TaskName": "task-oidc", "Authorization": f"Bearer {token}"},
+            json=payload,
+        )
+
+    assert _post(_token(signer)).status_code == 200
+    assert _post(_token(other_signer)).status_code == 403
+    assert _post(_token(signer, iss="https://evil.example.com")).status_code == 403
@@ -6,6 +6,7 @@ from app.services.tasks import (
     CouchdropTaskPayload,
     EmailTaskPayload,
     enqueue_couchdrop_task,
+    enqueue_couchdrop_tasks,
     enqueue_email_task,
 )
 
@@ -112,3 +113,43 @@ def test_enqueue_couchdrop_task_creates_cloud_task(monkeypatch, app):
     assert created["task"]["http_request"]["url"] == "https://example.run.app/tasks/api/tasks/upload-couchdrop"
     assert body["staged_blob_name"] == "couchdrop_queue/2026-01-01/abc123/scan.pdf"
     assert body["idempotency_key"] == "abc123"
+
+
+def test_enqueue_couchdrop_tasks_reports_each_payload(monkeypatch, app):
+    created = []
+
+    class FakeClient:
+        def queue_path(self, project_id, region, queue_name):
+            return "projects/test/locations/us-central1/queues/email-queue"
+
+        def create_task(self, parent, task):
+            body = json.loads(task["http_request"]["body"].decode("utf-8"))
+            if body["idempotency_key"] == "rejected":
+                raise RuntimeError("quota exceeded")
+            created.append(body["idempotency_key"])
+
+    class FakeTasksModule:
+        CloudTasksClient = FakeClient
+
+        class HttpMethod:
+            POST = "POST"
+
+    monkeypatch.setattr("app.services.tasks._get_tasks_v2_module", lambda: FakeTasksModule)
+
+    def _payload(key: str, filename: str = "scan.pdf") -> CouchdropTaskPayload:
+        return CouchdropTaskPayload(
+            actor_user_id=5,
+            original_filename=filename,
+            content_type="application/pdf",
+            staged_blob_name=f"couchdrop_queue/2026-01-01/{key}/scan.pdf",
+            remote_path="/Paperwork/Test_User/2026-01-01/scan.pdf",
+            idempotency_key=key,
+        )
+
+    with app.app_context():
+        results = enqueue_couchdrop_tasks([_payload("a"), _payload("rejected"), _payload("b", filename=""), _payload("c")])
+
+    assert results[0] is None and results[3] is None
+    assert str(results[1]) == "quota exceeded"
+    assert isinstance(results[2], ValueError)
+    assert sorted(created) == ["a", "c"]
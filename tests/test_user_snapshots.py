@@ -0,0 +1,98 @@
+from app import db
+from app.services.user_snapshots import UserSnapshot, get_user_snapshot
+from models import Role, User
+
+
+def _create_session_user(client, email="snapshot@example.com", role=Role.EMPLOYEE.value):
+    user = User(
+        email=email,
+        password_hash="pbkdf2:sha256:1$dummy$dummy",
+        role=role,
+        employee_approved=True,
+        name="Snapshot User",
+    )
+    db.session.add(user)
+    db.session.commit()
+
+    with client.session_transaction() as sess:
+        sess["current_user_id"] = user.id
+
+    return user
+
+
+def _count_user_lookups(monkeypatch):
+    lookups = []
+    original_get = db.session.get
+
+    def _counting_get(entity, ident, **kwargs):
+        if entity is User:
+            lookups.append(ident)
+        return original_get(entity, ident, **kwargs)
+
+    monkeypatch.setattr(db.session, "get", _counting_get)
+    return lookups
+
+
+def test_snapshot_copies_user_fields(app):
+    user = User(
+        email="fields@example.com",
+        password_hash="hash",
+        role=Role.SUPERVISOR,
+        employee_approved=True,
+        is_ops=True,
+        first_name="Field",
+        last_name="Tester",
+    )
+    db.session.add(user)
+    db.session.commit()
+
+    snapshot = get_user_snapshot(user.id)
+
+    assert isinstance(snapshot, UserSnapshot)
+    assert snapshot.role == "SUPERVISOR"
+    assert snapshot.is_ops is True
+    assert snapshot.is_driver is False
+    assert snapshot.first_name == "Field"
+    assert snapshot.can_access_portal() is True
+
+
+def test_repeated_requests_reuse_cached_snapshot(client, monkeypatch):
+    _create_session_user(client)
+    lookups = _count_user_lookups(monkeypatch)
+
+    assert client.get("/account/settings").status_code == 200
+    assert client.get("/pod/event").status_code == 200
+    assert client.get("/help").status_code == 200
+
+    # settings() loads the ORM row once for its form; the guard reads the cache.
+    assert len(lookups) == 2
+
+
+def test_admin_user_update_invalidates_cached_snapshot(client):
+    admin = _create_session_user(client, email="snapshot-admin@example.com", role=Role.ADMIN.value)
+    target_user = User(
+        email="snapshot-target@example.com",
+        password_hash="pbkdf2:sha256:1$dummy$dummy",
+        role=Role.EMPLOYEE.value,
+        employee_approved=True,
+        is_ops=False,
+    )
+    db.session.add(target_user)
+    db.session.commit()
+
+    assert get_user_snapshot(target_user.id).is_ops is False
+
+    response = client.post(
+        "/account/admin/users",
+        data={
+            "user_id": str(target_user.id),
+            "role": Role.EMPLOYEE.value,
+            "employee_approved": "on",
+            "is_active": "on",
+            "is_ops": "on",
+        },
+    )
+
+    assert response.status_code == 302
+    assert get_user_snapshot(target_user.id).is_ops is True
+    assert get_user_snapshot(admin.id).role == Role.ADMIN.value
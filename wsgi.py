@@ -4,7 +4,7 @@ Local development:
     python wsgi.py
 
 Production (Cloud Run / container):
-    gunicorn --bind 0.0.0.0:${PORT} wsgi:app
+    gunicorn --config gunicorn.conf.py wsgi:app
 """
 
 from app import create_app